@@ -8,7 +8,6 @@ import sys  # Needed for sys.modules check
 from pathlib import Path
 import copy
 import uuid
-from unittest.mock import patch  # Keep for patching targets if needed
 
 # Import the module containing the functions to be mocked
 import core.json_storage
@@ -115,8 +114,8 @@ def baseline_test_data():
 )  # autouse applies this to all tests found
 def isolated_json_storage(tmp_path, monkeypatch, baseline_test_data):
     """
-    Pytest fixture using monkeypatch to redirect core.json_storage functions
-    to use a temporary file for test isolation. This runs for every test function.
+    Pytest fixture using monkeypatch to redirect core.json_storage paths
+    to a temporary file for test isolation. This runs for every test function.
     """
     # tmp_path is unique per test function, provided by pytest
     temp_file = tmp_path / f"test_data_{uuid.uuid4()}.json"
@@ -144,74 +143,31 @@ def isolated_json_storage(tmp_path, monkeypatch, baseline_test_data):
             f"Fixture failed to write baseline data: {e}"
         )  # Fail test if setup fails
 
-    # --- Define Mock Functions that operate on this specific temp_file ---
-    def mock_load_data_from_file():
-        """Reads directly from the specific temp file for this test."""
-        print(f"[Mock Load] Reading from {temp_file} (Test: {current_test_name})")
-        if not temp_file.exists():
-            print("[Mock Load] File does not exist! Returning deep copy of baseline.")
-            return copy.deepcopy(baseline_test_data)  # Use baseline copy
-        try:
-            with open(temp_file, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            print(
-                f"[Mock Load] Success. Loaded {len(data.get('quizzes', []))} quizzes."
-            )
-            return data  # Return fresh content from file
-        except Exception as e:
-            print(f"[Mock Load] ERROR reading file {e}. Returning baseline copy.")
-            return copy.deepcopy(baseline_test_data)  # Use baseline copy
-
-    def mock_save_data_to_file(data_to_save):
-        """Writes directly to the specific temp file for this test."""
-        print(f"[Mock Save] Writing to {temp_file} (Test: {current_test_name})")
-        print(
-            f"[Mock Save] Data to save has {len(data_to_save.get('quizzes',[]))} quizzes."
-        )
-        try:
-            with open(temp_file, "w", encoding="utf-8") as f:
-                json.dump(data_to_save, f, indent=2, ensure_ascii=False)
-            print(f"[Mock Save] Successfully wrote data to file.")
-        except Exception as e:
-            print(f"[Mock Save] ERROR writing file: {e}")
-            # Optionally fail test if save fails:
-            # pytest.fail(f"Mock save failed: {e}")
-
-    # --- Apply monkeypatch to replace functions where they are looked up ---
+    # --- Redirect core.json_storage to this specific temp_file ---
+    # The real load_data/save_data/get_data_snapshot are exercised so that the
+    # snapshot cache is covered by the API tests; only the path is swapped.
     print("[Fixture] Applying monkeypatch...")
-
-    # 1. Patch the functions in the core.json_storage module itself
-    monkeypatch.setattr(core.json_storage, "load_data", mock_load_data_from_file)
-    monkeypatch.setattr(core.json_storage, "save_data", mock_save_data_to_file)
-    print("[Fixture] Patched core.json_storage.load/save")
-
-    # 2. Patch the functions where they are imported in quiz.views
-    #    This is crucial if quiz.views uses "from core.json_storage import ..."
-    quiz_views_module = sys.modules.get("quiz.views")
-    if quiz_views_module:
-        monkeypatch.setattr(
-            quiz_views_module, "load_data", mock_load_data_from_file, raising=False
-        )
-        monkeypatch.setattr(
-            quiz_views_module, "save_data", mock_save_data_to_file, raising=False
-        )
-        print("[Fixture] Patched quiz.views.load/save")
-    else:
-        print(
-            "[Fixture] WARNING: quiz.views module not found in sys.modules during patching."
-        )
-
-    # Add patches for other modules if they also import load/save directly
-    # Example:
-    # core_views_module = sys.modules.get('core.views')
-    # if core_views_module:
-    #     monkeypatch.setattr(core_views_module, 'load_data', mock_load_data_from_file, raising=False)
-    #     monkeypatch.setattr(core_views_module, 'save_data', mock_save_data_to_file, raising=False)
-    #     print("[Fixture] Patched core.views.load/save")
+    monkeypatch.setattr(core.json_storage, "DATA_FILE", temp_file)
+    monkeypatch.setattr(
+        core.json_storage, "ATTEMPT_LOG_FILE", tmp_path / "attempts.jsonl"
+    )
+    monkeypatch.setattr(core.json_storage, "JOBS_FILE", tmp_path / "jobs.json")
+    monkeypatch.setattr(
+        core.json_storage, "JOB_RESULTS_DIR", tmp_path / "job_results"
+    )
+    monkeypatch.setattr(
+        core.json_storage,
+        "_storage_backend",
+        core.json_storage.JsonFileStorageBackend(),
+    )
+    core.json_storage.invalidate_data_cache()
+    print(f"[Fixture] Patched core.json_storage.DATA_FILE -> {temp_file}")
 
     yield temp_file  # Test runs here (the yielded value isn't strictly needed anymore)
 
     # Teardown: tmp_path fixture handles directory removal automatically
+    # Drop the snapshot so no test sees another test's cached data
+    core.json_storage.invalidate_data_cache()
     print(
         f"[Fixture isolated_json_storage END] Test {current_test_name} finished. Temp file was: {temp_file}"
     )
@@ -0,0 +1,129 @@
+# src/core/aggregates.py
+"""
+Running result aggregates per quiz (count, mean/stddev inputs, min/max,
+pass and timeout counts, score histogram).
+
+The data index keeps one ResultAggregate per quiz and updates it in O(1) as
+attempts are stored or replaced (e.g. by a regrade), so statistics never
+require a scan over the attempts.
+"""
+
+import math
+
+HISTOGRAM_BUCKETS = 10  # 0-10%, 10-20%, ..., 90-100% (100% counts in the last one)
+
+
+def histogram_bucket(percentage: float) -> int:
+    """Returns the histogram bucket for a percentage (clamped to 0-100)."""
+    bucket = int(min(max(percentage, 0.0), 100.0) * HISTOGRAM_BUCKETS // 100)
+    return min(bucket, HISTOGRAM_BUCKETS - 1)
+
+
+def _percentage_of(attempt: dict):
+    percentage = attempt.get("percentage")
+    if isinstance(percentage, bool) or not isinstance(percentage, (int, float)):
+        return None
+    return float(percentage)
+
+
+class ResultAggregate:
+    """Running statistics over the attempts of one quiz."""
+
+    __slots__ = (
+        "count",
+        "scored_count",
+        "percentage_sum",
+        "percentage_sum_squares",
+        "percentage_min",
+        "percentage_max",
+        "pass_count",
+        "timeout_count",
+        "histogram",
+        "extremes_stale",
+    )
+
+    def __init__(self):
+        self.count = 0  # Attempts
+        self.scored_count = 0  # Attempts with a numeric percentage
+        self.percentage_sum = 0.0
+        self.percentage_sum_squares = 0.0
+        self.percentage_min = None
+        self.percentage_max = None
+        self.pass_count = 0
+        self.timeout_count = 0
+        self.histogram = [0] * HISTOGRAM_BUCKETS
+        self.extremes_stale = False  # min/max need recompute_extremes()
+
+    def add(self, attempt: dict):
+        self.count += 1
+        self.pass_count += bool(attempt.get("passed"))
+        self.timeout_count += bool(attempt.get("submitted_due_to_timeout"))
+        percentage = _percentage_of(attempt)
+        if percentage is None:
+            return
+        self.scored_count += 1
+        self.percentage_sum += percentage
+        self.percentage_sum_squares += percentage * percentage
+        self.histogram[histogram_bucket(percentage)] += 1
+        if self.percentage_min is None or percentage < self.percentage_min:
+            self.percentage_min = percentage
+        if self.percentage_max is None or percentage > self.percentage_max:
+            self.percentage_max = percentage
+
+    def remove(self, attempt: dict):
+        """
+        Takes a previously added attempt back out. Min/max cannot be undone
+        in O(1): if the removed percentage was an extreme, extremes_stale is
+        set and the owner must call recompute_extremes().
+        """
+        self.count -= 1
+        self.pass_count -= bool(attempt.get("passed"))
+        self.timeout_count -= bool(attempt.get("submitted_due_to_timeout"))
+        percentage = _percentage_of(attempt)
+        if percentage is None:
+            return
+        self.scored_count -= 1
+        self.percentage_sum -= percentage
+        self.percentage_sum_squares -= percentage * percentage
+        self.histogram[histogram_bucket(percentage)] -= 1
+        if percentage in (self.percentage_min, self.percentage_max):
+            self.extremes_stale = True
+
+    def recompute_extremes(self, attempts: list):
+        percentages = [
+            p for p in (_percentage_of(a) for a in attempts) if p is not None
+        ]
+        self.percentage_min = min(percentages) if percentages else None
+        self.percentage_max = max(percentages) if percentages else None
+        self.extremes_stale = False
+
+    def to_dict(self) -> dict:
+        mean = stddev = None
+        if self.scored_count:
+            mean = self.percentage_sum / self.scored_count
+            # Population standard deviation; clamp float rounding below zero
+            variance = max(
+                self.percentage_sum_squares / self.scored_count - mean * mean, 0.0
+            )
+            stddev = round(math.sqrt(variance), 2)
+            mean = round(mean, 2)
+        return {
+            "attempt_count": self.count,
+            "mean_percentage": mean,
+            "stddev_percentage": stddev,
+            "min_percentage": self.percentage_min,
+            "max_percentage": self.percentage_max,
+            "pass_count": self.pass_count,
+            "pass_rate": (
+                round(100.0 * self.pass_count / self.count, 2) if self.count else None
+            ),
+            "timeout_count": self.timeout_count,
+            "histogram": [
+                {
+                    "from": 100 * i // HISTOGRAM_BUCKETS,
+                    "to": 100 * (i + 1) // HISTOGRAM_BUCKETS,
+                    "count": bucket_count,
+                }
+                for i, bucket_count in enumerate(self.histogram)
+            ],
+        }
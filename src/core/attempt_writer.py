@@ -0,0 +1,176 @@
+# src/core/attempt_writer.py
+"""
+Group-commit writer for quiz attempts.
+
+When a timed exam ends, hundreds of submissions arrive within seconds. Instead
+of every request doing its own durable write, requests hand their attempt to a
+single background thread which gathers everything that arrives within a short
+window (or until the batch is full) and persists the whole batch with one
+append + fsync. Each caller blocks until its batch is committed, so an attempt
+is only acknowledged once it is on disk.
+
+A caller only gives up (TimeoutError) while its attempt is still queued: the
+attempt is then withdrawn and certainly not saved. Once its batch is being
+written the caller waits for the outcome. Submissions are idempotent on
+"attempt_id": a resubmission joins the queued or in-flight attempt, and the
+default commit function skips attempts that are already stored.
+"""
+
+import threading
+import time
+
+from core import json_storage
+
+# --- Batching Configuration ---
+GROUP_COMMIT_MAX_DELAY_MS = 10  # Longest a submission waits for companions
+GROUP_COMMIT_MAX_BATCH_SIZE = 200  # Commit immediately once this many are queued
+GROUP_COMMIT_TIMEOUT_SECONDS = 30  # Withdraw an attempt still queued after this long
+
+
+class _PendingAttempt:
+    """An attempt waiting for its batch to be committed."""
+
+    __slots__ = ("attempt", "done", "error", "taken")
+
+    def __init__(self, attempt: dict):
+        self.attempt = attempt
+        self.done = threading.Event()
+        self.error = None
+        self.taken = False  # Set once the writer thread has taken its batch
+
+
+class GroupCommitWriter:
+    """
+    Collects attempts from many request threads and commits them in batches
+    on one background thread.
+
+    commit_func receives a list of attempts and must raise if they could not
+    be persisted; the error is re-raised in every waiting submit() call.
+    """
+
+    def __init__(
+        self,
+        commit_func,
+        max_delay_ms: float = GROUP_COMMIT_MAX_DELAY_MS,
+        max_batch_size: int = GROUP_COMMIT_MAX_BATCH_SIZE,
+    ):
+        self._commit_func = commit_func
+        self._max_delay = max_delay_ms / 1000.0
+        self._max_batch_size = max(1, int(max_batch_size))
+        self._pending = []
+        self._in_flight = {}  # attempt id -> _PendingAttempt, until committed
+        self._condition = threading.Condition()
+        self._thread = None
+        self.batches_committed = 0  # Simple counters, useful for logging/tests
+        self.attempts_committed = 0
+
+    def _ensure_thread(self):
+        """Starts the writer thread on first use (caller holds the condition)."""
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(
+                target=self._run, name="quizpy-attempt-writer", daemon=True
+            )
+            self._thread.start()
+
+    def submit(self, attempt: dict, timeout: float = GROUP_COMMIT_TIMEOUT_SECONDS):
+        """
+        Queues an attempt and blocks until the batch containing it has been
+        durably committed. Raises the commit error, or TimeoutError if the
+        attempt was still queued after timeout seconds (it is then withdrawn
+        and not saved). An attempt whose attempt_id is already queued or
+        being written is not queued again; the caller waits for that one.
+        """
+        attempt_id = attempt.get("attempt_id")
+        with self._condition:
+            pending = self._in_flight.get(attempt_id)
+            if pending is None:
+                pending = _PendingAttempt(attempt)
+                self._ensure_thread()
+                self._pending.append(pending)
+                if attempt_id is not None:
+                    self._in_flight[attempt_id] = pending
+                self._condition.notify()
+        if not pending.done.wait(timeout):
+            with self._condition:
+                if not pending.taken and not pending.done.is_set():
+                    self._pending.remove(pending)
+                    self._forget(pending)
+                    pending.error = TimeoutError(
+                        "Timed out waiting for the attempt to be saved; it was not saved."
+                    )
+                    pending.done.set()
+            pending.done.wait()  # Being written: wait for the outcome
+        if pending.error is not None:
+            raise pending.error
+
+    def _forget(self, pending: _PendingAttempt):
+        """Drops pending from the in-flight ids (caller holds the condition)."""
+        attempt_id = pending.attempt.get("attempt_id")
+        if self._in_flight.get(attempt_id) is pending:
+            del self._in_flight[attempt_id]
+
+    def _take_batch(self) -> list:
+        """
+        Waits for the first pending attempt, then keeps the window open for
+        up to max_delay (or until the batch is full) and returns the batch.
+        """
+        with self._condition:
+            while not self._pending:
+                self._condition.wait()
+            deadline = time.monotonic() + self._max_delay
+            while len(self._pending) < self._max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+            batch = self._pending[: self._max_batch_size]
+            del self._pending[: self._max_batch_size]
+            for pending in batch:
+                pending.taken = True
+            return batch
+
+    def _run(self):
+        """Writer thread main loop: one durable write per batch."""
+        while True:
+            batch = self._take_batch()
+            error = None
+            try:
+                self._commit_func([pending.attempt for pending in batch])
+                self.batches_committed += 1
+                self.attempts_committed += len(batch)
+                print(
+                    f"DEBUG [AttemptWriter]: Committed batch of {len(batch)} attempt(s)."
+                )
+            except Exception as e:
+                print(f"ERROR [AttemptWriter]: Failed to commit batch: {e}")
+                error = e
+            with self._condition:
+                for pending in batch:
+                    self._forget(pending)
+                    pending.error = error
+                    pending.done.set()
+
+
+def _commit_to_attempt_log(attempts: list):
+    """Default commit function (looked up at call time so paths can be patched)."""
+    # Only this thread stores submissions, so an attempt_id found here was
+    # stored by an earlier batch: a resubmission is not stored twice
+    new_attempts = [
+        attempt
+        for attempt in attempts
+        if attempt.get("attempt_id") is None
+        or json_storage.get_attempt(attempt["attempt_id"]) is None
+    ]
+    json_storage.append_attempts_to_log(new_attempts)
+
+
+# Process-wide writer used by quiz_submit_api
+attempt_writer = GroupCommitWriter(_commit_to_attempt_log)
+
+
+def submit_attempt(attempt: dict):
+    """
+    Persists one attempt through the shared group-commit writer. Raises
+    TimeoutError if it was not saved in time (safe to submit again).
+    """
+    attempt_writer.submit(attempt)
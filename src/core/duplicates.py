@@ -0,0 +1,193 @@
+# src/core/duplicates.py
+"""
+Near-duplicate detection with MinHash signatures and LSH banding.
+
+Each document (a question: its text and option texts) is reduced to a set
+of character shingles of its normalized tokens, and the set to a MinHash
+signature of DUPLICATE_NUM_PERM values, where the share of equal values
+estimates the Jaccard similarity of two shingle sets. The signature is cut
+into DUPLICATE_BANDS bands; documents sharing any band land in the same LSH
+bucket, so looking up the candidates of a document only touches its buckets
+instead of comparing it with every other document. Candidates are then
+kept if their estimated similarity reaches the threshold.
+
+Signatures are computed with NumPy when it is installed; otherwise in pure
+Python, which gives the same values, just slower.
+"""
+
+import random
+import zlib
+
+from core.text_search import tokenize
+
+try:
+    import numpy as np
+except ImportError:  # Optional dependency, see MinHashIndex.signature()
+    np = None
+
+# --- Duplicate Detection Configuration ---
+DUPLICATE_NUM_PERM = 64  # Signature length
+DUPLICATE_BANDS = 16  # LSH bands (DUPLICATE_NUM_PERM / bands rows each)
+DUPLICATE_SHINGLE_SIZE = 5  # Characters per shingle
+DUPLICATE_SIMILARITY_THRESHOLD = 0.8  # Estimated Jaccard to count as duplicate
+
+# Hash family h(x) = (a * x + b) mod p over 32-bit shingle hashes; p is the
+# Mersenne prime 2**31 - 1, so a * x stays within 63 bits (int64 in NumPy)
+_MERSENNE_PRIME = (1 << 31) - 1
+_PERMUTATION_SEED = 20240601  # Fixed, so signatures are stable across runs
+
+
+def shingles(parts) -> set:
+    """
+    Returns the 32-bit hashes of the character shingles of each part (text,
+    option texts). Parts are shingled separately, so reordering options does
+    not change the set; a part shorter than a shingle is taken whole.
+    """
+    hashes = set()
+    for part in parts:
+        normalized = " ".join(tokenize(part))
+        if not normalized:
+            continue
+        if len(normalized) <= DUPLICATE_SHINGLE_SIZE:
+            hashes.add(zlib.crc32(normalized.encode("utf-8")))
+            continue
+        for start in range(len(normalized) - DUPLICATE_SHINGLE_SIZE + 1):
+            shingle = normalized[start : start + DUPLICATE_SHINGLE_SIZE]
+            hashes.add(zlib.crc32(shingle.encode("utf-8")))
+    return hashes
+
+
+class MinHashIndex:
+    """
+    MinHash signatures plus LSH buckets: (band number, band values) -> ids.
+    Documents are added and removed one at a time. Not thread-safe on its
+    own; the owner serializes updates.
+    """
+
+    def __init__(
+        self, num_perm: int = DUPLICATE_NUM_PERM, bands: int = DUPLICATE_BANDS
+    ):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands.")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        rng = random.Random(_PERMUTATION_SEED)
+        self._a = [rng.randrange(1, _MERSENNE_PRIME) for _ in range(num_perm)]
+        self._b = [rng.randrange(0, _MERSENNE_PRIME) for _ in range(num_perm)]
+        if np is not None:
+            self._a_array = np.array(self._a, dtype=np.int64)[:, None]
+            self._b_array = np.array(self._b, dtype=np.int64)[:, None]
+        self.signatures = {}  # document id -> signature tuple
+        self.buckets = {}
+
+    def __len__(self):
+        return len(self.signatures)
+
+    def signature(self, parts) -> tuple | None:
+        """MinHash signature of the parts' shingles; None if there are none."""
+        hashes = shingles(parts)
+        if not hashes:
+            return None
+        if np is not None:
+            values = np.fromiter(hashes, dtype=np.int64, count=len(hashes))
+            hashed = (self._a_array * values[None, :] + self._b_array) % _MERSENNE_PRIME
+            return tuple(int(value) for value in hashed.min(axis=1))
+        return tuple(
+            min((a * value + b) % _MERSENNE_PRIME for value in hashes)
+            for a, b in zip(self._a, self._b)
+        )
+
+    def _band_keys(self, signature: tuple):
+        for band in range(self.bands):
+            start = band * self.rows
+            yield (band, signature[start : start + self.rows])
+
+    def similarity(self, signature: tuple, other: tuple) -> float:
+        """Estimated Jaccard similarity (share of equal signature values)."""
+        return sum(x == y for x, y in zip(signature, other)) / self.num_perm
+
+    def add(self, document_id, parts):
+        """Indexes (or re-indexes) a document; documents without text are skipped."""
+        self.remove(document_id)
+        signature = self.signature(parts)
+        if signature is None:
+            return
+        self.signatures[document_id] = signature
+        for key in self._band_keys(signature):
+            self.buckets.setdefault(key, set()).add(document_id)
+
+    def remove(self, document_id):
+        signature = self.signatures.pop(document_id, None)
+        if signature is None:
+            return
+        for key in self._band_keys(signature):
+            bucket = self.buckets.get(key)
+            if bucket is not None:
+                bucket.discard(document_id)
+                if not bucket:
+                    del self.buckets[key]
+
+    def similar(
+        self,
+        signature: tuple | None,
+        exclude=(),
+        threshold: float = DUPLICATE_SIMILARITY_THRESHOLD,
+    ) -> list:
+        """
+        Returns [(document id, estimated similarity)] of the documents whose
+        similarity to signature reaches threshold, most similar first.
+        Only the signature's LSH buckets are searched.
+        """
+        if signature is None:
+            return []
+        candidates = set()
+        for key in self._band_keys(signature):
+            candidates |= self.buckets.get(key, set())
+        matches = []
+        for document_id in candidates:
+            if document_id in exclude:
+                continue
+            similarity = self.similarity(signature, self.signatures[document_id])
+            if similarity >= threshold:
+                matches.append((document_id, similarity))
+        matches.sort(key=lambda match: (-match[1], match[0]))
+        return matches
+
+    def duplicate_groups(
+        self, threshold: float = DUPLICATE_SIMILARITY_THRESHOLD
+    ) -> list:
+        """
+        Returns the groups (lists of ids, at least two each) of documents
+        linked by pairs reaching threshold. Only documents sharing a bucket
+        are compared, and pairs already grouped are skipped.
+        """
+        parents = {}
+
+        def find(document_id):
+            root = document_id
+            while parents.get(root, root) != root:
+                root = parents[root]
+            while document_id != root:  # Path compression
+                parents[document_id], document_id = root, parents[document_id]
+            return root
+
+        for bucket in self.buckets.values():
+            if len(bucket) < 2:
+                continue
+            members = sorted(bucket)
+            for i, first in enumerate(members):
+                for second in members[i + 1 :]:
+                    root_first, root_second = find(first), find(second)
+                    if root_first == root_second:
+                        continue
+                    similarity = self.similarity(
+                        self.signatures[first], self.signatures[second]
+                    )
+                    if similarity >= threshold:
+                        parents.setdefault(root_first, root_first)
+                        parents[root_second] = root_first
+        groups = {}
+        for document_id in parents:
+            groups.setdefault(find(document_id), []).append(document_id)
+        return [sorted(group) for group in groups.values() if len(group) > 1]
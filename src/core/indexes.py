@@ -0,0 +1,545 @@
+# src/core/indexes.py
+"""
+In-memory lookup indexes over the cached data snapshot.
+
+json_storage builds one DataIndex per snapshot (lazily, on first lookup) and
+keeps it current incrementally: record changes made through commit_changes()
+and attempts appended to the store update only the affected entries, so the
+views can find quizzes, questions and attempts in O(1) instead of scanning
+the lists on every request.
+
+Each quiz also carries a content version that changes whenever the quiz or
+one of its questions changes, so derived data (e.g. the student payload) can
+be cached per (quiz id, content version).
+"""
+
+import bisect
+import datetime
+import itertools
+from collections.abc import Sequence
+
+from core.aggregates import ResultAggregate
+from core.duplicates import MinHashIndex
+from core.text_search import TextIndex
+
+# Process-wide, so versions never repeat even when an index is rebuilt
+_content_versions = itertools.count(1)
+
+
+def attempt_timestamp(attempt: dict) -> float:
+    """
+    Returns the attempt's submission time (end_time) as a POSIX timestamp.
+    Naive times are taken as UTC; missing/unparsable times sort as oldest.
+    """
+    try:
+        end_time = datetime.datetime.fromisoformat(str(attempt.get("end_time")))
+    except (TypeError, ValueError):
+        return 0.0
+    if end_time.tzinfo is None:
+        end_time = end_time.replace(tzinfo=datetime.timezone.utc)
+    return end_time.timestamp()
+
+
+def attempt_sort_key(attempt: dict) -> tuple:
+    """Sort key putting the newest attempts first (ties broken by attempt id)."""
+    return (-attempt_timestamp(attempt), str(attempt.get("attempt_id")))
+
+
+class NewestFirst(Sequence):
+    """
+    Read-only, newest-first view of the first length items of a list kept
+    oldest first. Items appended to the list later are not seen, so the view
+    stays stable while the index keeps appending to the list.
+    """
+
+    __slots__ = ("_items", "_length")
+
+    def __init__(self, items: list, length: int):
+        self._items = items
+        self._length = length
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self[i] for i in range(*position.indices(self._length))]
+        if position < 0:
+            position += self._length
+        if not 0 <= position < self._length:
+            raise IndexError("timeline index out of range")
+        return self._items[self._length - 1 - position]
+
+    def __iter__(self):
+        items = self._items
+        for position in range(self._length - 1, -1, -1):
+            yield items[position]
+
+    def __reduce__(self):  # Pickled (e.g. for export workers) as a plain list
+        return (list, (list(self),))
+
+
+def normalize_access_key(access_key) -> str:
+    """Access keys are matched case-insensitively and ignoring surrounding spaces."""
+    return str(access_key or "").strip().upper()
+
+
+def normalize_category(category) -> str:
+    """Categories are matched case-insensitively, ignoring surrounding spaces."""
+    return str(category or "").strip().casefold()
+
+
+def normalize_question_type(question_type) -> str:
+    return str(question_type or "").strip().upper()
+
+
+def normalize_difficulty(difficulty) -> str:
+    return str(difficulty or "").strip().casefold()
+
+
+def question_search_text(question: dict) -> str:
+    """The text a question is found by: its text, option texts and category."""
+    parts = [question.get("text"), question.get("category")]
+    for option in question.get("options") or []:
+        parts.append(option.get("text") if isinstance(option, dict) else option)
+    return "\n".join(str(part) for part in parts if part)
+
+
+def question_duplicate_parts(question: dict) -> list:
+    """The texts compared for near-duplicates: question text and option texts."""
+    parts = [question.get("text")]
+    for option in question.get("options") or []:
+        parts.append(option.get("text") if isinstance(option, dict) else option)
+    return [str(part) for part in parts if part]
+
+
+_DIFFICULTY_RANKS = {"easy": 0, "medium": 1, "hard": 2}
+
+# Question bank sort orders: field -> key function (see get_question_order)
+QUESTION_SORT_KEYS = {
+    "text": lambda q: str(q.get("text") or "").casefold(),
+    "type": lambda q: normalize_question_type(q.get("type")),
+    "category": lambda q: normalize_category(q.get("category")),
+    "difficulty": lambda q: (
+        _DIFFICULTY_RANKS.get(normalize_difficulty(q.get("difficulty")), 99),
+        normalize_difficulty(q.get("difficulty")),
+    ),
+}
+
+
+def _normalize_student_field(value) -> str:
+    return " ".join(str(value or "").split()).casefold()
+
+
+def normalize_student_key(student_id, name, student_class) -> tuple | None:
+    """
+    Key of a student in the student history index: (id, name, class),
+    case-insensitive with runs of whitespace collapsed. None without a name.
+    """
+    name = _normalize_student_field(name)
+    if not name:
+        return None
+    return (
+        _normalize_student_field(student_id),
+        name,
+        _normalize_student_field(student_class),
+    )
+
+
+def attempt_student_keys(attempt: dict) -> set:
+    """Student keys of everyone in the attempt (students list or legacy student_info)."""
+    students = attempt.get("students")
+    if not isinstance(students, list):
+        students = [attempt.get("student_info")]
+    keys = set()
+    for student in students:
+        if isinstance(student, dict):
+            key = normalize_student_key(
+                student.get("id"), student.get("name"), student.get("class")
+            )
+            if key is not None:
+                keys.add(key)
+    return keys
+
+
+class DataIndex:
+    """
+    Hash indexes over one data snapshot:
+      - quizzes_by_id: quiz id -> quiz
+      - questions_by_id: question id -> question (in creation order)
+      - question_ids_by_category / _by_type / _by_difficulty: normalized
+        value -> {question ids} (inverted indexes for the question bank)
+      - category_labels: normalized category -> category as last written
+      - quiz_ids_by_access_key: normalized access key -> [quiz ids]
+      - attempts_by_quiz: quiz id -> [attempts, in submission order]
+      - attempts_by_id: attempt id -> attempt (the first stored with the id)
+      - quiz_ids_by_question: question id -> {ids of quizzes using it}
+      - quiz_versions: quiz id -> content version
+      - attempt_revisions: quiz id -> number changed whenever its attempts
+        are added or replaced (never reused within the process)
+      - result_aggregates: quiz id -> ResultAggregate over its attempts
+      - active_quiz_count: number of quizzes not archived
+      - attempts_by_student: student key (see normalize_student_key) ->
+        {attempt id: attempt}, in submission order; pair submissions are
+        listed under every student
+      - attempt timelines: quiz id -> attempts sorted oldest first, so new
+        submissions are appended (built lazily per quiz, read newest first
+        through get_attempt_timeline)
+      - question orders: sort field -> question ids sorted by it (built
+        lazily, dropped whenever a question changes)
+
+    Records are the snapshot's own dicts and must be treated as read-only.
+    Ids are compared as strings, like the views do.
+    """
+
+    def __init__(self, data: dict):
+        self.source = data  # The snapshot this index currently describes
+        self.quizzes_by_id = {}
+        self.questions_by_id = {}
+        self.question_ids_by_category = {}
+        self.question_ids_by_type = {}
+        self.question_ids_by_difficulty = {}
+        self.category_labels = {}
+        self._question_orders = {}  # sort field -> [question ids]
+        self._question_search = None  # TextIndex, built on first search
+        self._question_duplicates = None  # MinHashIndex, built on first check
+        self.quiz_ids_by_access_key = {}
+        self.attempts_by_quiz = {}
+        self.attempts_by_id = {}
+        self.quiz_ids_by_question = {}
+        self.quiz_versions = {}
+        self._timelines = {}  # quiz id -> (sort keys, attempts), oldest first
+        self.result_aggregates = {}
+        self.attempt_revisions = {}
+        self.attempts_by_student = {}
+        self.active_quiz_count = 0
+        for quiz in data.get("quizzes", []):
+            if isinstance(quiz, dict):
+                self._add_quiz(quiz)
+        for question in data.get("questions", []):
+            if isinstance(question, dict):
+                self._add_question(question)
+        self.attempts_added(data.get("attempts", []))
+
+    # --- Lookups ---
+    def get_quiz(self, quiz_id) -> dict | None:
+        return self.quizzes_by_id.get(str(quiz_id))
+
+    def get_question(self, question_id) -> dict | None:
+        return self.questions_by_id.get(str(question_id))
+
+    def find_quiz_by_access_key(self, access_key) -> dict | None:
+        """Returns the first quiz (in creation order) using access_key, or None."""
+        quiz_ids = self.quiz_ids_by_access_key.get(normalize_access_key(access_key))
+        return self.quizzes_by_id.get(quiz_ids[0]) if quiz_ids else None
+
+    def get_quiz_questions(self, quiz: dict) -> list:
+        """
+        Returns the questions referenced by quiz["questions"], in the quiz's
+        order, skipping ids that no longer exist and repeated ids.
+        """
+        questions = []
+        seen_ids = set()
+        for question_id in quiz.get("questions") or []:
+            question_id = str(question_id)
+            question = self.questions_by_id.get(question_id)
+            if question is not None and question_id not in seen_ids:
+                seen_ids.add(question_id)
+                questions.append(question)
+        return questions
+
+    def get_attempt(self, attempt_id) -> dict | None:
+        return self.attempts_by_id.get(str(attempt_id))
+
+    def get_attempts_for_quiz(self, quiz_id) -> list:
+        """Returns the quiz's attempts in submission order (shared list, read-only)."""
+        return self.attempts_by_quiz.get(str(quiz_id), [])
+
+    def get_attempt_timeline(self, quiz_id) -> tuple:
+        """
+        Returns (sort keys, attempts) for the quiz as NewestFirst views, where
+        the keys are attempt_sort_key() values in ascending order (use bisect
+        on them for paging and time ranges). Builds the timeline on first use,
+        so callers hold the snapshot lock (see json_storage.read_data_index).
+        """
+        quiz_id = str(quiz_id)
+        timeline = self._timelines.get(quiz_id)
+        if timeline is None:
+            attempts = sorted(
+                self.attempts_by_quiz.get(quiz_id, []),
+                key=attempt_sort_key,
+                reverse=True,
+            )
+            timeline = ([attempt_sort_key(a) for a in attempts], attempts)
+            self._timelines[quiz_id] = timeline
+        keys, attempts = timeline
+        length = len(keys)
+        return NewestFirst(keys, length), NewestFirst(attempts, length)
+
+    def get_attempt_revision(self, quiz_id) -> int | None:
+        """Returns the quiz's attempt revision, or None if it has no attempts."""
+        return self.attempt_revisions.get(str(quiz_id))
+
+    def get_result_stats(self, quiz_id) -> dict:
+        """
+        Returns the running result statistics of the quiz's attempts. May
+        recompute stale extremes, so callers hold the snapshot lock.
+        """
+        quiz_id = str(quiz_id)
+        aggregate = self.result_aggregates.get(quiz_id) or ResultAggregate()
+        if aggregate.extremes_stale:
+            aggregate.recompute_extremes(self.attempts_by_quiz.get(quiz_id, []))
+        return aggregate.to_dict()
+
+    def get_student_attempts(self, student_key: tuple) -> list:
+        """Returns the student's attempts across quizzes, in submission order."""
+        return list(self.attempts_by_student.get(student_key, {}).values())
+
+    def get_question_order(self, sort_field: str) -> list:
+        """
+        Returns all question ids sorted by QUESTION_SORT_KEYS[sort_field]
+        (ties in creation order). Built once per field until a question
+        changes; shared and read-only.
+        """
+        order = self._question_orders.get(sort_field)
+        if order is None:
+            key_func = QUESTION_SORT_KEYS[sort_field]
+            order = [
+                question_id
+                for question_id, _question in sorted(
+                    self.questions_by_id.items(), key=lambda item: key_func(item[1])
+                )
+            ]
+            self._question_orders[sort_field] = order
+        return order
+
+    def get_category_counts(self) -> list:
+        """
+        Returns [{"value": category label, "count": questions}] for every
+        non-empty category (case variants counted together), sorted by label.
+        Read from the category inverted index, so no question is visited.
+        """
+        counts = [
+            {"value": self.category_labels.get(category, category), "count": len(ids)}
+            for category, ids in self.question_ids_by_category.items()
+            if category and ids
+        ]
+        counts.sort(key=lambda entry: entry["value"].casefold())
+        return counts
+
+    def get_question_search(self) -> TextIndex:
+        """
+        Returns the full-text index over question text, option texts and
+        category (see question_search_text), building it on first use; after
+        that it is kept current by question_changed().
+        """
+        if self._question_search is None:
+            search_index = TextIndex()
+            for question_id, question in self.questions_by_id.items():
+                search_index.add(question_id, question_search_text(question))
+            self._question_search = search_index
+        return self._question_search
+
+    def get_question_duplicates(self) -> MinHashIndex:
+        """
+        Returns the near-duplicate index over question text and option texts
+        (see question_duplicate_parts), building it on first use; after that
+        it is kept current by question_changed().
+        """
+        if self._question_duplicates is None:
+            duplicate_index = MinHashIndex()
+            for question_id, question in self.questions_by_id.items():
+                duplicate_index.add(question_id, question_duplicate_parts(question))
+            self._question_duplicates = duplicate_index
+        return self._question_duplicates
+
+    def get_quiz_content_version(self, quiz_id) -> int | None:
+        """
+        Returns a number that changes whenever the quiz or any of its
+        questions changes (never reused within the process), or None.
+        """
+        return self.quiz_versions.get(str(quiz_id))
+
+    # --- Incremental maintenance ---
+    def _add_quiz(self, quiz: dict):
+        quiz_id = str(quiz.get("id"))
+        self.quizzes_by_id[quiz_id] = quiz
+        self.quiz_versions[quiz_id] = next(_content_versions)
+        self.active_quiz_count += not quiz.get("archived", False)
+        for question_id in quiz.get("questions") or []:
+            self.quiz_ids_by_question.setdefault(str(question_id), set()).add(quiz_id)
+        access_key = normalize_access_key(quiz.get("access_key"))
+        if access_key:
+            self.quiz_ids_by_access_key.setdefault(access_key, []).append(quiz_id)
+
+    def _remove_quiz(self, quiz: dict):
+        quiz_id = str(quiz.get("id"))
+        self.quizzes_by_id.pop(quiz_id, None)
+        self.quiz_versions.pop(quiz_id, None)
+        self.active_quiz_count -= not quiz.get("archived", False)
+        for question_id in quiz.get("questions") or []:
+            quiz_ids = self.quiz_ids_by_question.get(str(question_id))
+            if quiz_ids is not None:
+                quiz_ids.discard(quiz_id)
+                if not quiz_ids:
+                    del self.quiz_ids_by_question[str(question_id)]
+        access_key = normalize_access_key(quiz.get("access_key"))
+        quiz_ids = self.quiz_ids_by_access_key.get(access_key)
+        if quiz_ids and quiz_id in quiz_ids:
+            quiz_ids.remove(quiz_id)
+            if not quiz_ids:
+                del self.quiz_ids_by_access_key[access_key]
+
+    def quiz_changed(self, old_quiz: dict | None, new_quiz: dict | None):
+        """Records that old_quiz was replaced by new_quiz (either may be None)."""
+        if old_quiz is not None:
+            self._remove_quiz(old_quiz)
+        if new_quiz is not None:
+            self._add_quiz(new_quiz)
+
+    def _question_facets(self, question: dict):
+        """(inverted index, normalized value) pairs the question is listed under."""
+        return (
+            (
+                self.question_ids_by_category,
+                normalize_category(question.get("category")),
+            ),
+            (self.question_ids_by_type, normalize_question_type(question.get("type"))),
+            (
+                self.question_ids_by_difficulty,
+                normalize_difficulty(question.get("difficulty")),
+            ),
+        )
+
+    def _add_question(self, question: dict):
+        question_id = str(question.get("id"))
+        # Replacing an existing entry keeps its position (creation order)
+        self.questions_by_id[question_id] = question
+        for inverted_index, value in self._question_facets(question):
+            inverted_index.setdefault(value, set()).add(question_id)
+        category = str(question.get("category") or "").strip()
+        self.category_labels[normalize_category(category)] = category
+        if self._question_search is not None:
+            self._question_search.add(question_id, question_search_text(question))
+        if self._question_duplicates is not None:
+            self._question_duplicates.add(
+                question_id, question_duplicate_parts(question)
+            )
+
+    def _remove_question(self, question: dict, keep_entry: bool = False):
+        question_id = str(question.get("id"))
+        if not keep_entry:
+            self.questions_by_id.pop(question_id, None)
+        if self._question_search is not None:
+            self._question_search.remove(question_id)
+        if self._question_duplicates is not None:
+            self._question_duplicates.remove(question_id)
+        for inverted_index, value in self._question_facets(question):
+            question_ids = inverted_index.get(value)
+            if question_ids is not None:
+                question_ids.discard(question_id)
+                if not question_ids:
+                    del inverted_index[value]
+                    if inverted_index is self.question_ids_by_category:
+                        self.category_labels.pop(value, None)
+
+    def question_changed(self, old_question: dict | None, new_question: dict | None):
+        """Records that old_question was replaced by new_question (either may be None)."""
+        question_ids = set()
+        if old_question is not None:
+            question_ids.add(str(old_question.get("id")))
+            same_id = new_question is not None and str(new_question.get("id")) == str(
+                old_question.get("id")
+            )
+            self._remove_question(old_question, keep_entry=same_id)
+        if new_question is not None:
+            question_ids.add(str(new_question.get("id")))
+            self._add_question(new_question)
+        self._question_orders = {}  # Rebuilt on next use
+        # Quizzes using the question now have different content
+        for question_id in question_ids:
+            for quiz_id in self.quiz_ids_by_question.get(question_id, ()):
+                self.quiz_versions[quiz_id] = next(_content_versions)
+
+    def _aggregate_for(self, attempt: dict) -> ResultAggregate:
+        quiz_id = str(attempt.get("quiz_id"))
+        aggregate = self.result_aggregates.get(quiz_id)
+        if aggregate is None:
+            aggregate = self.result_aggregates[quiz_id] = ResultAggregate()
+        return aggregate
+
+    def _index_student_attempt(self, attempt: dict, keys=None):
+        attempt_id = str(attempt.get("attempt_id"))
+        for key in attempt_student_keys(attempt) if keys is None else keys:
+            self.attempts_by_student.setdefault(key, {})[attempt_id] = attempt
+
+    def _unindex_student_attempt(self, attempt: dict, keys):
+        attempt_id = str(attempt.get("attempt_id"))
+        for key in keys:
+            student_attempts = self.attempts_by_student.get(key)
+            if student_attempts is not None:
+                student_attempts.pop(attempt_id, None)
+                if not student_attempts:
+                    del self.attempts_by_student[key]
+
+    def _reindex_student_attempt(self, old: dict, new: dict):
+        """Replaces old by new; students in both keep the attempt's position."""
+        old_keys = attempt_student_keys(old)
+        new_keys = attempt_student_keys(new)
+        self._unindex_student_attempt(old, old_keys - new_keys)
+        self._index_student_attempt(new, new_keys)
+
+    def attempts_replaced(self, attempt_changes: list):
+        """Records that stored attempts were replaced: [(old, new), ...]."""
+        new_by_old = {id(old): new for old, new in attempt_changes}
+        for quiz_id in {str(old.get("quiz_id")) for old, _new in attempt_changes}:
+            self._timelines.pop(quiz_id, None)  # Rebuilt on next use
+            quiz_attempts = self.attempts_by_quiz.get(quiz_id)
+            if quiz_attempts:
+                self.attempts_by_quiz[quiz_id] = [
+                    new_by_old.get(id(attempt), attempt) for attempt in quiz_attempts
+                ]
+        for old, new in attempt_changes:
+            self._aggregate_for(old).remove(old)
+            self._aggregate_for(new).add(new)
+            self._reindex_student_attempt(old, new)
+            self.attempts_by_id[str(new.get("attempt_id"))] = new
+            for attempt in (old, new):
+                self.attempt_revisions[str(attempt.get("quiz_id"))] = next(
+                    _content_versions
+                )
+
+    def attempts_added(self, attempts: list):
+        """Records newly stored attempts."""
+        new_by_quiz = {}
+        for attempt in attempts:
+            if isinstance(attempt, dict):
+                quiz_id = str(attempt.get("quiz_id"))
+                self.attempts_by_quiz.setdefault(quiz_id, []).append(attempt)
+                self.attempts_by_id.setdefault(str(attempt.get("attempt_id")), attempt)
+                self._aggregate_for(attempt).add(attempt)
+                self._index_student_attempt(attempt)
+                new_by_quiz.setdefault(quiz_id, []).append(attempt)
+        # Attempts usually arrive newest last and are appended in place:
+        # views handed out earlier stop at their own length. An out-of-order
+        # attempt is inserted into copies, so those views are not shifted.
+        for quiz_id, new_attempts in new_by_quiz.items():
+            self.attempt_revisions[quiz_id] = next(_content_versions)
+            timeline = self._timelines.get(quiz_id)
+            if timeline is None:
+                continue
+            keys, timeline_attempts = timeline
+            for attempt in new_attempts:
+                key = attempt_sort_key(attempt)
+                if not keys or key <= keys[-1]:
+                    keys.append(key)
+                    timeline_attempts.append(attempt)
+                    continue
+                # Keys are descending: bisect their ascending view
+                position = len(keys) - bisect.bisect_left(
+                    NewestFirst(keys, len(keys)), key
+                )
+                keys, timeline_attempts = list(keys), list(timeline_attempts)
+                keys.insert(position, key)
+                timeline_attempts.insert(position, attempt)
+                self._timelines[quiz_id] = (keys, timeline_attempts)
@@ -0,0 +1,266 @@
+# src/core/jobs.py
+"""
+In-process background jobs for long exports, imports and regrades.
+
+Work submitted to the JobRunner runs on a small bounded thread pool instead
+of the request thread, so a waitress worker slot is freed immediately and the
+UI polls the job for progress. Threads (not processes) are used because jobs
+read the shared in-memory data snapshot and write through json_storage.
+
+Every job is a record in a job table kept in JOBS_FILE (rewritten atomically
+on each state change, progress updates at most every
+JOB_PROGRESS_SAVE_INTERVAL seconds). Jobs that were still queued or running
+when the process stopped are marked as failed on the next start. Result
+files go to JOB_RESULTS_DIR/<job id>/.
+"""
+
+import copy
+import datetime
+import json
+import os
+import shutil
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from core import json_storage
+
+# --- Job Configuration ---
+JOB_MAX_WORKERS = 2  # Jobs running at the same time
+JOB_MAX_PENDING = 20  # Queued + running jobs before new ones are refused
+JOB_HISTORY_LIMIT = 200  # Finished jobs kept in the table (oldest dropped)
+JOB_PROGRESS_SAVE_INTERVAL = 1.0  # Seconds between progress-only saves
+
+# Job statuses
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+FINISHED_STATUSES = (JOB_SUCCEEDED, JOB_FAILED)
+
+
+class JobQueueFull(RuntimeError):
+    """Raised by JobRunner.submit() when JOB_MAX_PENDING jobs are pending."""
+
+
+def _now_iso() -> str:
+    return datetime.datetime.now(datetime.timezone.utc).isoformat()
+
+
+class JobContext:
+    """Handed to a running job function to report progress and place files."""
+
+    def __init__(self, runner, job_id: str):
+        self._runner = runner
+        self.job_id = job_id
+
+    def set_progress(self, done: int, total: int | None = None, message=None):
+        """Reports progress as done out of total units (total may be unknown)."""
+        self._runner._update_progress(self.job_id, done, total, message)
+
+    def result_path(self, filename: str):
+        """Path for a result file of this job; the job's directory is created."""
+        result_dir = self._runner.results_dir() / self.job_id
+        result_dir.mkdir(parents=True, exist_ok=True)
+        return result_dir / os.path.basename(filename)
+
+
+class JobRunner:
+    """
+    Runs job functions on a bounded thread pool and tracks them in a
+    persisted job table.
+
+    A job function is called as func(context, *args) and returns a
+    JSON-serializable result (or None). If it produced a file it returns it
+    as {"result_file": path, ...}; the path is stored with the job.
+    """
+
+    def __init__(self, max_workers: int = JOB_MAX_WORKERS):
+        self._max_workers = max(1, int(max_workers))
+        self._executor = None
+        self._jobs = None  # job id -> record, loaded lazily
+        self._jobs_file = None  # JOBS_FILE the table was loaded from
+        self._last_progress_save = 0.0
+        self._lock = threading.Lock()
+
+    # --- Storage ---
+    def jobs_file(self):
+        return json_storage.JOBS_FILE
+
+    def results_dir(self):
+        return json_storage.JOB_RESULTS_DIR
+
+    def _load(self):
+        """Loads the table on first use (caller holds the lock)."""
+        jobs_file = self.jobs_file()
+        if self._jobs is not None and self._jobs_file == jobs_file:
+            return
+        self._jobs = {}
+        self._jobs_file = jobs_file
+        if jobs_file and jobs_file.exists():
+            try:
+                with open(jobs_file, "r", encoding="utf-8") as f:
+                    records = json.load(f).get("jobs", [])
+                self._jobs = {record["id"]: record for record in records}
+            except Exception as e:
+                print(f"ERROR [Jobs]: Could not read job table {jobs_file}: {e}")
+        interrupted = 0
+        for record in self._jobs.values():
+            if record.get("status") not in FINISHED_STATUSES:
+                record["status"] = JOB_FAILED
+                record["error"] = "Interrupted by a server restart."
+                record["finished_at"] = _now_iso()
+                interrupted += 1
+        if interrupted:
+            print(f"WARNING [Jobs]: Marked {interrupted} interrupted job(s) as failed.")
+            self._save()
+
+    def _save(self):
+        """Writes the table atomically (caller holds the lock)."""
+        jobs_file = self.jobs_file()
+        if not jobs_file:
+            return
+        try:
+            jobs_file.parent.mkdir(parents=True, exist_ok=True)
+            temp_file = jobs_file.with_name(jobs_file.name + ".tmp")
+            with open(temp_file, "w", encoding="utf-8") as f:
+                json.dump({"jobs": list(self._jobs.values())}, f, indent=2)
+            os.replace(temp_file, jobs_file)
+        except Exception as e:
+            print(f"ERROR [Jobs]: Could not save job table {jobs_file}: {e}")
+
+    def _prune(self):
+        """Drops the oldest finished jobs beyond JOB_HISTORY_LIMIT (lock held)."""
+        finished = [
+            record
+            for record in self._jobs.values()
+            if record.get("status") in FINISHED_STATUSES
+        ]
+        excess = len(finished) - JOB_HISTORY_LIMIT
+        if excess <= 0:
+            return
+        finished.sort(key=lambda record: record.get("created_at") or "")
+        for record in finished[:excess]:
+            del self._jobs[record["id"]]
+            shutil.rmtree(self.results_dir() / record["id"], ignore_errors=True)
+
+    # --- Public API ---
+    def submit(self, kind: str, func, *args, description: str = "") -> dict:
+        """
+        Queues func(context, *args) and returns a copy of the new job record.
+        Raises JobQueueFull when too many jobs are pending.
+        """
+        with self._lock:
+            self._load()
+            pending = sum(
+                record.get("status") not in FINISHED_STATUSES
+                for record in self._jobs.values()
+            )
+            if pending >= JOB_MAX_PENDING:
+                raise JobQueueFull(
+                    f"Too many background jobs pending ({pending}). Try again later."
+                )
+            job_id = str(uuid.uuid4())
+            record = {
+                "id": job_id,
+                "kind": kind,
+                "description": description,
+                "status": JOB_QUEUED,
+                "progress": {"done": 0, "total": None, "message": None},
+                "result": None,
+                "result_file": None,
+                "error": None,
+                "created_at": _now_iso(),
+                "started_at": None,
+                "finished_at": None,
+            }
+            self._jobs[job_id] = record
+            self._prune()
+            self._save()
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self._max_workers, thread_name_prefix="quizpy-job"
+                )
+            self._executor.submit(self._run, job_id, func, args)
+            print(f"DEBUG [Jobs]: Queued {kind} job {job_id}.")
+            return copy.deepcopy(record)
+
+    def get(self, job_id) -> dict | None:
+        """Returns a copy of the job record, or None."""
+        with self._lock:
+            self._load()
+            record = self._jobs.get(str(job_id))
+            return copy.deepcopy(record) if record is not None else None
+
+    def list_jobs(self, limit: int = 50) -> list:
+        """Returns copies of the most recent jobs, newest first."""
+        with self._lock:
+            self._load()
+            records = sorted(
+                self._jobs.values(),
+                key=lambda record: record.get("created_at") or "",
+                reverse=True,
+            )
+            return copy.deepcopy(records[:limit])
+
+    def wait(self, job_id, timeout: float = 30.0) -> dict | None:
+        """Blocks until the job has finished (or timeout); returns its record."""
+        deadline = time.monotonic() + timeout
+        while True:
+            record = self.get(job_id)
+            if record is None or record["status"] in FINISHED_STATUSES:
+                return record
+            if time.monotonic() >= deadline:
+                return record
+            time.sleep(0.02)
+
+    # --- Worker side ---
+    def _update(self, job_id: str, **fields):
+        with self._lock:
+            self._load()
+            record = self._jobs.get(job_id)
+            if record is None:
+                return
+            record.update(fields)
+            self._save()
+
+    def _update_progress(self, job_id: str, done, total, message):
+        with self._lock:
+            record = (self._jobs or {}).get(job_id)
+            if record is None:
+                return
+            record["progress"] = {"done": done, "total": total, "message": message}
+            # Progress lives in memory; the table is only rewritten now and then
+            now = time.monotonic()
+            if now - self._last_progress_save >= JOB_PROGRESS_SAVE_INTERVAL:
+                self._last_progress_save = now
+                self._save()
+
+    def _run(self, job_id: str, func, args):
+        self._update(job_id, status=JOB_RUNNING, started_at=_now_iso())
+        try:
+            result = func(JobContext(self, job_id), *args)
+            result_file = None
+            if isinstance(result, dict) and result.get("result_file"):
+                result = dict(result)
+                result_file = str(result.pop("result_file"))
+            self._update(
+                job_id,
+                status=JOB_SUCCEEDED,
+                result=result,
+                result_file=result_file,
+                finished_at=_now_iso(),
+            )
+            print(f"DEBUG [Jobs]: Job {job_id} succeeded.")
+        except Exception as e:
+            print(f"ERROR [Jobs]: Job {job_id} failed: {e}")
+            traceback.print_exc()
+            self._update(
+                job_id, status=JOB_FAILED, error=str(e), finished_at=_now_iso()
+            )
+
+
+# Process-wide runner used by the API views
+job_runner = JobRunner()
@@ -8,9 +8,13 @@ from source or as a packaged executable (e.g., PyInstaller).
 import json
 import os
 import sys
+import threading
 from pathlib import Path
 import copy  # For returning copies safely
 
+from core.storage_backend import StorageBackend
+from core.indexes import DataIndex, normalize_student_key, question_duplicate_parts
+
 # --- Path Determination Logic ---
 
 
@@ -69,13 +73,22 @@ try:
     DATA_DIR = BASE_DIR / "data"
     # Define the main data file path
     DATA_FILE = DATA_DIR / "quiz_data.json"
+    # Append-only journal of submitted attempts (one JSON object per line),
+    # folded back into DATA_FILE by save_data()/compact_attempt_log()
+    ATTEMPT_LOG_FILE = DATA_DIR / "attempts.jsonl"
+    # Database used when QUIZPY_STORAGE_BACKEND=sqlite (see get_storage_backend)
+    SQLITE_DATA_FILE = DATA_DIR / "quiz_data.sqlite3"
     # Define the main media directory path
     MEDIA_DIR = DATA_DIR / "media"  # Used by get_media_dir helper
+    # Background job table and job result files (see core.jobs)
+    JOBS_FILE = DATA_DIR / "jobs.json"
+    JOB_RESULTS_DIR = DATA_DIR / "job_results"
 
     # Ensure data directory exists (create if needed)
     DATA_DIR.mkdir(parents=True, exist_ok=True)
     print(f"INFO [json_storage]: Data directory ensured at: {DATA_DIR}")
     print(f"INFO [json_storage]: Data file path set to: {DATA_FILE}")
+    print(f"INFO [json_storage]: Attempt log path set to: {ATTEMPT_LOG_FILE}")
     print(f"INFO [json_storage]: Media directory path set to: {MEDIA_DIR}")
 
 except Exception as e:
@@ -85,7 +98,11 @@ except Exception as e:
     # Set paths to None to indicate failure, functions below will handle this
     DATA_DIR = None
     DATA_FILE = None
+    ATTEMPT_LOG_FILE = None
+    SQLITE_DATA_FILE = None
     MEDIA_DIR = None
+    JOBS_FILE = None
+    JOB_RESULTS_DIR = None
 
 
 # --- Function to get media directory (used by views) ---
@@ -108,15 +125,128 @@ def get_media_dir() -> Path | None:
         return None
 
 
-# --- Function to load data ---
-def load_data() -> dict:
+# --- Storage locks ---
+# Serialises every write to the storage backend (attempt appends, full saves,
+# record changes) and keeps snapshot reloads from interleaving with them
+_backend_lock = threading.Lock()
+# Serialises every change to quizzes/questions (and full saves) so concurrent
+# writers can no longer overwrite each other's load-modify-save cycles
+_write_lock = threading.RLock()
+
+# --- In-process snapshot cache ---
+# load_data() always hands back a freshly parsed dict because callers mutate it
+# before calling save_data(). Read-only callers (student access, GET endpoints,
+# exports) use get_data_snapshot() instead, which shares one parsed copy until
+# the backend's signature changes or save_data() bumps the generation counter.
+_snapshot_lock = threading.Lock()
+_snapshot_data = None
+_snapshot_signature = None
+_data_generation = 0
+# Hash indexes over _snapshot_data, built on first lookup (see get_data_index)
+_snapshot_index = None
+
+
+def _default_data() -> dict:
+    """Returns a fresh copy of the empty top-level data structure."""
+    return {"quizzes": [], "questions": [], "attempts": []}
+
+
+def _file_stat_signature(path) -> tuple:
+    """Returns (path, mtime_ns, size) for path, with None for missing files."""
+    try:
+        stat_result = os.stat(path)
+        return (str(path), stat_result.st_mtime_ns, stat_result.st_size)
+    except (OSError, TypeError):
+        return (str(path), None, None)
+
+
+# --- Attempt log (append-only journal of the JSON backend) ---
+def _read_attempt_log() -> list:
+    """
+    Reads all attempts recorded in ATTEMPT_LOG_FILE.
+    Blank lines are ignored; a corrupt line (e.g. a write torn by a crash)
+    is skipped with a warning instead of discarding the whole log.
+    """
+    if not ATTEMPT_LOG_FILE or not ATTEMPT_LOG_FILE.exists():
+        return []
+    attempts = []
+    try:
+        with open(ATTEMPT_LOG_FILE, "r", encoding="utf-8") as f:
+            for line_number, line in enumerate(f, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    attempt = json.loads(line)
+                except json.JSONDecodeError as e:
+                    print(
+                        f"WARNING [json_storage _read_attempt_log]: Skipping corrupt line {line_number} in {ATTEMPT_LOG_FILE}: {e}"
+                    )
+                    continue
+                if isinstance(attempt, dict):
+                    attempts.append(attempt)
+    except Exception as e:
+        print(
+            f"ERROR [json_storage _read_attempt_log]: Failed to read {ATTEMPT_LOG_FILE}: {e}"
+        )
+    return attempts
+
+
+def _merge_attempt_log(data: dict) -> dict:
+    """
+    Appends attempts from the log that are not yet in data["attempts"]
+    (matched by attempt_id) and returns data. Attempts can appear in both
+    places if the process stopped between folding and truncating the log.
+    """
+    logged_attempts = _read_attempt_log()
+    if not logged_attempts:
+        return data
+    known_ids = {
+        attempt.get("attempt_id")
+        for attempt in data["attempts"]
+        if isinstance(attempt, dict)
+    }
+    for attempt in logged_attempts:
+        if attempt.get("attempt_id") not in known_ids:
+            data["attempts"].append(attempt)
+            known_ids.add(attempt.get("attempt_id"))
+    return data
+
+
+def _append_to_attempt_log(attempts: list):
+    """
+    Appends attempts to ATTEMPT_LOG_FILE (one JSON line each) and fsyncs.
+    The cost depends only on the size of the new attempts.
+    """
+    if not ATTEMPT_LOG_FILE:
+        raise RuntimeError("ATTEMPT_LOG_FILE path not set. Cannot record attempts.")
+    lines = "".join(
+        json.dumps(attempt, ensure_ascii=False, separators=(",", ":")) + "\n"
+        for attempt in attempts
+    )
+    ATTEMPT_LOG_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with open(ATTEMPT_LOG_FILE, "a+b") as f:
+        # Terminate a line torn by an earlier crash so it cannot swallow
+        # the first attempt written now
+        f.seek(0, os.SEEK_END)
+        if f.tell() > 0:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                lines = "\n" + lines
+        f.write(lines.encode("utf-8"))
+        f.flush()
+        os.fsync(f.fileno())
+
+
+# --- JSON file backend (default) ---
+def _load_data_file() -> dict:
     """
     Loads and parses data from the JSON file defined by DATA_FILE.
     Returns a default structure containing empty lists for quizzes,
     questions, and attempts if the file doesn't exist, is empty, or is invalid.
     """
     # Define the default structure to return on failure
-    default_data = {"quizzes": [], "questions": [], "attempts": []}
+    default_data = _default_data()
 
     if not DATA_FILE:  # Check if path resolution failed earlier
         print(
@@ -176,18 +306,233 @@ def load_data() -> dict:
         return copy.deepcopy(default_data)  # Return copy
 
 
+def _write_data_file(data: dict):
+    """
+    Writes data to DATA_FILE, folding in attempts still pending in
+    ATTEMPT_LOG_FILE and truncating the log afterwards. The file is written
+    to a temp file and swapped in, so a crash never leaves it half-written.
+    Raises on failure; does not touch the snapshot cache.
+    """
+    if not DATA_FILE:
+        raise RuntimeError("DATA_FILE path not set. Cannot save.")
+    # Ensure parent directory exists before writing (belt-and-suspenders)
+    DATA_FILE.parent.mkdir(parents=True, exist_ok=True)
+
+    # Fold pending log entries into a shallow copy so the caller's
+    # dict is left untouched and no logged attempt is dropped.
+    data_to_write = dict(data)
+    data_to_write["attempts"] = list(data.get("attempts", []))
+    _merge_attempt_log(data_to_write)
+
+    # Write with UTF-8 encoding and indentation
+    temp_file = DATA_FILE.with_name(DATA_FILE.name + ".tmp")
+    with open(temp_file, "w", encoding="utf-8") as f:
+        json.dump(data_to_write, f, indent=2, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_file, DATA_FILE)
+
+    # Everything in the log is now in DATA_FILE
+    if ATTEMPT_LOG_FILE and ATTEMPT_LOG_FILE.exists():
+        with open(ATTEMPT_LOG_FILE, "w", encoding="utf-8"):
+            pass
+
+
+class JsonFileStorageBackend(StorageBackend):
+    """
+    Stores everything in DATA_FILE (quiz_data.json) plus the append-only
+    ATTEMPT_LOG_FILE journal for new attempts. Paths are read from the module
+    at call time so they can be redirected (e.g. by the test fixtures).
+    """
+
+    name = "json"
+
+    def load(self) -> dict:
+        return _merge_attempt_log(_load_data_file())
+
+    def save(self, data: dict):
+        _write_data_file(data)
+
+    def append_attempts(self, attempts: list):
+        _append_to_attempt_log(attempts)
+
+    def signature(self) -> tuple:
+        # Missing files report None for mtime/size so that creating them
+        # later still changes the signature
+        return (
+            _file_stat_signature(DATA_FILE),
+            _file_stat_signature(ATTEMPT_LOG_FILE),
+        )
+
+    def compact(self):
+        self.save(self.load())
+
+
+# --- Backend selection ---
+# "json" (default) or "sqlite"; read once, on first use
+STORAGE_BACKEND_ENV_VAR = "QUIZPY_STORAGE_BACKEND"
+_storage_backend = None
+
+
+def get_storage_backend() -> StorageBackend:
+    """
+    Returns the process-wide storage backend, creating it on first use from
+    the QUIZPY_STORAGE_BACKEND environment variable ("json" or "sqlite").
+    """
+    global _storage_backend
+    if _storage_backend is None:
+        backend_name = os.environ.get(STORAGE_BACKEND_ENV_VAR, "json").strip().lower()
+        if backend_name == "sqlite":
+            from core.sqlite_storage import SqliteStorageBackend
+
+            _storage_backend = SqliteStorageBackend(SQLITE_DATA_FILE)
+        else:
+            if backend_name != "json":
+                print(
+                    f"WARNING [json_storage]: Unknown storage backend '{backend_name}'. Using JSON file storage."
+                )
+            _storage_backend = JsonFileStorageBackend()
+        print(f"INFO [json_storage]: Using '{_storage_backend.name}' storage backend.")
+    return _storage_backend
+
+
+def set_storage_backend(backend: StorageBackend):
+    """Replaces the storage backend (e.g. for migrations or tests)."""
+    global _storage_backend
+    with _write_lock:
+        _storage_backend = backend
+        invalidate_data_cache()
+
+
+# --- Snapshot cache ---
+def _data_file_signature() -> tuple:
+    """
+    Returns the backend's signature plus the generation counter. The
+    snapshot is valid only while this value is unchanged.
+    """
+    return (get_storage_backend().signature(), _data_generation)
+
+
+def get_data_generation() -> int:
+    """Returns the in-process generation counter (bumped on every save)."""
+    return _data_generation
+
+
+def invalidate_data_cache():
+    """
+    Drops the cached snapshot and bumps the generation counter so the next
+    get_data_snapshot() call re-reads the stored data.
+    """
+    global _snapshot_data, _snapshot_signature, _data_generation, _snapshot_index
+    with _snapshot_lock:
+        _data_generation += 1
+        _snapshot_data = None
+        _snapshot_signature = None
+        _snapshot_index = None
+
+
+def get_data_snapshot() -> dict:
+    """
+    Returns the process-wide cached snapshot of the stored data, re-reading
+    it only when the backend's signature or the generation counter changed.
+
+    The returned dict is SHARED between all callers and must be treated as
+    read-only. Use load_data() when the data is going to be modified.
+    """
+    global _snapshot_data, _snapshot_signature, _snapshot_index
+    with _snapshot_lock:
+        signature = _data_file_signature()
+        if _snapshot_data is not None and _snapshot_signature == signature:
+            return _snapshot_data
+        # The signature is re-taken before reading, so the parsed data is never
+        # older than the signature it is stored under. Writes are held off
+        # while reading so an attempt cannot be both read here and added later.
+        with _backend_lock:
+            signature = _data_file_signature()
+            print(
+                f"DEBUG [json_storage get_data_snapshot]: Cache miss, loading from '{get_storage_backend().name}' backend."
+            )
+            _snapshot_data = load_data()
+            _snapshot_signature = signature
+            _snapshot_index = None
+            return _snapshot_data
+
+
+def get_data_index() -> DataIndex:
+    """
+    Returns the hash indexes (id -> quiz/question, access key -> quiz,
+    quiz id -> attempts) for the current snapshot, building them on first
+    use. They are kept up to date incrementally by commit_changes() and
+    append_attempts_to_log(). Shared and read-only, like the snapshot.
+    """
+    global _snapshot_index
+    data = get_data_snapshot()
+    with _snapshot_lock:
+        if _snapshot_index is None or _snapshot_index.source is not data:
+            print("DEBUG [json_storage get_data_index]: Building data indexes.")
+            _snapshot_index = DataIndex(data)
+        return _snapshot_index
+
+
+# --- Attempts ---
+def append_attempts_to_log(attempts: list):
+    """
+    Durably records new attempts through the backend (for the JSON backend:
+    appended to ATTEMPT_LOG_FILE and fsynced), so the write cost depends only
+    on the size of the new attempts, not on how many are already stored.
+    A current cached snapshot is extended in place instead of being dropped.
+    Raises on failure: callers must not acknowledge an attempt that was not
+    persisted.
+    """
+    global _snapshot_signature
+    if not attempts:
+        return
+    with _backend_lock:
+        signature_before = _data_file_signature()
+        get_storage_backend().append_attempts(attempts)
+        signature_after = _data_file_signature()
+
+    with _snapshot_lock:
+        # Only extend the snapshot if it reflected the store right before our
+        # append; otherwise leave it for the next reader to reload.
+        if _snapshot_data is not None and _snapshot_signature == signature_before:
+            _snapshot_data["attempts"].extend(attempts)
+            _snapshot_signature = signature_after
+            if _snapshot_index is not None and _snapshot_index.source is _snapshot_data:
+                _snapshot_index.attempts_added(attempts)
+
+
+def compact_attempt_log():
+    """
+    Folds every attempt in ATTEMPT_LOG_FILE back into DATA_FILE and empties
+    the log. Costs one full rewrite of DATA_FILE; run it off-peak.
+    """
+    print("INFO [json_storage compact_attempt_log]: Compacting attempt log...")
+    with _write_lock:
+        with _backend_lock:
+            get_storage_backend().compact()
+        invalidate_data_cache()
+
+
+# --- Function to load data ---
+def load_data() -> dict:
+    """
+    Loads the complete data from the storage backend (for the JSON backend:
+    DATA_FILE merged with attempts still pending in ATTEMPT_LOG_FILE).
+    Always returns a new dict that the caller is free to modify; see
+    get_data_snapshot() for the cached read-only variant.
+    """
+    return get_storage_backend().load()
+
+
 # --- Function to save data ---
 def save_data(data: dict):
     """
-    Saves the provided dictionary data to the JSON file defined by DATA_FILE.
-    Uses UTF-8 encoding and pretty-printing (indent=2).
+    Saves the provided dictionary data through the storage backend (for the
+    JSON backend: DATA_FILE, UTF-8, pretty-printed with indent=2, replaced
+    atomically, with pending ATTEMPT_LOG_FILE entries folded in).
     Performs basic check to ensure data is a dictionary.
     """
-    if not DATA_FILE:  # Check if path resolution failed
-        print("ERROR [json_storage save_data]: DATA_FILE path not set. Cannot save.")
-        # Optionally raise an exception here
-        return
-
     if not isinstance(data, dict):
         print(
             f"ERROR [json_storage save_data]: Invalid data type provided for saving (expected dict, got {type(data)}). Aborting save."
@@ -195,12 +540,11 @@ def save_data(data: dict):
         return
 
     try:
-        # Ensure parent directory exists before writing (belt-and-suspenders)
-        DATA_FILE.parent.mkdir(parents=True, exist_ok=True)
-
-        # Write with UTF-8 encoding and indentation
-        with open(DATA_FILE, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        with _write_lock:
+            with _backend_lock:
+                get_storage_backend().save(data)
+            # Any cached snapshot is now stale (mtime may not change on coarse clocks)
+            invalidate_data_cache()
         # print(f"INFO [json_storage save_data]: Successfully saved data to {DATA_FILE}") # Can be verbose
 
     except TypeError as e:
@@ -210,9 +554,363 @@ def save_data(data: dict):
         )
         # Consider logging details about the non-serializable object if possible without printing huge data
     except Exception as e:
-        print(
-            f"ERROR [json_storage save_data]: Failed to save data to {DATA_FILE}: {e}"
-        )
+        print(f"ERROR [json_storage save_data]: Failed to save data: {e}")
         import traceback
 
         traceback.print_exc()  # Log full traceback
+
+
+# --- Fine-grained, lock-protected mutations ---
+# Each operation runs under _write_lock, starts from the current snapshot and
+# builds the next one copy-on-write: only the affected records and the lists
+# holding them are replaced, so readers holding the previous snapshot keep a
+# consistent view. The new snapshot is persisted and installed as the cache
+# (no re-parse), and the changed records are returned to the caller.
+
+
+def _install_snapshot(
+    data: dict,
+    written_signature: tuple,
+    quiz_changes: list = (),
+    question_changes: list = (),
+    attempt_changes: list = (),
+):
+    """
+    Makes data the cached snapshot after it has been persisted and applies
+    the (old, new) record pairs to the current index. If anything else was
+    written since (the signature moved on from written_signature), the
+    snapshot is dropped instead so the next reader reloads the store.
+    """
+    global _snapshot_data, _snapshot_signature, _data_generation, _snapshot_index
+    with _snapshot_lock:
+        _data_generation += 1
+        previous_data = _snapshot_data
+        if _data_file_signature()[0] != written_signature[0]:
+            _snapshot_data = None
+            _snapshot_signature = None
+            _snapshot_index = None
+            return
+        _snapshot_data = data
+        _snapshot_signature = _data_file_signature()
+        if _snapshot_index is not None and _snapshot_index.source is previous_data:
+            for old_quiz, new_quiz in quiz_changes:
+                _snapshot_index.quiz_changed(old_quiz, new_quiz)
+            for old_question, new_question in question_changes:
+                _snapshot_index.question_changed(old_question, new_question)
+            if attempt_changes:
+                _snapshot_index.attempts_replaced(attempt_changes)
+            _snapshot_index.source = data
+        else:
+            _snapshot_index = None
+
+
+def _replace_records(records: list, upserts: list, deleted_ids: set) -> list:
+    """
+    Returns a new list where records whose id is in deleted_ids are dropped,
+    records matching an upsert's id are replaced in place and the remaining
+    upserts are appended.
+    """
+    upserts_by_id = {str(record.get("id")): record for record in upserts}
+    new_records = []
+    for record in records:
+        record_id = str(record.get("id"))
+        if record_id in deleted_ids:
+            continue
+        new_records.append(upserts_by_id.pop(record_id, record))
+    new_records.extend(upserts_by_id.values())
+    return new_records
+
+
+def commit_changes(
+    quizzes: list = (),
+    questions: list = (),
+    deleted_quiz_ids: list = (),
+    deleted_question_ids: list = (),
+    attempts: list = (),
+):
+    """
+    Atomically applies a set of record changes and persists them once.
+    quizzes/questions are complete records upserted by their "id";
+    deleted_*_ids are removed; attempts replace stored attempts with the
+    same "attempt_id" (unknown ids are ignored). Raises if the data could
+    not be written.
+    """
+    deleted_quiz_ids = {str(quiz_id) for quiz_id in deleted_quiz_ids}
+    deleted_question_ids = {str(question_id) for question_id in deleted_question_ids}
+    with _write_lock:
+        current = get_data_snapshot()
+        with _snapshot_lock:
+            # The store state current reflects; appends extend current in
+            # place before moving _snapshot_signature on, so an append after
+            # this point shows up as a signature change below
+            read_signature = _snapshot_signature if _snapshot_data is current else None
+        index = get_data_index()
+        # (old, new) pairs used to update the indexes incrementally
+        quiz_changes = [(index.get_quiz(quiz.get("id")), quiz) for quiz in quizzes]
+        quiz_changes += [
+            (index.get_quiz(quiz_id), None) for quiz_id in deleted_quiz_ids
+        ]
+        question_changes = [
+            (index.get_question(question.get("id")), question) for question in questions
+        ]
+        question_changes += [
+            (index.get_question(question_id), None)
+            for question_id in deleted_question_ids
+        ]
+        attempt_changes = []
+        if attempts:
+            attempts_by_id = {str(a.get("attempt_id")): a for a in attempts}
+            new_attempts = []
+            for attempt in current["attempts"]:
+                replacement = attempts_by_id.get(str(attempt.get("attempt_id")))
+                if replacement is not None:
+                    attempt_changes.append((attempt, replacement))
+                    attempt = replacement
+                new_attempts.append(attempt)
+        new_data = dict(current)  # attempts list is shared unless replaced
+        if attempt_changes:
+            new_data["attempts"] = new_attempts
+        if quizzes or deleted_quiz_ids:
+            new_data["quizzes"] = _replace_records(
+                current["quizzes"], list(quizzes), deleted_quiz_ids
+            )
+        if questions or deleted_question_ids:
+            new_data["questions"] = _replace_records(
+                current["questions"], list(questions), deleted_question_ids
+            )
+        with _backend_lock:
+            # Attempts appended since current was read are folded into the
+            # store by the backend but are missing from new_data (e.g. from
+            # a replacement attempts list built above)
+            store_moved_on = _data_file_signature() != read_signature
+            get_storage_backend().apply_changes(
+                new_data,
+                quizzes=list(quizzes),
+                questions=list(questions),
+                deleted_quiz_ids=deleted_quiz_ids,
+                deleted_question_ids=deleted_question_ids,
+                attempts=[new for _old, new in attempt_changes],
+            )
+            written_signature = _data_file_signature()
+        if store_moved_on:
+            # Installing new_data would hide (and a later save would drop)
+            # those attempts; the next reader reloads the store instead
+            print(
+                "DEBUG [json_storage commit_changes]: Store changed during commit, dropping cached snapshot."
+            )
+            invalidate_data_cache()
+            return
+        _install_snapshot(
+            new_data, written_signature, quiz_changes, question_changes, attempt_changes
+        )
+
+
+# --- Indexed lookups (read-only records from the snapshot) ---
+def get_quiz(quiz_id) -> dict | None:
+    """Returns the quiz with quiz_id, or None."""
+    return get_data_index().get_quiz(quiz_id)
+
+
+def get_question(question_id) -> dict | None:
+    """Returns the question with question_id, or None."""
+    return get_data_index().get_question(question_id)
+
+
+def find_quiz_by_access_key(access_key) -> dict | None:
+    """Returns the quiz using access_key (case-insensitive), or None."""
+    return get_data_index().find_quiz_by_access_key(access_key)
+
+
+def get_quiz_questions(quiz: dict) -> list:
+    """Returns the quiz's questions in the quiz's own order."""
+    return get_data_index().get_quiz_questions(quiz)
+
+
+def get_attempt(attempt_id) -> dict | None:
+    """Returns the stored attempt with attempt_id, or None."""
+    return get_data_index().get_attempt(attempt_id)
+
+
+def get_attempts_for_quiz(quiz_id) -> list:
+    """Returns the quiz's attempts in submission order."""
+    return list(get_data_index().get_attempts_for_quiz(quiz_id))
+
+
+def get_attempt_timeline(quiz_id) -> tuple:
+    """
+    Returns (sort keys, attempts) for the quiz, newest first; see
+    DataIndex.get_attempt_timeline(). Shared and read-only.
+    """
+    # Built (on first use) under the snapshot lock, so an attempt appended
+    # meanwhile cannot be left out of the installed timeline
+    return read_data_index(lambda index: index.get_attempt_timeline(quiz_id))
+
+
+def get_attempt_revision(quiz_id) -> int | None:
+    """Returns a number that changes whenever the quiz's attempts change."""
+    return get_data_index().get_attempt_revision(quiz_id)
+
+
+def get_quiz_result_stats(quiz_id) -> dict:
+    """Returns running result statistics for the quiz (see core.aggregates)."""
+    # Stale min/max are recomputed into the shared aggregate, so this reads
+    # and writes it with appends and commits held off
+    return read_data_index(lambda index: index.get_result_stats(quiz_id))
+
+
+def get_summary_counts() -> dict:
+    """Returns store-wide counts for the teacher dashboard."""
+    index = get_data_index()
+    return {
+        "active_quizzes": index.active_quiz_count,
+        "questions": len(index.questions_by_id),
+        "attempts": len(get_data_snapshot()["attempts"]),
+    }
+
+
+def get_student_history(student_id, name, student_class) -> list:
+    """
+    Returns every attempt of the student (matched on normalized id, name and
+    class) across all quizzes, in submission order. The list is the
+    caller's; the attempts are shared and read-only.
+    """
+    key = normalize_student_key(student_id, name, student_class)
+    if key is None:
+        return []
+    # Copied from the live per-student dict, so writers are held off meanwhile
+    return read_data_index(lambda index: index.get_student_attempts(key))
+
+
+def read_data_index(reader):
+    """
+    Returns reader(index) for the current DataIndex, called under the
+    snapshot lock so commits and attempt appends cannot change the index
+    while reader iterates its dicts and sets. reader must not call other
+    functions of this module that take the lock (e.g. search_questions()).
+    """
+    index = get_data_index()
+    with _snapshot_lock:
+        return reader(index)
+
+
+def get_question_categories() -> list:
+    """
+    Returns the category registry: [{"value", "count"}] per non-empty
+    category, kept current by commit_changes() (see DataIndex).
+    """
+    index = get_data_index()
+    with _snapshot_lock:
+        return index.get_category_counts()
+
+
+def find_similar_questions(question: dict, exclude_ids=()) -> list:
+    """
+    Returns [(question id, estimated similarity)] of the stored questions
+    that are near-duplicates of question (which need not be stored), most
+    similar first. Uses the LSH buckets of the duplicate index, so only
+    likely matches are compared.
+    """
+    index = get_data_index()
+    with _snapshot_lock:
+        duplicate_index = index.get_question_duplicates()
+        signature = duplicate_index.signature(question_duplicate_parts(question))
+        return duplicate_index.similar(signature, exclude={str(i) for i in exclude_ids})
+
+
+def search_questions(query: str, candidates=None) -> list:
+    """
+    Full-text search of the question bank: [(question id, BM25 score)], best
+    first. candidates (a set of ids) limits the questions considered. Runs
+    under the snapshot lock, as the text index is built on first use and
+    updated by commit_changes().
+    """
+    index = get_data_index()
+    with _snapshot_lock:
+        return index.get_question_search().search(query, candidates)
+
+
+def get_quiz_content_version(quiz_id) -> int | None:
+    """Returns the quiz's content version (see core.indexes), or None."""
+    return get_data_index().get_quiz_content_version(quiz_id)
+
+
+def append_attempt(attempt: dict):
+    """
+    Durably records one attempt. Appends never conflict with record changes,
+    so this only takes the attempt log lock.
+    """
+    append_attempts_to_log([attempt])
+
+
+def add_quiz(quiz: dict) -> dict:
+    """Adds a new quiz record and returns it."""
+    commit_changes(quizzes=[quiz])
+    return quiz
+
+
+def update_quiz(quiz_id, patch: dict) -> dict | None:
+    """
+    Applies patch (top-level fields) to the quiz and returns the updated
+    record, or None if the quiz does not exist. The id cannot be changed.
+    """
+    with _write_lock:
+        quiz = get_quiz(quiz_id)
+        if quiz is None:
+            return None
+        updated_quiz = {**quiz, **patch, "id": quiz.get("id")}
+        commit_changes(quizzes=[updated_quiz])
+        return updated_quiz
+
+
+def delete_quiz(quiz_id) -> dict | None:
+    """Removes the quiz and returns the deleted record, or None if missing."""
+    with _write_lock:
+        quiz = get_quiz(quiz_id)
+        if quiz is None:
+            return None
+        commit_changes(deleted_quiz_ids=[quiz_id])
+        return quiz
+
+
+def set_access_key(quiz_id, access_key: str) -> dict | None:
+    """Sets a quiz's access key and returns the updated quiz, or None."""
+    return update_quiz(quiz_id, {"access_key": access_key})
+
+
+def write_transaction():
+    """
+    Returns the record write lock as a context manager, for callers that
+    read, validate and then commit several records as one unit. It is
+    reentrant, so commit_changes() and the helpers below work inside it.
+    """
+    return _write_lock
+
+
+def add_question(question: dict) -> dict:
+    """Adds a new question record and returns it."""
+    commit_changes(questions=[question])
+    return question
+
+
+def update_question(question_id, patch: dict) -> dict | None:
+    """
+    Applies patch (top-level fields) to the question and returns the updated
+    record, or None if the question does not exist.
+    """
+    with _write_lock:
+        question = get_question(question_id)
+        if question is None:
+            return None
+        updated_question = {**question, **patch, "id": question.get("id")}
+        commit_changes(questions=[updated_question])
+        return updated_question
+
+
+def delete_question(question_id) -> dict | None:
+    """Removes the question and returns the deleted record, or None if missing."""
+    with _write_lock:
+        question = get_question(question_id)
+        if question is None:
+            return None
+        commit_changes(deleted_question_ids=[question_id])
+        return question
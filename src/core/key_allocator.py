@@ -0,0 +1,104 @@
+# src/core/key_allocator.py
+"""
+Allocation of unique quiz access keys.
+
+Keys are drawn with `secrets` and checked against the access key index of the
+cached snapshot (see core.indexes) plus the keys currently reserved by other
+requests, so uniqueness costs a couple of set lookups instead of a scan of
+all quizzes. A reservation lasts until the quiz using the key has been
+committed, at which point the index itself holds the key.
+"""
+
+import secrets
+import string
+import threading
+from contextlib import contextmanager
+
+from core import json_storage
+from core.indexes import normalize_access_key
+
+# --- Key Configuration ---
+ACCESS_KEY_LENGTH = 6
+ACCESS_KEY_ALPHABET = string.ascii_uppercase + string.digits
+ACCESS_KEY_MAX_ATTEMPTS = 100  # Random draws per key before giving up
+
+
+class AccessKeyAllocator:
+    """
+    Hands out access keys that are neither used by a stored quiz nor
+    reserved by a pending request in this process.
+
+    active_keys_func returns a container of the (normalized) keys in use;
+    it is looked up on every allocation so it always reflects the latest
+    snapshot.
+    """
+
+    def __init__(
+        self,
+        active_keys_func,
+        length: int = ACCESS_KEY_LENGTH,
+        alphabet: str = ACCESS_KEY_ALPHABET,
+    ):
+        self._active_keys_func = active_keys_func
+        self._length = length
+        self._alphabet = alphabet
+        self._reserved = set()
+        self._lock = threading.Lock()
+
+    def _draw(self) -> str:
+        return "".join(secrets.choice(self._alphabet) for _ in range(self._length))
+
+    def allocate(self, count: int = 1) -> list:
+        """
+        Reserves and returns count distinct unused keys. The caller must
+        release() them once the quizzes using them are committed (or on
+        failure). Raises RuntimeError if the key space looks exhausted.
+        """
+        active_keys = self._active_keys_func()
+        keys = []
+        with self._lock:
+            for _ in range(count):
+                for _attempt in range(ACCESS_KEY_MAX_ATTEMPTS):
+                    key = self._draw()
+                    if key not in active_keys and key not in self._reserved:
+                        break
+                else:
+                    self._reserved.difference_update(keys)
+                    raise RuntimeError(
+                        "Could not allocate a unique access key; the key space is nearly full."
+                    )
+                self._reserved.add(key)
+                keys.append(key)
+        print(f"DEBUG [KeyAllocator]: Allocated {len(keys)} access key(s).")
+        return keys
+
+    def release(self, keys):
+        """Drops reservations; committed keys stay taken through the index."""
+        with self._lock:
+            self._reserved.difference_update(normalize_access_key(k) for k in keys)
+
+    @contextmanager
+    def reserve(self, count: int = 1):
+        """
+        Context manager yielding a list of count reserved keys; they are
+        released on exit, so commit the quizzes inside the block.
+        """
+        keys = self.allocate(count)
+        try:
+            yield keys
+        finally:
+            self.release(keys)
+
+
+def _active_access_keys():
+    """Keys used by stored quizzes (looked up at call time so storage can be patched)."""
+    return json_storage.get_data_index().quiz_ids_by_access_key
+
+
+# Process-wide allocator used by the quiz views
+access_key_allocator = AccessKeyAllocator(_active_access_keys)
+
+
+def reserve_access_keys(count: int = 1):
+    """Reserves count unique access keys through the shared allocator."""
+    return access_key_allocator.reserve(count)
@@ -0,0 +1,19 @@
+# src/core/management/commands/compact_attempts.py
+from django.core.management.base import BaseCommand
+
+from core import json_storage
+
+
+class Command(BaseCommand):
+    help = (
+        "Folds the append-only attempt log (attempts.jsonl) back into quiz_data.json."
+    )
+
+    def handle(self, *args, **options):
+        pending = len(json_storage._read_attempt_log())
+        json_storage.compact_attempt_log()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Compacted {pending} logged attempt(s) into {json_storage.DATA_FILE}."
+            )
+        )
@@ -0,0 +1,38 @@
+# src/core/management/commands/migrate_json_to_sqlite.py
+from django.core.management.base import BaseCommand, CommandError
+
+from core import json_storage
+from core.sqlite_storage import migrate_json_to_sqlite
+
+
+class Command(BaseCommand):
+    help = (
+        "Copies quiz_data.json (and pending attempts.jsonl entries) into the SQLite "
+        "database used when QUIZPY_STORAGE_BACKEND=sqlite."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--database",
+            default=None,
+            help=f"Target database path (default: {json_storage.SQLITE_DATA_FILE}).",
+        )
+        parser.add_argument(
+            "--overwrite",
+            action="store_true",
+            help="Replace the contents of a database that already holds data.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            counts = migrate_json_to_sqlite(
+                options["database"], overwrite=options["overwrite"]
+            )
+        except RuntimeError as e:
+            raise CommandError(str(e))
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Migrated {counts['quizzes']} quizzes, {counts['questions']} questions "
+                f"and {counts['attempts']} attempts."
+            )
+        )
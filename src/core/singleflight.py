@@ -0,0 +1,75 @@
+# src/core/singleflight.py
+"""
+Single-flight request coalescing.
+
+When many threads ask for the same thing at once (e.g. a whole class opening
+a quiz the moment its key is announced), only the first one runs the
+computation; the others wait for it and receive the same result (or the same
+exception). Nothing is cached afterwards: the next call for the key after
+the flight has landed starts a new one.
+"""
+
+import threading
+
+
+class _Flight:
+    """One in-progress computation and its outcome."""
+
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0  # Callers that joined instead of computing
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls per key. Results are shared between all
+    callers of one flight, so they must be treated as read-only.
+    """
+
+    def __init__(self, name: str = "SingleFlight"):
+        self._name = name
+        self._flights = {}
+        self._lock = threading.Lock()
+        self.flights_started = 0  # Simple counters, useful for logging/tests
+        self.calls_coalesced = 0
+
+    def do(self, key, func):
+        """
+        Returns func() for the first caller of key; concurrent callers of the
+        same key block until it finishes and get its result (or exception).
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._flights[key] = flight
+                self.flights_started += 1
+            else:
+                flight.waiters += 1
+                self.calls_coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = func()
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+            if flight.waiters:
+                print(
+                    f"DEBUG [{self._name}]: Shared one result with {flight.waiters} waiting request(s) for {key!r}."
+                )
+        return flight.result
@@ -0,0 +1,294 @@
+# src/core/sqlite_storage.py
+"""
+SQLite (WAL mode) storage backend, selected with QUIZPY_STORAGE_BACKEND=sqlite.
+
+Quizzes, questions, options and attempts live in their own tables. The
+columns used for lookups (id, access_key, quiz_id, end_time) are real indexed
+columns; every other field is kept in a JSON "data" column so records keep
+exactly the shape the views expect. Unlike the JSON file, record changes and
+new attempts only touch the affected rows.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import uuid
+from pathlib import Path
+
+from core.storage_backend import StorageBackend
+
+SCHEMA_STATEMENTS = [
+    """
+    CREATE TABLE IF NOT EXISTS quizzes (
+        id TEXT PRIMARY KEY,
+        access_key TEXT,
+        data TEXT NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_quizzes_access_key ON quizzes (access_key)",
+    """
+    CREATE TABLE IF NOT EXISTS questions (
+        id TEXT PRIMARY KEY,
+        data TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS options (
+        question_id TEXT NOT NULL REFERENCES questions (id) ON DELETE CASCADE,
+        position INTEGER NOT NULL,
+        id TEXT,
+        data TEXT NOT NULL,
+        PRIMARY KEY (question_id, position)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_options_id ON options (id)",
+    """
+    CREATE TABLE IF NOT EXISTS attempts (
+        attempt_id TEXT PRIMARY KEY,
+        quiz_id TEXT,
+        end_time TEXT,
+        data TEXT NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_attempts_quiz_id ON attempts (quiz_id, end_time)",
+    "CREATE INDEX IF NOT EXISTS idx_attempts_end_time ON attempts (end_time)",
+]
+
+
+def _dump(record: dict) -> str:
+    return json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+
+
+def _attempt_row(attempt: dict) -> tuple:
+    """
+    (attempt_id, quiz_id, end_time, data) for the attempts table. Raises
+    ValueError for an attempt without an id: keyed on "None", it would
+    overwrite or be ignored in favour of every other id-less attempt.
+    """
+    attempt_id = attempt.get("attempt_id")
+    if attempt_id is None or str(attempt_id) == "":
+        raise ValueError(
+            f"Attempt of quiz {attempt.get('quiz_id')} has no attempt_id; cannot store it in SQLite."
+        )
+    return (
+        str(attempt_id),
+        str(attempt.get("quiz_id")),
+        attempt.get("end_time"),
+        _dump(attempt),
+    )
+
+
+def _normalize_access_key(access_key) -> str | None:
+    """Access keys are matched case-insensitively, so they are stored upper-cased."""
+    return str(access_key).strip().upper() if access_key else None
+
+
+class SqliteStorageBackend(StorageBackend):
+    """
+    Stores quiz data in an SQLite database in WAL mode. Each thread gets its
+    own connection; json_storage serialises writes, while WAL lets readers
+    in other processes proceed during a write.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, db_path):
+        if not db_path:
+            raise RuntimeError("SQLite database path not set.")
+        self.db_path = Path(db_path)
+        self._local = threading.local()
+        self._commit_count = 0  # Covers commits within one mtime tick
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connection() as conn:
+            for statement in SCHEMA_STATEMENTS:
+                conn.execute(statement)
+
+    def _connection(self) -> sqlite3.Connection:
+        """Returns this thread's connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            # FULL keeps acknowledged attempts durable across power loss
+            conn.execute("PRAGMA synchronous=FULL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+        return conn
+
+    # --- Reading ---
+    def load(self) -> dict:
+        conn = self._connection()
+        options_by_question = {}
+        for question_id, data in conn.execute(
+            "SELECT question_id, data FROM options ORDER BY question_id, position"
+        ):
+            options_by_question.setdefault(question_id, []).append(json.loads(data))
+
+        questions = []
+        for question_id, data in conn.execute(
+            "SELECT id, data FROM questions ORDER BY rowid"
+        ):
+            question = json.loads(data)
+            question["options"] = options_by_question.get(question_id, [])
+            questions.append(question)
+
+        return {
+            "quizzes": [
+                json.loads(data)
+                for (data,) in conn.execute("SELECT data FROM quizzes ORDER BY rowid")
+            ],
+            "questions": questions,
+            "attempts": [
+                json.loads(data)
+                for (data,) in conn.execute("SELECT data FROM attempts ORDER BY rowid")
+            ],
+        }
+
+    def signature(self) -> tuple:
+        # WAL mode writes go to the -wal file first, so both files are checked
+        stats = []
+        for path in (self.db_path, Path(f"{self.db_path}-wal")):
+            try:
+                stat_result = os.stat(path)
+                stats.append((stat_result.st_mtime_ns, stat_result.st_size))
+            except OSError:
+                stats.append(None)
+        return (str(self.db_path), tuple(stats), self._commit_count)
+
+    # --- Writing ---
+    def _upsert_quizzes(self, conn, quizzes):
+        # ON CONFLICT ... DO UPDATE keeps the rowid, and with it the list order
+        conn.executemany(
+            """
+            INSERT INTO quizzes (id, access_key, data) VALUES (?, ?, ?)
+            ON CONFLICT (id) DO UPDATE SET
+                access_key = excluded.access_key, data = excluded.data
+            """,
+            [
+                (
+                    str(quiz.get("id")),
+                    _normalize_access_key(quiz.get("access_key")),
+                    _dump(quiz),
+                )
+                for quiz in quizzes
+            ],
+        )
+
+    def _upsert_questions(self, conn, questions):
+        for question in questions:
+            question_id = str(question.get("id"))
+            record = {k: v for k, v in question.items() if k != "options"}
+            conn.execute(
+                """
+                INSERT INTO questions (id, data) VALUES (?, ?)
+                ON CONFLICT (id) DO UPDATE SET data = excluded.data
+                """,
+                (question_id, _dump(record)),
+            )
+            conn.execute("DELETE FROM options WHERE question_id = ?", (question_id,))
+            conn.executemany(
+                "INSERT INTO options (question_id, position, id, data) VALUES (?, ?, ?, ?)",
+                [
+                    (question_id, position, option.get("id"), _dump(option))
+                    for position, option in enumerate(question.get("options") or [])
+                    if isinstance(option, dict)
+                ],
+            )
+
+    def _insert_attempts(self, conn, attempts):
+        conn.executemany(
+            "INSERT OR IGNORE INTO attempts (attempt_id, quiz_id, end_time, data) VALUES (?, ?, ?, ?)",
+            [_attempt_row(attempt) for attempt in attempts],
+        )
+
+    def _upsert_attempts(self, conn, attempts):
+        conn.executemany(
+            """
+            INSERT INTO attempts (attempt_id, quiz_id, end_time, data) VALUES (?, ?, ?, ?)
+            ON CONFLICT (attempt_id) DO UPDATE SET
+                quiz_id = excluded.quiz_id, end_time = excluded.end_time, data = excluded.data
+            """,
+            [_attempt_row(attempt) for attempt in attempts],
+        )
+
+    def save(self, data: dict):
+        conn = self._connection()
+        with conn:  # One transaction: commit on success, roll back on error
+            conn.execute("DELETE FROM options")
+            conn.execute("DELETE FROM questions")
+            conn.execute("DELETE FROM quizzes")
+            conn.execute("DELETE FROM attempts")
+            self._upsert_quizzes(conn, data.get("quizzes", []))
+            self._upsert_questions(conn, data.get("questions", []))
+            self._insert_attempts(conn, data.get("attempts", []))
+        self._commit_count += 1
+
+    def apply_changes(
+        self,
+        data: dict,
+        quizzes: list = (),
+        questions: list = (),
+        deleted_quiz_ids: set = (),
+        deleted_question_ids: set = (),
+        attempts: list = (),
+    ):
+        conn = self._connection()
+        with conn:
+            conn.executemany(
+                "DELETE FROM quizzes WHERE id = ?",
+                [(str(quiz_id),) for quiz_id in deleted_quiz_ids],
+            )
+            conn.executemany(
+                "DELETE FROM questions WHERE id = ?",
+                [(str(question_id),) for question_id in deleted_question_ids],
+            )
+            self._upsert_quizzes(conn, quizzes)
+            self._upsert_questions(conn, questions)
+            self._upsert_attempts(conn, attempts)
+        self._commit_count += 1
+
+    def append_attempts(self, attempts: list):
+        conn = self._connection()
+        with conn:
+            self._insert_attempts(conn, attempts)
+        self._commit_count += 1
+
+    def compact(self):
+        """Checkpoints the WAL back into the main database file."""
+        self._connection().execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        self._commit_count += 1
+
+
+def migrate_json_to_sqlite(sqlite_path=None, overwrite: bool = False) -> dict:
+    """
+    One-shot migration of the JSON file store (quiz_data.json plus any
+    pending attempts.jsonl entries) into an SQLite database. Legacy attempts
+    without an attempt_id are given a new one, as attempts are keyed on it.
+    Refuses to touch a database that already holds data unless overwrite is
+    True. Returns the number of records migrated per collection.
+    """
+    from core import json_storage
+
+    sqlite_path = sqlite_path or json_storage.SQLITE_DATA_FILE
+    data = json_storage.JsonFileStorageBackend().load()
+    backend = SqliteStorageBackend(sqlite_path)
+    if not overwrite:
+        existing = backend.load()
+        if any(existing[key] for key in ("quizzes", "questions", "attempts")):
+            raise RuntimeError(
+                f"SQLite database {sqlite_path} already contains data. Use overwrite to replace it."
+            )
+    ids_assigned = 0
+    for attempt in data["attempts"]:
+        if attempt.get("attempt_id") is None or str(attempt["attempt_id"]) == "":
+            attempt["attempt_id"] = str(uuid.uuid4())
+            ids_assigned += 1
+    if ids_assigned:
+        print(
+            f"INFO [sqlite_storage]: Assigned new ids to {ids_assigned} attempt(s) without attempt_id."
+        )
+    backend.save(data)
+    counts = {key: len(data[key]) for key in ("quizzes", "questions", "attempts")}
+    print(f"INFO [sqlite_storage]: Migrated {counts} into {sqlite_path}.")
+    return counts
@@ -0,0 +1,66 @@
+# src/core/storage_backend.py
+"""
+Interface implemented by the persistence backends used by core.json_storage.
+
+json_storage owns the in-process snapshot cache, the locks and the public
+load/save/mutation functions; a backend only knows how to read and write the
+three top-level collections (quizzes, questions, attempts) durably.
+"""
+
+
+class StorageBackend:
+    """
+    Base class for storage backends. Subclasses must implement load(),
+    save(), append_attempts() and signature(); apply_changes() and compact()
+    have generic defaults.
+
+    Callers (json_storage) serialise all writes, so implementations do not
+    need their own write locking.
+    """
+
+    name = "base"
+
+    def load(self) -> dict:
+        """
+        Returns the complete data as a new dict with "quizzes", "questions"
+        and "attempts" lists. Must not raise for missing/empty storage.
+        """
+        raise NotImplementedError
+
+    def save(self, data: dict):
+        """Replaces the complete stored data with data. Raises on failure."""
+        raise NotImplementedError
+
+    def append_attempts(self, attempts: list):
+        """Durably records new attempts. Raises on failure."""
+        raise NotImplementedError
+
+    def signature(self) -> tuple:
+        """
+        Returns a value that changes whenever the stored data changes,
+        including changes made by another process. Used for cache validation.
+        """
+        raise NotImplementedError
+
+    def apply_changes(
+        self,
+        data: dict,
+        quizzes: list = (),
+        questions: list = (),
+        deleted_quiz_ids: set = (),
+        deleted_question_ids: set = (),
+        attempts: list = (),
+    ):
+        """
+        Persists a set of record changes. data is the complete new state;
+        the remaining arguments describe what changed so backends that can
+        update individual records do not have to rewrite everything
+        (attempts are existing attempts replaced by attempt_id, e.g. after a
+        regrade).
+        The default implementation simply saves data.
+        """
+        self.save(data)
+
+    def compact(self):
+        """Folds any write-ahead structures back into the main store."""
+        pass
@@ -0,0 +1,118 @@
+# src/core/tests/test_attempt_writer.py
+import threading
+import pytest
+import core.attempt_writer
+import core.json_storage
+from core.attempt_writer import GroupCommitWriter
+
+
+def test_concurrent_submissions_share_commits():
+    """Many simultaneous submissions are persisted in far fewer writes."""
+    committed_batches = []
+    writer = GroupCommitWriter(
+        committed_batches.append, max_delay_ms=50, max_batch_size=1000
+    )
+    start = threading.Barrier(40)
+
+    def submit(i):
+        start.wait()
+        writer.submit({"attempt_id": f"a{i}"})
+
+    threads = [threading.Thread(target=submit, args=(i,)) for i in range(40)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert sorted(
+        a["attempt_id"] for batch in committed_batches for a in batch
+    ) == sorted(f"a{i}" for i in range(40))
+    assert len(committed_batches) < 40
+
+
+def test_batch_size_limit_and_real_log():
+    """Batches never exceed the configured size and land in the attempt log."""
+    writer = GroupCommitWriter(
+        core.json_storage.append_attempts_to_log, max_delay_ms=20, max_batch_size=3
+    )
+    threads = [
+        threading.Thread(
+            target=writer.submit, args=({"attempt_id": f"b{i}", "quiz_id": "q"},)
+        )
+        for i in range(7)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert writer.attempts_committed == 7
+    assert writer.batches_committed >= 3
+    assert len(core.json_storage.load_data()["attempts"]) == 7
+
+
+def test_commit_failure_is_raised_to_every_waiter():
+    """A failed write must never be acknowledged as saved."""
+
+    def failing_commit(attempts):
+        raise OSError("disk full")
+
+    writer = GroupCommitWriter(failing_commit, max_delay_ms=1)
+    with pytest.raises(OSError):
+        writer.submit({"attempt_id": "x"})
+
+
+def _blocking_writer(release, started):
+    """A writer whose commits wait for release, recording the committed batches."""
+    committed_batches = []
+
+    def slow_commit(attempts):
+        started.set()
+        release.wait()
+        committed_batches.append(attempts)
+
+    return GroupCommitWriter(slow_commit, max_delay_ms=1), committed_batches
+
+
+def test_queued_attempt_is_withdrawn_on_timeout():
+    """A timed-out attempt is never committed later, so resubmitting it is safe."""
+    release, started = threading.Event(), threading.Event()
+    writer, committed_batches = _blocking_writer(release, started)
+    first = threading.Thread(target=writer.submit, args=({"attempt_id": "a1"},))
+    first.start()
+    started.wait()
+    with pytest.raises(TimeoutError):
+        writer.submit({"attempt_id": "a2"}, timeout=0.1)  # Queued behind the blocked batch
+    release.set()
+    first.join()
+    writer.submit({"attempt_id": "a3"})
+    assert [[a["attempt_id"] for a in batch] for batch in committed_batches] == [["a1"], ["a3"]]
+
+
+def test_attempt_being_written_is_waited_for_past_timeout():
+    """Once its batch is being written, the caller waits for the outcome instead of timing out."""
+    release = threading.Event()
+    writer, committed_batches = _blocking_writer(release, threading.Event())
+    threading.Timer(0.3, release.set).start()
+    writer.submit({"attempt_id": "a1"}, timeout=0.05)
+    assert committed_batches == [[{"attempt_id": "a1"}]]
+
+
+def test_resubmission_joins_the_in_flight_attempt(baseline_test_data):
+    """The same attempt_id is committed once, whether resubmitted in flight or after commit."""
+    quiz_id = baseline_test_data["quizzes"][0]["id"]
+    release = threading.Event()
+    writer = GroupCommitWriter(
+        lambda attempts: (release.wait(), core.attempt_writer._commit_to_attempt_log(attempts)),
+        max_delay_ms=1,
+    )
+    threads = [
+        threading.Thread(target=writer.submit, args=({"attempt_id": "a1", "quiz_id": quiz_id, "n": i},))
+        for i in range(3)
+    ]
+    for t in threads:
+        t.start()
+    release.set()
+    for t in threads:
+        t.join()
+    writer.submit({"attempt_id": "a1", "quiz_id": quiz_id, "n": 9})
+    assert [a["attempt_id"] for a in core.json_storage.load_data()["attempts"]] == ["a1"]
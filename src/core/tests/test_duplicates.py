@@ -0,0 +1,29 @@
+# src/core/tests/test_duplicates.py
+import pytest
+import core.duplicates
+from core.duplicates import MinHashIndex
+
+TEXT = "Which planet in our solar system is known as the red planet?"
+OPTIONS = ["Mars", "Venus", "Jupiter", "Saturn"]
+
+
+def test_lsh_finds_near_duplicates_only():
+    index = MinHashIndex()
+    index.add("original", [TEXT, *OPTIONS])
+    index.add("reworded", [TEXT.replace("?", " ?!").upper(), *reversed(OPTIONS)])
+    index.add("other", ["What is the boiling point of water at sea level?", "100", "90"])
+
+    matches = index.similar(index.signature([TEXT, *OPTIONS]), exclude={"original"})
+    assert [doc for doc, _similarity in matches] == ["reworded"]
+    assert index.duplicate_groups() == [["original", "reworded"]]
+
+    index.remove("reworded")
+    assert index.duplicate_groups() == []
+    assert not any("reworded" in bucket for bucket in index.buckets.values())
+
+
+@pytest.mark.skipif(core.duplicates.np is None, reason="NumPy not installed")
+def test_numpy_and_python_signatures_match(monkeypatch):
+    with_numpy = MinHashIndex().signature([TEXT, *OPTIONS])
+    monkeypatch.setattr(core.duplicates, "np", None)
+    assert MinHashIndex().signature([TEXT, *OPTIONS]) == with_numpy
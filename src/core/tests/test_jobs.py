@@ -0,0 +1,69 @@
+# src/core/tests/test_jobs.py
+import json
+import threading
+import pytest
+import core.jobs
+import core.json_storage
+from core.jobs import JobQueueFull, JobRunner
+
+
+def test_job_runs_in_background_and_reports_result():
+    runner = JobRunner(max_workers=1)
+    release = threading.Event()
+
+    def work(context, value):
+        context.set_progress(1, 2, "half way")
+        release.wait(5)
+        path = context.result_path("out.txt")
+        path.write_text(str(value))
+        return {"result_file": path, "value": value}
+
+    job = runner.submit("test", work, 42)
+    assert job["status"] == "queued"
+    release.set()
+    finished = runner.wait(job["id"], timeout=5)
+    assert finished["status"] == "succeeded"
+    assert finished["result"] == {"value": 42}
+    assert open(finished["result_file"]).read() == "42"
+    assert [j["id"] for j in runner.list_jobs()] == [job["id"]]
+
+    # The table is persisted
+    stored = json.loads(core.json_storage.JOBS_FILE.read_text())["jobs"]
+    assert stored[0]["status"] == "succeeded"
+
+
+def test_failed_job_records_error():
+    runner = JobRunner(max_workers=1)
+
+    def work(context):
+        raise ValueError("boom")
+
+    job = runner.submit("test", work)
+    finished = runner.wait(job["id"], timeout=5)
+    assert finished["status"] == "failed"
+    assert finished["error"] == "boom"
+
+
+def test_unfinished_jobs_are_failed_after_restart():
+    runner = JobRunner(max_workers=1)
+    release = threading.Event()
+    job = runner.submit("test", lambda context: release.wait(5))
+
+    restarted = JobRunner()  # A new process reading the same table
+    record = restarted.get(job["id"])
+    release.set()
+    runner.wait(job["id"], timeout=5)
+    assert record["status"] == "failed"
+    assert "restart" in record["error"]
+
+
+def test_queue_is_bounded(monkeypatch):
+    monkeypatch.setattr(core.jobs, "JOB_MAX_PENDING", 2)
+    runner = JobRunner(max_workers=1)
+    release = threading.Event()
+    jobs = [runner.submit("test", lambda context: release.wait(5)) for _ in range(2)]
+    with pytest.raises(JobQueueFull):
+        runner.submit("test", lambda context: None)
+    release.set()
+    for job in jobs:
+        assert runner.wait(job["id"], timeout=5)["status"] == "succeeded"
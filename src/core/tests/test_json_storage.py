@@ -0,0 +1,315 @@
+# src/core/tests/test_json_storage.py
+import json
+import pytest
+import core.json_storage
+
+# Fixtures baseline_test_data and isolated_json_storage (autouse) are from conftest.py
+
+
+def test_snapshot_is_shared_until_file_changes(isolated_json_storage):
+    """ Repeated reads return the same cached object without re-parsing. """
+    first = core.json_storage.get_data_snapshot()
+    second = core.json_storage.get_data_snapshot()
+    assert first is second
+
+
+def test_snapshot_invalidated_by_save(baseline_test_data):
+    """ save_data() bumps the generation so readers see the new content. """
+    before = core.json_storage.get_data_snapshot()
+    data = core.json_storage.load_data()
+    data["quizzes"][0]["title"] = "Saved Title"
+    core.json_storage.save_data(data)
+    after = core.json_storage.get_data_snapshot()
+    assert after is not before
+    assert after["quizzes"][0]["title"] == "Saved Title"
+
+
+def test_snapshot_invalidated_by_external_write(isolated_json_storage):
+    """ A write that bypasses save_data() is picked up via mtime/size. """
+    before = core.json_storage.get_data_snapshot()
+    with open(isolated_json_storage, "w", encoding="utf-8") as f:
+        json.dump({"quizzes": [], "questions": [], "attempts": []}, f)
+    after = core.json_storage.get_data_snapshot()
+    assert after is not before
+    assert after["quizzes"] == []
+
+
+def test_load_data_returns_private_copy():
+    """ load_data() must never hand out the shared snapshot. """
+    snapshot = core.json_storage.get_data_snapshot()
+    private = core.json_storage.load_data()
+    private["quizzes"].clear()
+    assert snapshot["quizzes"]
+
+
+def _make_attempt(quiz_id, attempt_id):
+    return {"attempt_id": attempt_id, "quiz_id": quiz_id, "percentage": 50.0}
+
+
+def test_appended_attempts_are_merged_and_compacted(isolated_json_storage, baseline_test_data):
+    """ Logged attempts show up in load_data/snapshot and fold back on compaction. """
+    quiz_id = baseline_test_data["quizzes"][0]["id"]
+    main_file_before = isolated_json_storage.read_text(encoding="utf-8")
+    snapshot = core.json_storage.get_data_snapshot()
+
+    core.json_storage.append_attempts_to_log([_make_attempt(quiz_id, "a1"), _make_attempt(quiz_id, "a2")])
+
+    # Main file untouched, snapshot extended in place, private loads merged
+    assert isolated_json_storage.read_text(encoding="utf-8") == main_file_before
+    assert core.json_storage.get_data_snapshot() is snapshot
+    assert [a["attempt_id"] for a in snapshot["attempts"]] == ["a1", "a2"]
+    assert len(core.json_storage.load_data()["attempts"]) == 2
+
+    core.json_storage.compact_attempt_log()
+    assert core.json_storage.ATTEMPT_LOG_FILE.read_text(encoding="utf-8") == ""
+    with open(isolated_json_storage, encoding="utf-8") as f:
+        assert [a["attempt_id"] for a in json.load(f)["attempts"]] == ["a1", "a2"]
+
+
+def test_attempt_log_tolerates_duplicates_and_torn_lines(baseline_test_data):
+    """ A crash between fold and truncate, or mid-append, must not lose or double attempts. """
+    quiz_id = baseline_test_data["quizzes"][0]["id"]
+    core.json_storage.append_attempts_to_log([_make_attempt(quiz_id, "a1")])
+    data = core.json_storage.load_data()
+    core.json_storage.save_data(data)
+    # Simulate a stale log entry plus a torn final line
+    with open(core.json_storage.ATTEMPT_LOG_FILE, "a", encoding="utf-8") as f:
+        f.write(json.dumps(_make_attempt(quiz_id, "a1")) + "\n")
+        f.write('{"attempt_id": "a2", "quiz')
+    attempts = core.json_storage.load_data()["attempts"]
+    assert [a["attempt_id"] for a in attempts] == ["a1"]
+    # The next append starts on a fresh line
+    core.json_storage.append_attempts_to_log([_make_attempt(quiz_id, "a3")])
+    attempts = core.json_storage.load_data()["attempts"]
+    assert [a["attempt_id"] for a in attempts] == ["a1", "a3"]
+
+
+def test_concurrent_mutations_do_not_lose_updates(baseline_test_data):
+    """ Racing writers each change their own record; none of the changes is lost. """
+    import threading
+
+    quiz_id = baseline_test_data["quizzes"][0]["id"]
+    start = threading.Barrier(20)
+
+    def add(i):
+        start.wait()
+        core.json_storage.add_question({"id": f"q-{i}", "text": f"Q{i}", "type": "MCQ"})
+
+    def retitle():
+        start.wait()
+        core.json_storage.update_quiz(quiz_id, {"title": "Raced Title"})
+
+    threads = [threading.Thread(target=add, args=(i,)) for i in range(19)]
+    threads.append(threading.Thread(target=retitle))
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    data = core.json_storage.load_data()
+    question_ids = {q["id"] for q in data["questions"]}
+    assert {f"q-{i}" for i in range(19)} <= question_ids
+    assert data["quizzes"][0]["title"] == "Raced Title"
+    assert core.json_storage.get_data_snapshot()["quizzes"][0]["title"] == "Raced Title"
+
+
+def test_mutations_are_copy_on_write(baseline_test_data):
+    """ Readers holding an older snapshot never see records change under them. """
+    old_snapshot = core.json_storage.get_data_snapshot()
+    question_id = baseline_test_data["questions"][0]["id"]
+    updated = core.json_storage.update_question(question_id, {"text": "Edited"})
+    assert updated["text"] == "Edited"
+    assert old_snapshot["questions"][0]["text"] == "MCQ Question 1?"
+    assert core.json_storage.get_question(question_id)["text"] == "Edited"
+
+    assert core.json_storage.delete_question(question_id)["id"] == question_id
+    assert core.json_storage.get_question(question_id) is None
+    assert core.json_storage.delete_question(question_id) is None
+    assert core.json_storage.set_access_key("missing", "ABC123") is None
+
+
+def test_mutation_keeps_concurrently_logged_attempts(baseline_test_data):
+    """ A teacher save folds in attempts that were only in the log. """
+    quiz_id = baseline_test_data["quizzes"][0]["id"]
+    core.json_storage.append_attempt(_make_attempt(quiz_id, "a1"))
+    core.json_storage.set_access_key(quiz_id, "NEWKEY")
+    assert core.json_storage.ATTEMPT_LOG_FILE.read_text(encoding="utf-8") == ""
+    assert [a["attempt_id"] for a in core.json_storage.get_data_snapshot()["attempts"]] == ["a1"]
+    assert [a["attempt_id"] for a in core.json_storage.load_data()["attempts"]] == ["a1"]
+
+
+@pytest.mark.parametrize("replace_attempt", [True, False])
+def test_attempt_appended_during_commit_is_not_lost(baseline_test_data, monkeypatch, replace_attempt):
+    """ An append between a commit's snapshot read and its write survives later saves. """
+    quiz_id = baseline_test_data["quizzes"][0]["id"]
+    core.json_storage.append_attempt(_make_attempt(quiz_id, "old"))
+    core.json_storage.get_data_index()
+    real_lock = core.json_storage._backend_lock
+    pending = []
+
+    class AppendingLock:
+        """ Runs the pending append (itself taking the real lock) before locking. """
+        def __enter__(self):
+            while pending:
+                pending.pop()()
+            return real_lock.__enter__()
+
+        def __exit__(self, *exc_info):
+            return real_lock.__exit__(*exc_info)
+
+    monkeypatch.setattr(core.json_storage, "_backend_lock", AppendingLock())
+    pending.append(lambda: core.json_storage.append_attempt(_make_attempt(quiz_id, "NEW")))
+    if replace_attempt:  # e.g. a regrade replacing an attempt
+        regraded = {**_make_attempt(quiz_id, "old"), "percentage": 90.0}
+        core.json_storage.commit_changes(attempts=[regraded])
+    else:
+        core.json_storage.update_quiz(quiz_id, {"title": "Renamed once"})
+    assert not pending
+    core.json_storage.update_quiz(quiz_id, {"title": "Renamed"})
+
+    assert [a["attempt_id"] for a in core.json_storage.load_data()["attempts"]] == ["old", "NEW"]
+    assert [a["attempt_id"] for a in core.json_storage.get_attempts_for_quiz(quiz_id)] == ["old", "NEW"]
+
+
+def test_indexes_follow_mutations_and_appends(baseline_test_data):
+    """ Key, id and attempt indexes are updated in place, not rebuilt. """
+    quiz_id = baseline_test_data["quizzes"][0]["id"]
+    assert core.json_storage.find_quiz_by_access_key(" key123 ")["id"] == quiz_id
+    index = core.json_storage.get_data_index()
+
+    core.json_storage.set_access_key(quiz_id, "NEWKEY")
+    assert core.json_storage.find_quiz_by_access_key("KEY123") is None
+    assert core.json_storage.find_quiz_by_access_key("newkey")["id"] == quiz_id
+
+    core.json_storage.append_attempt(_make_attempt(quiz_id, "a1"))
+    assert [a["attempt_id"] for a in core.json_storage.get_attempts_for_quiz(quiz_id)] == ["a1"]
+    assert core.json_storage.get_data_index() is index
+
+    core.json_storage.delete_quiz(quiz_id)
+    assert core.json_storage.get_quiz(quiz_id) is None
+    assert core.json_storage.find_quiz_by_access_key("NEWKEY") is None
+
+
+def test_result_aggregates_follow_appends_and_replacements(baseline_test_data):
+    """ Stats are updated per attempt, including when attempts are regraded. """
+    quiz_id = baseline_test_data["quizzes"][0]["id"]
+    for i, percentage in enumerate([40.0, 100.0, 70.0]):
+        attempt = _make_attempt(quiz_id, f"a{i}")
+        attempt.update({"percentage": percentage, "passed": percentage >= 70})
+        core.json_storage.append_attempt(attempt)
+    stats = core.json_storage.get_quiz_result_stats(quiz_id)
+    assert (stats["attempt_count"], stats["mean_percentage"], stats["pass_count"]) == (3, 70.0, 2)
+    assert (stats["min_percentage"], stats["max_percentage"]) == (40.0, 100.0)
+    assert stats["stddev_percentage"] == 24.49
+    assert [b["count"] for b in stats["histogram"]] == [0, 0, 0, 0, 1, 0, 0, 1, 0, 1]
+
+    regraded = {**_make_attempt(quiz_id, "a1"), "percentage": 50.0, "passed": False}
+    core.json_storage.commit_changes(attempts=[regraded])
+    stats = core.json_storage.get_quiz_result_stats(quiz_id)
+    assert (stats["attempt_count"], stats["pass_count"], stats["max_percentage"]) == (3, 1, 70.0)
+    assert core.json_storage.get_summary_counts() == {"active_quizzes": 1, "questions": 3, "attempts": 3}
+
+
+def test_student_history_index(baseline_test_data):
+    """ Attempts are indexed under every student, including legacy student_info. """
+    quiz_id = baseline_test_data["quizzes"][0]["id"]
+    pair = {**_make_attempt(quiz_id, "a1"),
+            "students": [{"name": "Ada  Lovelace", "class": "5B", "id": "17"}, {"name": "Bob", "class": "5B"}]}
+    legacy = {**_make_attempt(quiz_id, "a2"), "student_info": {"name": "ada lovelace", "class": "5b ", "id": "17"}}
+    core.json_storage.append_attempt(pair)
+    core.json_storage.append_attempt(legacy)
+    core.json_storage.append_attempt({**_make_attempt(quiz_id, "a3"), "students": [{"name": "Ada Lovelace"}]})
+
+    history = core.json_storage.get_student_history("17", "ADA LOVELACE", "5B")
+    assert [a["attempt_id"] for a in history] == ["a1", "a2"]
+    assert [a["attempt_id"] for a in core.json_storage.get_student_history("", "bob", "5b")] == ["a1"]
+    assert core.json_storage.get_student_history("", "", "") == []
+
+    # Replaced attempts (e.g. regraded) are re-indexed
+    core.json_storage.commit_changes(attempts=[{**pair, "percentage": 10.0}])
+    history = core.json_storage.get_student_history("17", "Ada Lovelace", "5B")
+    assert [a.get("percentage") for a in history if a["attempt_id"] == "a1"] == [10.0]
+
+
+def _timed_attempt(quiz_id, attempt_id, minute):
+    return {**_make_attempt(quiz_id, attempt_id), "end_time": f"2024-05-01T10:{minute:02d}:00+00:00"}
+
+
+def test_attempt_timeline_follows_appends(baseline_test_data):
+    """ New attempts extend the timeline; views handed out earlier keep their contents. """
+    quiz_id = baseline_test_data["quizzes"][0]["id"]
+    for attempt_id, minute in [("a1", 10), ("a2", 20)]:
+        core.json_storage.append_attempt(_timed_attempt(quiz_id, attempt_id, minute))
+    keys, attempts = core.json_storage.get_attempt_timeline(quiz_id)
+
+    core.json_storage.append_attempt(_timed_attempt(quiz_id, "a3", 30))  # Newest: appended
+    core.json_storage.append_attempt(_timed_attempt(quiz_id, "a0", 5))  # Out of order: copied
+    core.json_storage.append_attempt(_timed_attempt(quiz_id, "a4", 40))
+
+    assert [a["attempt_id"] for a in attempts] == ["a2", "a1"]
+    assert len(keys) == 2 and attempts[-1]["attempt_id"] == "a1"
+    new_keys, new_attempts = core.json_storage.get_attempt_timeline(quiz_id)
+    assert [a["attempt_id"] for a in new_attempts] == ["a4", "a3", "a2", "a1", "a0"]
+    assert list(new_keys) == sorted(new_keys)
+    assert [a["attempt_id"] for a in new_attempts[1:3]] == ["a3", "a2"]
+
+
+def test_attempt_appended_while_timeline_is_built_is_not_lost(baseline_test_data, monkeypatch):
+    """ The lazy build runs under the snapshot lock, so a racing append lands in the timeline. """
+    import threading
+    import core.indexes
+    quiz_id = baseline_test_data["quizzes"][0]["id"]
+    core.json_storage.append_attempt(_timed_attempt(quiz_id, "a1", 10))
+    original_sort_key = core.indexes.attempt_sort_key
+    appender = threading.Thread(
+        target=core.json_storage.append_attempts_to_log, args=([_timed_attempt(quiz_id, "a2", 20)],)
+    )
+
+    def racing_sort_key(attempt):
+        if not appender.is_alive() and appender.ident is None:
+            appender.start()
+            appender.join(timeout=0.5)  # Blocked on the snapshot lock once fixed
+        return original_sort_key(attempt)
+
+    monkeypatch.setattr(core.indexes, "attempt_sort_key", racing_sort_key)
+    core.json_storage.get_attempt_timeline(quiz_id)
+    appender.join()
+    attempts = core.json_storage.get_attempt_timeline(quiz_id)[1]
+    assert [a["attempt_id"] for a in attempts] == ["a2", "a1"]
+
+
+def test_student_history_is_read_under_snapshot_lock(baseline_test_data, monkeypatch):
+    """ The per-student dict is live, so it is copied with appends held off. """
+    import core.indexes
+    quiz_id = baseline_test_data["quizzes"][0]["id"]
+    core.json_storage.append_attempt({**_make_attempt(quiz_id, "a1"), "students": [{"name": "Ada"}]})
+    original = core.indexes.DataIndex.get_student_attempts
+    locked = []
+
+    def checking_get_student_attempts(self, key):
+        locked.append(core.json_storage._snapshot_lock.locked())
+        return original(self, key)
+
+    monkeypatch.setattr(core.indexes.DataIndex, "get_student_attempts", checking_get_student_attempts)
+    assert [a["attempt_id"] for a in core.json_storage.get_student_history("", "ada", "")] == ["a1"]
+    assert locked == [True]
+
+
+def test_result_stats_are_read_under_snapshot_lock(baseline_test_data, monkeypatch):
+    """ Recomputing stale extremes writes to the shared aggregate, so appends are held off. """
+    import core.aggregates
+    quiz_id = baseline_test_data["quizzes"][0]["id"]
+    for attempt_id, percentage in [("a1", 40.0), ("a2", 90.0)]:
+        core.json_storage.append_attempt({**_make_attempt(quiz_id, attempt_id), "percentage": percentage})
+    core.json_storage.commit_changes(attempts=[{**_make_attempt(quiz_id, "a2"), "percentage": 60.0}])
+    original = core.aggregates.ResultAggregate.recompute_extremes
+    locked = []
+
+    def checking_recompute_extremes(self, attempts):
+        locked.append(core.json_storage._snapshot_lock.locked())
+        return original(self, attempts)
+
+    monkeypatch.setattr(core.aggregates.ResultAggregate, "recompute_extremes", checking_recompute_extremes)
+    stats = core.json_storage.get_quiz_result_stats(quiz_id)
+    assert (stats["min_percentage"], stats["max_percentage"]) == (40.0, 60.0)
+    assert locked == [True]
@@ -0,0 +1,27 @@
+# src/core/tests/test_key_allocator.py
+import pytest
+from core.key_allocator import (
+    ACCESS_KEY_ALPHABET,
+    AccessKeyAllocator,
+    reserve_access_keys,
+)
+
+
+def test_bulk_allocation_is_unique_and_skips_active_keys():
+    """Keys never repeat within a batch, across reservations, or with stored quizzes."""
+    allocator = AccessKeyAllocator(lambda: {"AA", "AB"}, length=2, alphabet="AB")
+    keys = allocator.allocate(2)
+    assert sorted(keys) == ["BA", "BB"]
+    with pytest.raises(RuntimeError):
+        allocator.allocate(1)
+    allocator.release(keys)
+    with allocator.reserve(1) as (key,):
+        assert key in ("BA", "BB")
+
+
+def test_reserved_keys_avoid_existing_quizzes(baseline_test_data):
+    """The shared allocator checks against the access key index."""
+    with reserve_access_keys(50) as keys:
+        assert len(set(keys)) == 50
+        assert "KEY123" not in keys
+        assert all(len(k) == 6 and set(k) <= set(ACCESS_KEY_ALPHABET) for k in keys)
@@ -0,0 +1,40 @@
+# src/core/tests/test_singleflight.py
+import threading
+import pytest
+from core.singleflight import SingleFlight
+
+
+def test_concurrent_calls_share_one_computation():
+    """Callers arriving while a flight is in progress get its result."""
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+    results = []
+
+    def compute():
+        calls.append(1)
+        release.wait(5)
+        return {"payload": 1}
+
+    threads = [
+        threading.Thread(target=lambda: results.append(flight.do("KEY123", compute)))
+        for _ in range(20)
+    ]
+    for t in threads:
+        t.start()
+    while flight.calls_coalesced < 19:
+        threading.Event().wait(0.01)
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert len(results) == 20 and all(r is results[0] for r in results)
+    assert flight.do("KEY123", lambda: "fresh") == "fresh"  # Nothing is cached
+
+
+def test_errors_propagate_and_are_not_cached():
+    flight = SingleFlight()
+    with pytest.raises(ValueError):
+        flight.do("k", lambda: (_ for _ in ()).throw(ValueError("boom")))
+    assert flight.do("k", lambda: 42) == 42
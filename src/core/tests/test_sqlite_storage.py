@@ -0,0 +1,65 @@
+# src/core/tests/test_sqlite_storage.py
+import pytest
+import core.json_storage
+from core.sqlite_storage import SqliteStorageBackend, migrate_json_to_sqlite
+
+# Fixtures baseline_test_data and isolated_json_storage (autouse) are from conftest.py
+
+
+@pytest.fixture
+def sqlite_backend(tmp_path, monkeypatch):
+    """ Switches json_storage to a fresh SQLite database seeded from the JSON fixture. """
+    db_path = tmp_path / "quiz_data.sqlite3"
+    migrate_json_to_sqlite(db_path)
+    backend = SqliteStorageBackend(db_path)
+    monkeypatch.setattr(core.json_storage, "_storage_backend", backend)
+    core.json_storage.invalidate_data_cache()
+    return backend
+
+
+def test_migration_round_trips_data(sqlite_backend, baseline_test_data):
+    """ The migrated database returns exactly what the JSON file held. """
+    assert sqlite_backend.load() == core.json_storage.JsonFileStorageBackend().load()
+    assert sqlite_backend.load()["questions"][0]["options"] == baseline_test_data["questions"][0]["options"]
+
+
+def test_migration_refuses_to_overwrite(sqlite_backend):
+    with pytest.raises(RuntimeError):
+        migrate_json_to_sqlite(sqlite_backend.db_path)
+
+
+def test_mutations_and_attempts_through_sqlite(sqlite_backend, baseline_test_data):
+    """ The public storage API works unchanged on top of the SQLite backend. """
+    quiz_id = baseline_test_data["quizzes"][0]["id"]
+    question_id = baseline_test_data["questions"][0]["id"]
+    core.json_storage.set_access_key(quiz_id, "SQLKEY")
+    core.json_storage.delete_question(question_id)
+    core.json_storage.append_attempt({"attempt_id": "a1", "quiz_id": quiz_id, "end_time": "2025-01-01T00:00:00"})
+
+    # A fresh backend on the same file sees every change
+    reloaded = SqliteStorageBackend(sqlite_backend.db_path).load()
+    assert reloaded["quizzes"][0]["access_key"] == "SQLKEY"
+    assert question_id not in {q["id"] for q in reloaded["questions"]}
+    assert [a["attempt_id"] for a in reloaded["attempts"]] == ["a1"]
+    assert core.json_storage.get_data_snapshot()["attempts"][0]["attempt_id"] == "a1"
+    # Options of the deleted question are removed with it
+    conn = sqlite_backend._connection()
+    assert conn.execute("SELECT COUNT(*) FROM options WHERE question_id = ?", (question_id,)).fetchone()[0] == 0
+
+
+def test_migration_assigns_ids_to_legacy_attempts(tmp_path, baseline_test_data):
+    """ Attempts without attempt_id get their own id instead of collapsing into one "None" row. """
+    quiz_id = baseline_test_data["quizzes"][0]["id"]
+    data = core.json_storage.load_data()
+    data["attempts"] = [{"quiz_id": quiz_id, "percentage": 10.0}, {"quiz_id": quiz_id, "percentage": 20.0},
+                        {"attempt_id": "a1", "quiz_id": quiz_id, "percentage": 30.0}]
+    core.json_storage.save_data(data)
+
+    assert migrate_json_to_sqlite(tmp_path / "legacy.sqlite3")["attempts"] == 3
+    backend = SqliteStorageBackend(tmp_path / "legacy.sqlite3")
+    attempts = backend.load()["attempts"]
+    assert sorted(a["percentage"] for a in attempts) == [10.0, 20.0, 30.0]
+    assert len({a["attempt_id"] for a in attempts}) == 3
+    assert "a1" in {a["attempt_id"] for a in attempts}
+    with pytest.raises(ValueError):
+        backend.append_attempts([{"quiz_id": quiz_id}])
@@ -0,0 +1,22 @@
+# src/core/tests/test_text_search.py
+from core.text_search import TextIndex, tokenize
+
+
+def test_tokens_ignore_case_and_accents():
+    assert tokenize("Élève, ÉQUATION façade!") == ["eleve", "equation", "facade"]
+
+
+def test_index_updates_postings_and_lengths_incrementally():
+    """Re-adding and removing documents leaves no stale postings behind."""
+    index = TextIndex()
+    index.add("a", "red apple")
+    index.add("b", "green apple apple")
+    assert [doc for doc, _score in index.search("apple")] == ["b", "a"]
+    assert index.search("apple", candidates={"a"})[0][0] == "a"
+
+    index.add("b", "green pear")
+    assert [doc for doc, _score in index.search("apple pear")] == ["a", "b"]
+    index.remove("a")
+    assert index.search("apple") == []
+    assert set(index.postings) == {"green", "pear"}
+    assert (len(index), index.total_length) == (1, 2)
@@ -0,0 +1,99 @@
+# src/core/text_search.py
+"""
+Incremental in-memory full-text index with BM25 ranking.
+
+Documents are added, replaced and removed one at a time (the data index
+feeds it question changes), so the index is never rebuilt after it has been
+built once. Tokens are casefolded and stripped of accents, so "Équation"
+matches "equation".
+"""
+
+import math
+import re
+import unicodedata
+from collections import Counter
+
+# BM25 parameters (the usual defaults)
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def normalize_text(text) -> str:
+    """Casefolds and strips accents (combining marks after NFKD)."""
+    decomposed = unicodedata.normalize("NFKD", str(text or "").casefold())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def tokenize(text) -> list:
+    return _TOKEN_PATTERN.findall(normalize_text(text))
+
+
+class TextIndex:
+    """
+    Inverted index: term -> {document id: term frequency}, plus document
+    lengths for BM25 length normalization. Not thread-safe on its own; the
+    owner serializes updates.
+    """
+
+    def __init__(self):
+        self.postings = {}
+        self.document_terms = {}  # document id -> Counter of its terms
+        self.document_lengths = {}  # document id -> number of tokens
+        self.total_length = 0
+
+    def __len__(self):
+        return len(self.document_terms)
+
+    def add(self, document_id, text: str):
+        """Indexes (or re-indexes) a document."""
+        if document_id in self.document_terms:
+            self.remove(document_id)
+        terms = Counter(tokenize(text))
+        self.document_terms[document_id] = terms
+        self.document_lengths[document_id] = sum(terms.values())
+        self.total_length += self.document_lengths[document_id]
+        for term, frequency in terms.items():
+            self.postings.setdefault(term, {})[document_id] = frequency
+
+    def remove(self, document_id):
+        terms = self.document_terms.pop(document_id, None)
+        if terms is None:
+            return
+        self.total_length -= self.document_lengths.pop(document_id, 0)
+        for term in terms:
+            documents = self.postings.get(term)
+            if documents is not None:
+                documents.pop(document_id, None)
+                if not documents:
+                    del self.postings[term]
+
+    def search(self, query: str, candidates=None) -> list:
+        """
+        Returns [(document id, score)] for documents containing any query
+        term, best first (ties by document id). candidates, if given, limits
+        the documents considered.
+        """
+        query_terms = set(tokenize(query))
+        document_count = len(self.document_terms)
+        if not query_terms or not document_count:
+            return []
+        average_length = self.total_length / document_count or 1.0
+        scores = {}
+        for term in query_terms:
+            documents = self.postings.get(term)
+            if not documents:
+                continue
+            idf = math.log(
+                1 + (document_count - len(documents) + 0.5) / (len(documents) + 0.5)
+            )
+            for document_id, frequency in documents.items():
+                if candidates is not None and document_id not in candidates:
+                    continue
+                length = self.document_lengths[document_id]
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * length / average_length)
+                scores[document_id] = scores.get(document_id, 0.0) + idf * (
+                    frequency * (BM25_K1 + 1) / (frequency + norm)
+                )
+        return sorted(scores.items(), key=lambda item: (-item[1], item[0]))
@@ -0,0 +1,201 @@
+# src/quiz/attempt_listing.py
+"""
+Paginated, filtered listing of a quiz's attempts for the teacher results page.
+
+Pages are read from the per-quiz attempt timeline kept by the data index
+(sorted newest first by numeric submission time), so a page costs a bisect
+plus the rows on that page instead of sorting every attempt. Cursors encode
+the sort key of the last row returned and stay valid while new attempts
+arrive.
+"""
+
+import base64
+import bisect
+import datetime
+import json
+
+from core import json_storage
+from core.indexes import attempt_sort_key
+
+# --- Paging Configuration ---
+ATTEMPTS_PAGE_DEFAULT_LIMIT = 100
+ATTEMPTS_PAGE_MAX_LIMIT = 1000
+
+
+class InvalidListingParameter(ValueError):
+    """A query parameter could not be parsed; the message is user-facing."""
+
+
+def summarize_attempt(att: dict) -> dict:
+    """Builds the summary row shown on the results page for one attempt."""
+    students_in_attempt = att.get("students", [])
+    student_name_display = "N/A"
+    student_class_display = ""
+    student_id_display = ""
+
+    if isinstance(students_in_attempt, list) and len(students_in_attempt) > 0:
+        # Format names (handle single or multiple)
+        student_name_display = " & ".join(
+            [
+                str(s.get("name", "N/A")).strip()
+                for s in students_in_attempt
+                if isinstance(s, dict)
+            ]
+        )
+        # Get class/id from the FIRST student in the list for summary display
+        first_student = students_in_attempt[0]
+        if isinstance(first_student, dict):
+            student_class_display = str(first_student.get("class", "")).strip()
+            student_id_display = str(first_student.get("id", "")).strip()
+    elif isinstance(att.get("student_info"), dict):  # Fallback for old structure
+        legacy_info = att["student_info"]
+        student_name_display = str(legacy_info.get("name", "N/A")).strip()
+        student_class_display = str(legacy_info.get("class", "")).strip()
+        student_id_display = str(legacy_info.get("id", "")).strip()
+
+    return {
+        "attempt_id": att.get("attempt_id"),
+        "student_name": student_name_display,
+        "student_class": student_class_display,
+        "student_id_number": student_id_display,
+        "score_percentage": att.get("percentage"),
+        "passed": att.get("passed"),
+        "submission_time": att.get("end_time"),
+        "submitted_due_to_timeout": att.get("submitted_due_to_timeout", False),
+    }
+
+
+def _attempt_classes(att: dict) -> set:
+    """Normalized class names of every student in the attempt."""
+    students = att.get("students")
+    if not isinstance(students, list):
+        students = [att.get("student_info")]
+    return {
+        str(s.get("class", "")).strip().lower() for s in students if isinstance(s, dict)
+    }
+
+
+# --- Query parameters ---
+def _parse_bool(name: str, value):
+    if value is None or value == "":
+        return None
+    lowered = str(value).strip().lower()
+    if lowered in ("1", "true", "yes"):
+        return True
+    if lowered in ("0", "false", "no"):
+        return False
+    raise InvalidListingParameter(f"'{name}' must be true or false.")
+
+
+def _parse_time(name: str, value, end_of_day: bool = False):
+    """ISO date or datetime -> POSIX timestamp (naive values are UTC)."""
+    if value is None or value == "":
+        return None
+    try:
+        parsed = datetime.datetime.fromisoformat(str(value).strip())
+    except ValueError:
+        raise InvalidListingParameter(f"'{name}' must be an ISO date or datetime.")
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=datetime.timezone.utc)
+    if end_of_day and len(str(value).strip()) == 10:  # Date only: whole day
+        parsed += datetime.timedelta(days=1)
+    return parsed.timestamp()
+
+
+def encode_cursor(sort_key: tuple) -> str:
+    raw = json.dumps(list(sort_key), separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        neg_timestamp, attempt_id = json.loads(raw)
+        return (float(neg_timestamp), str(attempt_id))
+    except (ValueError, TypeError):
+        raise InvalidListingParameter("Invalid cursor.")
+
+
+def parse_listing_params(params) -> dict:
+    """
+    Reads limit/cursor and the filters from a QueryDict (or dict):
+    class, passed, timed_out, from, to (ISO dates/datetimes; a date-only
+    'to' includes that whole day).
+    """
+    limit = params.get("limit")
+    if limit in (None, ""):
+        limit = ATTEMPTS_PAGE_DEFAULT_LIMIT
+    else:
+        try:
+            limit = int(limit)
+        except ValueError:
+            raise InvalidListingParameter("'limit' must be a number.")
+        if limit < 1:
+            raise InvalidListingParameter("'limit' must be at least 1.")
+    cursor = params.get("cursor")
+    student_class = str(params.get("class") or "").strip().lower()
+    return {
+        "limit": min(limit, ATTEMPTS_PAGE_MAX_LIMIT),
+        "cursor": decode_cursor(cursor) if cursor else None,
+        "student_class": student_class or None,
+        "passed": _parse_bool("passed", params.get("passed")),
+        "timed_out": _parse_bool("timed_out", params.get("timed_out")),
+        "submitted_from": _parse_time("from", params.get("from")),
+        "submitted_to": _parse_time("to", params.get("to"), end_of_day=True),
+    }
+
+
+def _negated_timestamp(sort_key: tuple) -> float:
+    return sort_key[0]
+
+
+def list_attempts_page(
+    quiz_id,
+    limit: int = ATTEMPTS_PAGE_DEFAULT_LIMIT,
+    cursor: tuple | None = None,
+    student_class: str | None = None,
+    passed: bool | None = None,
+    timed_out: bool | None = None,
+    submitted_from: float | None = None,
+    submitted_to: float | None = None,
+) -> dict:
+    """
+    Returns {"attempts": [summary rows], "next_cursor": str or None} with up
+    to limit attempts, newest first, after cursor and matching the filters.
+    submitted_from is inclusive, submitted_to exclusive.
+    """
+    keys, attempts = json_storage.get_attempt_timeline(quiz_id)
+    # Keys are (-timestamp, attempt id): the time range is a slice
+    start = 0
+    end = len(keys)
+    if submitted_to is not None:
+        start = bisect.bisect_right(keys, -submitted_to, key=_negated_timestamp)
+    if submitted_from is not None:
+        end = bisect.bisect_right(keys, -submitted_from, key=_negated_timestamp)
+    if cursor is not None:
+        start = max(start, bisect.bisect_right(keys, cursor))
+
+    rows = []
+    position = start
+    while position < end and len(rows) < limit:
+        att = attempts[position]
+        position += 1
+        if passed is not None and bool(att.get("passed")) != passed:
+            continue
+        if (
+            timed_out is not None
+            and bool(att.get("submitted_due_to_timeout", False)) != timed_out
+        ):
+            continue
+        if student_class is not None and student_class not in _attempt_classes(att):
+            continue
+        rows.append(att)
+
+    # A further page exists if anything in range is left to scan
+    next_cursor = None
+    if rows and position < end:
+        next_cursor = encode_cursor(attempt_sort_key(rows[-1]))
+    return {
+        "attempts": [summarize_attempt(att) for att in rows],
+        "next_cursor": next_cursor,
+    }
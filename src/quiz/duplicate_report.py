@@ -0,0 +1,92 @@
+# src/quiz/duplicate_report.py
+"""
+Near-duplicate questions in the question bank.
+
+Question creation and quiz import flag the existing questions a new one
+nearly duplicates, and the merge report lists every group of near-duplicate
+questions with the one to keep. Both are answered from the MinHash/LSH
+duplicate index (core.duplicates) kept by the data index, so a check only
+compares a question with the few questions sharing one of its LSH buckets
+instead of with the whole bank.
+"""
+
+from core import json_storage
+from .question_listing import summarize_question
+
+# Matches reported per question at creation/import time
+DUPLICATE_MATCH_LIMIT = 5
+
+
+def find_question_duplicates(question: dict, exclude_ids=()) -> list:
+    """
+    Returns the stored questions question nearly duplicates (at most
+    DUPLICATE_MATCH_LIMIT, most similar first) as question rows with their
+    estimated "similarity".
+    """
+    index = json_storage.get_data_index()
+    matches = []
+    for question_id, similarity in json_storage.find_similar_questions(
+        question, exclude_ids
+    ):
+        match = index.get_question(question_id)
+        if match is None:
+            continue
+        matches.append({**summarize_question(match), "similarity": similarity})
+        if len(matches) >= DUPLICATE_MATCH_LIMIT:
+            break
+    return matches
+
+
+def build_duplicate_report() -> dict:
+    """
+    Returns {"group_count", "duplicate_count", "groups"}. Each group lists
+    its questions (with the ids of the quizzes using them and their
+    similarity to the kept question) and the id to "keep": the question used
+    by the most quizzes, the oldest on ties. duplicate_count is the number of
+    questions a merge would remove.
+    """
+    # Walks the index's live dicts, so it runs under the snapshot lock
+    return json_storage.read_data_index(_build_duplicate_report)
+
+
+def _build_duplicate_report(index) -> dict:
+    duplicate_index = index.get_question_duplicates()
+    duplicate_groups = duplicate_index.duplicate_groups()
+    creation_order = {
+        qid: position for position, qid in enumerate(index.questions_by_id)
+    }
+    groups = []
+    for group_ids in duplicate_groups:
+        group_ids = sorted(
+            (qid for qid in group_ids if qid in creation_order),
+            key=creation_order.get,
+        )
+        if len(group_ids) < 2:
+            continue
+        usage = {
+            qid: sorted(index.quiz_ids_by_question.get(qid, ())) for qid in group_ids
+        }
+        # Most used first; min() keeps the oldest of equally used questions
+        keep = min(group_ids, key=lambda qid: -len(usage[qid]))
+        keep_signature = duplicate_index.signatures.get(keep)
+        rows = []
+        for qid in group_ids:
+            signature = duplicate_index.signatures.get(qid)
+            rows.append(
+                {
+                    **summarize_question(index.questions_by_id[qid]),
+                    "quiz_ids": usage[qid],
+                    "similarity": (
+                        duplicate_index.similarity(keep_signature, signature)
+                        if keep_signature and signature
+                        else None
+                    ),
+                }
+            )
+        groups.append({"keep": keep, "questions": rows})
+    groups.sort(key=lambda group: -len(group["questions"]))
+    return {
+        "group_count": len(groups),
+        "duplicate_count": sum(len(group["questions"]) - 1 for group in groups),
+        "groups": groups,
+    }
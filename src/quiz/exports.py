@@ -0,0 +1,362 @@
+# src/quiz/exports.py
+"""
+Attempt exports for the teacher results page.
+
+The JSON, NDJSON and CSV exports are generators that serialize one attempt
+at a time (joined into chunks of EXPORT_STREAM_BATCH rows) for a
+StreamingHttpResponse, so the full export never exists as one string.
+
+The all-quizzes archive (build_results_archive) writes one workbook (or CSV)
+per quiz into a ZIP. The attempts are grouped by quiz once by the data index;
+workbooks are built in parallel in a process pool, each into its own temporary
+file, and copied into the archive as they complete.
+
+The Excel export uses an openpyxl write-only workbook: rows are serialized
+to a temporary file as they are appended instead of being kept as cell
+objects, and the finished .xlsx is written to a spooled temporary file that
+the view streams back with a FileResponse. Memory therefore stays bounded
+by the size of one row, however many attempts a quiz has.
+"""
+
+import csv
+import io
+import json
+import multiprocessing
+import os
+import re
+import shutil
+import sys
+import tempfile
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+import openpyxl
+from openpyxl.utils import get_column_letter
+
+from core import json_storage
+from .attempt_listing import summarize_attempt
+from .item_analysis import (
+    ITEM_ANALYSIS_SHEET_HEADERS,
+    get_item_analysis,
+    item_analysis_sheet_rows,
+)
+
+EXCEL_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+# Finished workbooks up to this size stay in memory, larger ones go to disk
+EXPORT_SPOOL_MAX_MEMORY = 8 * 1024 * 1024
+MAX_COLUMN_WIDTH = 80  # Long free-text cells should not make huge columns
+EXPORT_STREAM_BATCH = 100  # Attempts serialized per streamed chunk
+ARCHIVE_MAX_WORKERS = min(4, os.cpu_count() or 1)  # Parallel workbook builders
+ARCHIVE_FORMATS = ("xlsx", "csv")
+
+ATTEMPT_SHEET_HEADERS = [
+    "Attempt ID",
+    "Student Name",
+    "Student Class",
+    "Student ID/Number",
+    "Score (%)",
+    "Passed",
+    "Submission Time (UTC)",
+    "Timed Out",
+    "Score Achieved",
+    "Max Score",
+    # Avoid exporting raw answers/details to basic Excel for simplicity,
+    # can be added as separate sheets or complex cells if needed later.
+]
+
+
+def attempt_sheet_row(att: dict) -> list:
+    """One row of the results sheet (students list or legacy student_info)."""
+    summary = summarize_attempt(att)
+    return [
+        att.get("attempt_id", ""),
+        summary["student_name"],
+        summary["student_class"],
+        summary["student_id_number"],
+        att.get("percentage", ""),
+        "Yes" if att.get("passed") else "No",
+        att.get("end_time", ""),
+        "Yes" if att.get("submitted_due_to_timeout", False) else "No",
+        att.get("score_achieved", ""),
+        att.get("max_possible_score", ""),
+    ]
+
+
+def _cell_length(value) -> int:
+    return len(str(value)) if value is not None else 0
+
+
+def _column_widths(headers: list, rows) -> list:
+    """Widths (characters + padding) from the longest value of each column."""
+    widths = [_cell_length(header) for header in headers]
+    for row in rows:
+        for i, value in enumerate(row):
+            length = _cell_length(value)
+            if length > widths[i]:
+                widths[i] = length
+    return [min(width + 2, MAX_COLUMN_WIDTH) for width in widths]
+
+
+def _write_sheet(workbook, title: str, headers: list, rows_func, progress=None):
+    """
+    Adds a write-only sheet. Write-only sheets take column widths only before
+    the first row, so rows_func() (a fresh row iterator per call) is consumed
+    once for the widths, which only looks at string lengths, and once for
+    the rows themselves.
+    """
+    ws = workbook.create_sheet(title)
+    for i, width in enumerate(_column_widths(headers, rows_func())):
+        ws.column_dimensions[get_column_letter(i + 1)].width = width
+    ws.append(headers)
+    for written, row in enumerate(rows_func(), start=1):
+        ws.append(row)
+        if progress is not None and written % EXPORT_STREAM_BATCH == 0:
+            progress(written)
+    return ws
+
+
+def write_attempts_workbook(
+    fileobj, sheet_title: str, attempts, item_analysis_rows=None, progress=None
+):
+    """
+    Writes the results workbook for attempts (a re-iterable sequence of
+    attempt dicts) to fileobj. item_analysis_rows, when given, are added as
+    an "Item Analysis" sheet (see quiz.item_analysis). progress(rows
+    written), if given, is called every EXPORT_STREAM_BATCH attempt rows.
+    """
+    workbook = openpyxl.Workbook(write_only=True)
+    _write_sheet(
+        workbook,
+        sheet_title,
+        ATTEMPT_SHEET_HEADERS,
+        lambda: (attempt_sheet_row(att) for att in attempts),
+        progress,
+    )
+    if item_analysis_rows is not None:
+        _write_sheet(
+            workbook,
+            "Item Analysis",
+            ITEM_ANALYSIS_SHEET_HEADERS,
+            lambda: iter(item_analysis_rows),
+        )
+    workbook.save(fileobj)
+
+
+def spooled_attempts_workbook(sheet_title: str, attempts, item_analysis_rows=None):
+    """
+    Builds the results workbook into a spooled temporary file (in memory up
+    to EXPORT_SPOOL_MAX_MEMORY, on disk beyond) rewound for reading.
+    """
+    spool = tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_MAX_MEMORY)
+    try:
+        write_attempts_workbook(spool, sheet_title, attempts, item_analysis_rows)
+        spool.seek(0)
+    except Exception:
+        spool.close()
+        raise
+    return spool
+
+
+# --- Streaming text exports ---
+def attempt_export_record(att: dict) -> dict:
+    """One attempt as exported to JSON/NDJSON (includes answers and details)."""
+    summary = summarize_attempt(att)
+    return {
+        "Attempt ID": att.get("attempt_id"),
+        "Student Name": summary["student_name"],
+        "Student Class": summary["student_class"],
+        "Student ID/Number": summary["student_id_number"],
+        "Score (%)": att.get("percentage"),
+        "Score Achieved": att.get("score_achieved"),
+        "Max Score": att.get("max_possible_score"),
+        "Passed": att.get("passed"),
+        "Submission Time (UTC)": att.get("end_time"),
+        "Timed Out": att.get("submitted_due_to_timeout", False),
+        "Answers": att.get("answers"),  # Include raw answers in JSON export
+        "Graded Details": att.get("graded_details"),  # Include grading details
+    }
+
+
+def _batches(items):
+    """Groups an iterator into lists of up to EXPORT_STREAM_BATCH items."""
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= EXPORT_STREAM_BATCH:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def iter_json_export(attempts):
+    """
+    Yields {"quiz_results": [...]} with the same layout as
+    json.dumps(..., indent=2), one batch of attempts at a time.
+    """
+    records = iter(attempts)
+    first = next(records, None)
+    if first is None:
+        yield '{\n  "quiz_results": []\n}'
+        return
+    yield '{\n  "quiz_results": [\n'
+
+    def indented(att):
+        # Nested two levels deep: indent every line of the record by 4 spaces
+        text = json.dumps(attempt_export_record(att), indent=2)
+        return "    " + text.replace("\n", "\n    ")
+
+    yield indented(first)
+    for batch in _batches(records):
+        yield "".join(",\n" + indented(att) for att in batch)
+    yield "\n  ]\n}"
+
+
+def iter_ndjson_export(attempts):
+    """Yields one compact JSON object per line (newline-delimited JSON)."""
+    for batch in _batches(attempts):
+        yield "".join(
+            json.dumps(attempt_export_record(att), separators=(",", ":")) + "\n"
+            for att in batch
+        )
+
+
+def iter_csv_export(attempts):
+    """Yields CSV text with the columns of the Excel results sheet."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(ATTEMPT_SHEET_HEADERS)
+    for batch in _batches(attempts):
+        writer.writerows(attempt_sheet_row(att) for att in batch)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():  # No attempts: header only
+        yield buffer.getvalue()
+
+
+# --- All-quizzes results archive ---
+_INVALID_SHEET_TITLE_CHARS = re.compile(r"[\[\]:*?/\\]")
+
+
+def results_sheet_title(quiz_title: str) -> str:
+    """Results sheet name (Excel: at most 31 characters, no []:*?/\\)."""
+    safe_title = _INVALID_SHEET_TITLE_CHARS.sub("_", quiz_title[:16])
+    return f"Quiz Results ({safe_title})"
+
+
+def _safe_filename_part(text) -> str:
+    return re.sub(r"[^\w.-]+", "_", str(text)).strip("_")[:50] or "Quiz"
+
+
+def _build_workbook_file(path, sheet_title, attempts, item_analysis_rows):
+    """Archive worker (runs in a pool process): writes one quiz workbook."""
+    with open(path, "wb") as f:
+        write_attempts_workbook(f, sheet_title, attempts, item_analysis_rows)
+    return path
+
+
+def _archive_executor(use_processes: bool, max_workers: int):
+    # Frozen builds (PyInstaller) cannot start pool processes without extra
+    # bootstrapping; the threaded fallback produces the same files.
+    if use_processes and not getattr(sys, "frozen", False):
+        return ProcessPoolExecutor(
+            max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")
+        )
+    return ThreadPoolExecutor(max_workers=max_workers)
+
+
+def _archive_quizzes() -> list:
+    """(quiz, filename stem, attempts newest first) for quizzes with attempts."""
+    entries = []
+    for quiz in json_storage.get_data_snapshot().get("quizzes", []):
+        quiz_id = quiz.get("id")
+        attempts = json_storage.get_attempt_timeline(quiz_id)[1]
+        if attempts:
+            stem = f"{_safe_filename_part(quiz.get('title', 'Quiz'))}_{quiz_id}"
+            entries.append((quiz, stem, attempts))
+    return entries
+
+
+def _summary_csv(entries: list) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(
+        ["Quiz ID", "Quiz Title", "File", "Attempts", "Average (%)", "Pass Rate (%)"]
+    )
+    for quiz, stem, attempts in entries:
+        stats = json_storage.get_quiz_result_stats(quiz.get("id"))
+        writer.writerow(
+            [
+                quiz.get("id"),
+                quiz.get("title", ""),
+                stem,
+                len(attempts),
+                stats.get("mean_percentage"),
+                stats.get("pass_rate"),
+            ]
+        )
+    return buffer.getvalue()
+
+
+def build_results_archive(
+    fileobj,
+    export_format: str = "xlsx",
+    progress=None,
+    use_processes: bool = True,
+    max_workers: int = ARCHIVE_MAX_WORKERS,
+) -> dict:
+    """
+    Writes a ZIP with the results of every quiz that has attempts to fileobj:
+    one file per quiz (export_format "xlsx" or "csv") plus summary.csv.
+    progress(quizzes done, total), if given, is called per finished quiz.
+    Returns {"quizzes_exported", "attempts_exported"}.
+    """
+    if export_format not in ARCHIVE_FORMATS:
+        raise ValueError(f"Unsupported archive format '{export_format}'.")
+    entries = _archive_quizzes()
+    total = len(entries)
+    done = 0
+    with zipfile.ZipFile(fileobj, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("summary.csv", _summary_csv(entries))
+        if export_format == "csv":
+            for quiz, stem, attempts in entries:
+                with archive.open(f"{stem}.csv", "w") as member:
+                    for chunk in iter_csv_export(attempts):
+                        member.write(chunk.encode("utf-8"))
+                done += 1
+                if progress is not None:
+                    progress(done, total)
+        elif entries:
+            work_dir = tempfile.mkdtemp(prefix="quizpy-archive-")
+            try:
+                with _archive_executor(
+                    use_processes, max(1, min(max_workers, total))
+                ) as executor:
+                    futures = {
+                        executor.submit(
+                            _build_workbook_file,
+                            os.path.join(work_dir, f"{i}.xlsx"),
+                            results_sheet_title(quiz.get("title", "Quiz")),
+                            attempts,
+                            item_analysis_sheet_rows(get_item_analysis(quiz)),
+                        ): stem
+                        for i, (quiz, stem, attempts) in enumerate(entries)
+                    }
+                    for future in as_completed(futures):
+                        path = future.result()
+                        archive.write(path, f"{futures[future]}.xlsx")
+                        os.remove(path)
+                        done += 1
+                        if progress is not None:
+                            progress(done, total)
+            finally:
+                shutil.rmtree(work_dir, ignore_errors=True)
+    print(
+        f"INFO [Exports]: Wrote results archive ({export_format}) for {total} quiz(zes)."
+    )
+    return {
+        "quizzes_exported": total,
+        "attempts_exported": sum(len(attempts) for _, _, attempts in entries),
+    }
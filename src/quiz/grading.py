@@ -0,0 +1,159 @@
+# src/quiz/grading.py
+"""
+Compiled grading plans for quiz_submit_api.
+
+Everything about a quiz that grading needs (correct option ids, scores,
+short-text answer keys, pass threshold) is preprocessed once per quiz content
+version into a GradingPlan, cached in a QuizVersionCache. Grading a submission
+is then a single loop over the plan. Scores are integer fixed-point values in
+hundredths of a point, which matches the 0.01 precision the results are
+stored with.
+"""
+
+from decimal import Decimal, ROUND_HALF_UP
+
+from .quiz_cache import QuizVersionCache
+
+SCORE_SCALE = 100  # Fixed-point: 1 point == 100 units
+
+# Question kinds in a plan
+KIND_MCQ = "MCQ"
+KIND_SHORT_TEXT_AUTO = "SHORT_TEXT_AUTO"
+KIND_MANUAL = "MANUAL"  # Needs a teacher (e.g. SHORT_TEXT in manual review mode)
+KIND_UNGRADED = "UNGRADED"  # Unknown types: counted in the max score, never scored
+
+
+def to_fixed_score(value) -> int:
+    """Converts a score (int/float/str/Decimal) to fixed-point units."""
+    return int((Decimal(str(value)) * SCORE_SCALE).quantize(Decimal(1), ROUND_HALF_UP))
+
+
+def fixed_to_float(units: int) -> float:
+    return units / SCORE_SCALE
+
+
+class QuestionPlan:
+    """Preprocessed grading data for one question."""
+
+    __slots__ = (
+        "question_id",
+        "kind",
+        "score",
+        "correct_ids",
+        "single_choice",
+        "correct_text",
+    )
+
+    def __init__(self, question: dict):
+        self.question_id = str(question.get("id"))
+        self.score = to_fixed_score(question.get("score", 1))
+        self.correct_ids = None
+        self.single_choice = False
+        self.correct_text = None
+        question_type = question.get("type")
+        if question_type == "MCQ":
+            self.kind = KIND_MCQ
+            self.correct_ids = frozenset(question.get("correct_answer") or [])
+            self.single_choice = bool(question.get("mcq_is_single_choice", False))
+        elif question_type == "SHORT_TEXT":
+            if question.get("short_answer_review_mode", "manual") == "auto":
+                self.kind = KIND_SHORT_TEXT_AUTO
+                correct_text = question.get("short_answer_correct_text")
+                if correct_text is not None:
+                    # Case-insensitive comparison; student answers are also trimmed
+                    self.correct_text = str(correct_text).lower()
+            else:
+                self.kind = KIND_MANUAL
+        else:
+            self.kind = KIND_UNGRADED
+
+
+class GradingPlan:
+    """A quiz compiled for grading. Shared between requests: read-only."""
+
+    __slots__ = ("questions", "max_score", "pass_score_threshold")
+
+    def __init__(self, quiz: dict, questions: list):
+        self.questions = tuple(QuestionPlan(q) for q in questions)
+        self.max_score = sum(q.score for q in self.questions)
+        self.pass_score_threshold = Decimal(
+            str(quiz.get("config", {}).get("pass_score", 70))
+        )
+
+    def grade(self, student_answers: dict) -> dict:
+        """
+        Grades a submission ({question id: answer}). Returns the score fields
+        of the attempt record plus "graded_details".
+        """
+        total = 0
+        graded_details = []
+        for question in self.questions:
+            answer = student_answers.get(question.question_id)
+            is_correct = None  # None = not auto-graded/applicable
+            awarded = 0
+            needs_manual_review = False
+
+            if answer is not None:  # Only grade if student provided an answer
+                kind = question.kind
+                if kind == KIND_MCQ:
+                    if isinstance(answer, list):
+                        selected_ids = frozenset(answer)
+                        if question.single_choice:
+                            # Correct if exactly one selected AND it's the correct one
+                            is_correct = (
+                                len(selected_ids) == 1
+                                and selected_ids <= question.correct_ids
+                            )
+                        else:
+                            # Multiple choice: exact match required
+                            is_correct = selected_ids == question.correct_ids
+                    else:
+                        is_correct = False  # Invalid answer format
+                elif kind == KIND_SHORT_TEXT_AUTO:
+                    is_correct = (
+                        question.correct_text is not None
+                        and isinstance(answer, str)
+                        and answer.strip().lower() == question.correct_text
+                    )
+                elif kind == KIND_MANUAL:
+                    needs_manual_review = True
+                if is_correct:
+                    awarded = question.score
+
+            total += awarded
+            graded_details.append(
+                {
+                    "question_id": question.question_id,
+                    "is_correct": is_correct,
+                    "score_awarded": fixed_to_float(awarded),
+                    "needs_manual_review": needs_manual_review,
+                }
+            )
+
+        percentage = Decimal(0)
+        if self.max_score > 0:
+            # Hundredths of a percent, rounded half up, in integer arithmetic
+            percentage = (
+                Decimal(
+                    (2 * total * 100 * SCORE_SCALE + self.max_score)
+                    // (2 * self.max_score)
+                )
+                / SCORE_SCALE
+            )
+        return {
+            "score_achieved": fixed_to_float(total),
+            "max_possible_score": fixed_to_float(self.max_score),
+            "percentage": float(percentage),
+            "passed": percentage >= self.pass_score_threshold,
+            "pass_score_threshold": float(self.pass_score_threshold),
+            "graded_details": graded_details,
+        }
+
+
+# Process-wide cache used by quiz_submit_api
+grading_plan_cache = QuizVersionCache("GradingPlanCache", GradingPlan)
+
+
+def get_grading_plan(quiz: dict) -> GradingPlan:
+    """Returns the compiled grading plan for quiz from the shared cache."""
+    return grading_plan_cache.get(quiz)
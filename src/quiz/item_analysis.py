@@ -0,0 +1,210 @@
+# src/quiz/item_analysis.py
+"""
+Item analysis for a quiz: per-question difficulty and discrimination.
+
+For every question of the quiz, computed from the stored attempts:
+  - p_value: share of attempts that answered it correctly (auto-graded
+    questions only; unanswered counts as incorrect)
+  - point_biserial: correlation between answering it correctly and the
+    attempt's overall percentage (discrimination)
+  - unanswered_share: share of attempts without an answer
+  - option_distribution (MCQ): how often each option was selected
+
+All of it comes from one pass over the attempts that only accumulates
+per-question counters and sums, and the result is cached per quiz until the
+quiz content or its attempts change.
+"""
+
+import math
+
+from core import json_storage
+from .grading import KIND_MCQ, KIND_SHORT_TEXT_AUTO, GradingPlan
+from .quiz_cache import QuizVersionCache
+
+
+def _mean_and_stddev(total: float, total_squares: float, count: int):
+    if not count:
+        return None, None
+    mean = total / count
+    return mean, math.sqrt(max(total_squares / count - mean * mean, 0.0))
+
+
+def compute_item_analysis(quiz: dict, questions: list, attempts: list) -> dict:
+    """
+    Returns {"attempt_count", "items": [one dict per question, in quiz
+    order]}. Pure function of its arguments; see get_item_analysis() for the
+    cached variant.
+    """
+    plan = {q.question_id: q for q in GradingPlan(quiz, questions).questions}
+    question_ids = [str(q.get("id")) for q in questions]
+    auto_graded = {
+        question_id
+        for question_id in question_ids
+        if question_id in plan
+        and plan[question_id].kind in (KIND_MCQ, KIND_SHORT_TEXT_AUTO)
+    }
+    mcq_ids = {
+        question_id
+        for question_id in question_ids
+        if question_id in plan and plan[question_id].kind == KIND_MCQ
+    }
+
+    # --- Single pass: per-question counters and sums ---
+    answered_counts = dict.fromkeys(question_ids, 0)
+    correct_counts = dict.fromkeys(question_ids, 0)
+    correct_percentage_sums = dict.fromkeys(question_ids, 0.0)
+    option_counts = {question_id: {} for question_id in mcq_ids}
+    attempt_count = 0
+    percentage_sum = 0.0
+    percentage_sum_squares = 0.0
+
+    for attempt in attempts:
+        percentage = attempt.get("percentage")
+        if isinstance(percentage, bool) or not isinstance(percentage, (int, float)):
+            percentage = 0.0
+        attempt_count += 1
+        percentage_sum += percentage
+        percentage_sum_squares += percentage * percentage
+
+        answers = attempt.get("answers")
+        if isinstance(answers, dict):
+            for question_id, answer in answers.items():
+                if answer is None or question_id not in answered_counts:
+                    continue
+                answered_counts[question_id] += 1
+                if question_id in mcq_ids and isinstance(answer, list):
+                    counts = option_counts[question_id]
+                    for option_id in {o for o in answer if isinstance(o, str)}:
+                        counts[option_id] = counts.get(option_id, 0) + 1
+
+        for detail in attempt.get("graded_details") or ():
+            if isinstance(detail, dict) and detail.get("is_correct") is True:
+                question_id = str(detail.get("question_id"))
+                if question_id in correct_counts:
+                    correct_counts[question_id] += 1
+                    correct_percentage_sums[question_id] += percentage
+
+    # --- Per-question statistics from the sums ---
+    mean_all, stddev_all = _mean_and_stddev(
+        percentage_sum, percentage_sum_squares, attempt_count
+    )
+    items = []
+    for question in questions:
+        question_id = str(question.get("id"))
+        n = attempt_count
+        item = {
+            "question_id": question_id,
+            "text": question.get("text", ""),
+            "type": question.get("type"),
+            "answered_count": answered_counts[question_id],
+            "unanswered_share": (
+                round(1 - answered_counts[question_id] / n, 4) if n else None
+            ),
+            "p_value": None,
+            "point_biserial": None,
+            "option_distribution": None,
+        }
+        if question_id in auto_graded and n:
+            correct = correct_counts[question_id]
+            p = correct / n
+            item["p_value"] = round(p, 4)
+            if 0 < correct < n and stddev_all:
+                # r_pb = (M1 - M0) / s * sqrt(p * q)
+                mean_correct = correct_percentage_sums[question_id] / correct
+                mean_incorrect = (
+                    percentage_sum - correct_percentage_sums[question_id]
+                ) / (n - correct)
+                item["point_biserial"] = round(
+                    (mean_correct - mean_incorrect)
+                    / stddev_all
+                    * math.sqrt(p * (1 - p)),
+                    4,
+                )
+        if question_id in mcq_ids:
+            counts = option_counts[question_id]
+            correct_ids = plan[question_id].correct_ids
+            item["option_distribution"] = [
+                {
+                    "option_id": option.get("id"),
+                    "text": option.get("text", ""),
+                    "is_correct": option.get("id") in correct_ids,
+                    "count": counts.get(option.get("id"), 0),
+                    "share": (
+                        round(counts.get(option.get("id"), 0) / n, 4) if n else None
+                    ),
+                }
+                for option in question.get("options") or []
+                if isinstance(option, dict)
+            ]
+        items.append(item)
+
+    return {
+        "attempt_count": attempt_count,
+        "mean_percentage": round(mean_all, 2) if mean_all is not None else None,
+        "items": items,
+    }
+
+
+def _analysis_version(quiz_id):
+    """Cache key part: changes with the quiz content and with its attempts."""
+    content_version = json_storage.get_quiz_content_version(quiz_id)
+    if content_version is None:
+        return None
+    return (content_version, json_storage.get_attempt_revision(quiz_id))
+
+
+def _compile_item_analysis(quiz: dict, questions: list) -> dict:
+    attempts = json_storage.get_attempt_timeline(quiz.get("id"))[1]
+    return compute_item_analysis(quiz, questions, attempts)
+
+
+# Process-wide cache used by the item analysis API and the Excel export
+item_analysis_cache = QuizVersionCache(
+    "ItemAnalysisCache", _compile_item_analysis, version_func=_analysis_version
+)
+
+
+def get_item_analysis(quiz: dict) -> dict:
+    """Returns the (cached) item analysis of quiz. Shared: do not mutate."""
+    return item_analysis_cache.get(quiz)
+
+
+ITEM_ANALYSIS_SHEET_HEADERS = [
+    "Question ID",
+    "Question",
+    "Type",
+    "Answered",
+    "Unanswered (%)",
+    "Difficulty (p-value)",
+    "Discrimination (point-biserial)",
+    "Option Distribution",
+]
+
+
+def item_analysis_sheet_rows(analysis: dict) -> list:
+    """Rows (without header) for the item analysis sheet of the Excel export."""
+    rows = []
+    for item in analysis["items"]:
+        distribution = ""
+        if item["option_distribution"]:
+            distribution = "; ".join(
+                f"{'*' if option['is_correct'] else ''}{option['text']}: {option['count']}"
+                for option in item["option_distribution"]
+            )
+        rows.append(
+            [
+                item["question_id"],
+                item["text"],
+                item["type"],
+                item["answered_count"],
+                (
+                    round(100 * item["unanswered_share"], 2)
+                    if item["unanswered_share"] is not None
+                    else ""
+                ),
+                item["p_value"] if item["p_value"] is not None else "",
+                item["point_biserial"] if item["point_biserial"] is not None else "",
+                distribution,
+            ]
+        )
+    return rows
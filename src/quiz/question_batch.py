@@ -0,0 +1,343 @@
+# src/quiz/question_batch.py
+"""
+Batched question changes: create, update and delete many questions at once.
+
+run_question_batch() validates every operation against the current data
+while holding the storage write lock, and only if all of them are valid
+applies them with a single commit_changes() call (one persist, one index
+update per record). If any operation is invalid nothing is applied and
+every operation's result is reported. Media files of deleted questions (and
+of MCQ options dropped by updates) are removed in one pass after the
+commit.
+
+apply_question_changes() holds the field rules of a JSON question update and
+is shared with the single-question PUT endpoint.
+"""
+
+import copy
+import uuid
+
+from core import json_storage
+
+# --- Batch Configuration ---
+QUESTION_BATCH_MAX_OPERATIONS = 500
+BATCH_OPERATIONS = ("create", "update", "delete")
+
+
+class QuestionChangeError(ValueError):
+    """Raised when question data or a change to it is invalid."""
+
+
+def question_media_files(question: dict) -> set:
+    """Media filenames referenced by the question and its options."""
+    filenames = set()
+    if question.get("media_filename"):
+        filenames.add(question["media_filename"])
+    for opt in question.get("options") or []:
+        if isinstance(opt, dict) and opt.get("media_filename"):
+            filenames.add(opt["media_filename"])
+    return filenames
+
+
+def delete_media_files(filenames) -> int:
+    """Deletes the media files (missing ones are skipped); returns the count."""
+    media_dir = json_storage.get_media_dir()
+    if not media_dir:
+        return 0
+    deleted_count = 0
+    for filename in set(filenames):
+        if not filename:
+            continue
+        try:
+            file_path = media_dir / filename
+            if file_path.is_file():
+                file_path.unlink()
+                print(f"DEBUG [Question Media]: Deleted media file: {file_path}")
+                deleted_count += 1
+            else:
+                print(
+                    f"WARNING [Question Media]: Media file not found for deletion: {file_path}"
+                )
+        except Exception as e:
+            print(
+                f"ERROR [Question Media]: Failed to delete media file {filename}: {e}"
+            )
+    return deleted_count
+
+
+def _mcq_options_from_texts(
+    options_texts, correct_texts, is_single: bool, existing_options=()
+):
+    """
+    Builds (options, correct option ids) from option texts, keeping the id
+    and media of an existing option with the same text.
+    """
+    if not isinstance(options_texts, list) or not isinstance(correct_texts, list):
+        raise QuestionChangeError('"options" and "correct_answer_texts" must be lists.')
+    if is_single and len(correct_texts) != 1:
+        raise QuestionChangeError(
+            "Single-choice requires exactly one correct answer text."
+        )
+    if not is_single and len(correct_texts) == 0:
+        raise QuestionChangeError(
+            "Multiple-choice requires at least one correct answer text."
+        )
+    if len(options_texts) < 2:
+        raise QuestionChangeError("MCQ requires at least two options.")
+
+    existing_options_map_by_text = {
+        opt.get("text"): opt
+        for opt in existing_options
+        if isinstance(opt, dict) and opt.get("text")
+    }
+    new_options = []
+    correct_ids = []
+    correct_text_set = set(correct_texts)
+    used_existing_ids = set()
+    for opt_text in options_texts:
+        if not isinstance(opt_text, str):
+            continue
+        existing_opt = existing_options_map_by_text.get(opt_text)
+        media_file = None
+        if existing_opt and existing_opt["id"] not in used_existing_ids:
+            opt_id = existing_opt["id"]
+            media_file = existing_opt.get("media_filename")
+            used_existing_ids.add(opt_id)
+        else:  # New option text or ID already used, generate new ID
+            opt_id = str(uuid.uuid4())
+        new_options.append(
+            {"id": opt_id, "text": opt_text, "media_filename": media_file}
+        )
+        if opt_text in correct_text_set:
+            correct_ids.append(opt_id)
+
+    # Final validation on mapped IDs
+    if len(correct_ids) != len(correct_text_set):
+        raise QuestionChangeError("Correct answer text mapping failed during update.")
+    if is_single and len(correct_ids) != 1:
+        raise QuestionChangeError(
+            "Correct answer ID mapping failed for single choice update."
+        )
+    return new_options, correct_ids
+
+
+def apply_question_changes(question: dict, changes: dict) -> dict:
+    """
+    Returns a copy of question with the JSON changes applied (text/config
+    only, no media). MCQ options are replaced by texts: "options" and
+    "correct_answer_texts" must be given together. Raises
+    QuestionChangeError for invalid changes.
+    """
+    if not isinstance(changes, dict):
+        raise QuestionChangeError("Changes must be a JSON object.")
+    updated_question = copy.deepcopy(question)  # Work on a copy
+
+    # --- Update ONLY non-file fields ---
+    if "text" in changes:
+        updated_question["text"] = changes["text"]
+    if "score" in changes:
+        try:
+            updated_question["score"] = int(changes["score"])
+        except (ValueError, TypeError):
+            raise QuestionChangeError("Invalid score format.")
+    if "difficulty" in changes:
+        updated_question["difficulty"] = changes["difficulty"]
+    if "category" in changes:
+        updated_question["category"] = changes["category"]
+    if "quiz_ids" in changes:
+        if not isinstance(changes["quiz_ids"], list):
+            raise QuestionChangeError("quiz_ids must be a list.")
+        updated_question["quiz_ids"] = [str(qid) for qid in changes["quiz_ids"]]
+
+    # Update flags/modes
+    if "mcq_is_single_choice" in changes:
+        updated_question["mcq_is_single_choice"] = bool(changes["mcq_is_single_choice"])
+    if "short_answer_review_mode" in changes:
+        mode = changes["short_answer_review_mode"]
+        if mode not in ["manual", "auto"]:
+            raise QuestionChangeError("Invalid review mode.")
+        updated_question["short_answer_review_mode"] = mode
+        if mode == "manual":
+            # Clear correct text if switching to manual
+            updated_question["short_answer_correct_text"] = None
+    if "short_answer_correct_text" in changes:
+        if updated_question.get("short_answer_review_mode") == "auto":
+            text = changes["short_answer_correct_text"]
+            updated_question["short_answer_correct_text"] = (
+                text.strip() if isinstance(text, str) else None
+            )
+        else:
+            updated_question["short_answer_correct_text"] = None  # Not in auto mode
+
+    # Update MCQ options TEXT ONLY and correct answers based on TEXTS
+    if updated_question.get("type") == "MCQ" and (
+        "options" in changes or "correct_answer_texts" in changes
+    ):
+        options_texts = changes.get("options")  # Expect list of strings
+        correct_texts = changes.get("correct_answer_texts")  # Expect list of strings
+        if options_texts is None or correct_texts is None:
+            raise QuestionChangeError(
+                'For MCQ update via JSON, provide lists for "options" (texts) and "correct_answer_texts".'
+            )
+        # Existing options are the base, to preserve IDs and media
+        updated_question["options"], updated_question["correct_answer"] = (
+            _mcq_options_from_texts(
+                options_texts,
+                correct_texts,
+                updated_question.get("mcq_is_single_choice", False),
+                updated_question.get("options") or [],
+            )
+        )
+    return updated_question
+
+
+def build_question(data: dict) -> dict:
+    """
+    Builds a new question record (fresh id, no media) from JSON data with
+    the fields of the create form; MCQ options are given as "options" texts
+    plus "correct_answer_texts". Raises QuestionChangeError if invalid.
+    """
+    if not isinstance(data, dict):
+        raise QuestionChangeError("Question data must be a JSON object.")
+    q_type = data.get("type")
+    text = str(data.get("text") or "").strip()
+    if not q_type:
+        raise QuestionChangeError("Question type is required.")
+    if not text:
+        raise QuestionChangeError("Question text is required.")
+    new_question = {
+        "id": str(uuid.uuid4()),
+        "quiz_ids": [],
+        "text": text,
+        "type": q_type,
+        "media_filename": None,
+        "score": 1,
+        "difficulty": "Medium",
+        "category": "Uncategorized",
+        "options": [],
+        "correct_answer": [],
+        "short_answer_review_mode": "manual",
+        "short_answer_correct_text": None,
+        "mcq_is_single_choice": False,
+    }
+    if q_type == "MCQ" and (
+        "options" not in data or "correct_answer_texts" not in data
+    ):
+        raise QuestionChangeError(
+            'MCQ questions need "options" (texts) and "correct_answer_texts".'
+        )
+    changes = {key: value for key, value in data.items() if key not in ("id", "type")}
+    changes["text"] = text
+    if (
+        q_type == "SHORT_TEXT"
+        and changes.get("short_answer_review_mode") == "auto"
+        and not str(changes.get("short_answer_correct_text") or "").strip()
+    ):
+        raise QuestionChangeError(
+            "Correct answer text is required for automatic review mode."
+        )
+    if "category" in changes:
+        changes["category"] = str(changes["category"] or "").strip() or "Uncategorized"
+    return apply_question_changes(new_question, changes)
+
+
+def _validate_operation(operation, index, touched_ids: set):
+    """
+    Returns (kind, question id, old record, new record) for one operation;
+    new record is None for deletes. Raises QuestionChangeError if invalid.
+    """
+    if not isinstance(operation, dict):
+        raise QuestionChangeError("Each operation must be a JSON object.")
+    kind = operation.get("op")
+    if kind not in BATCH_OPERATIONS:
+        raise QuestionChangeError(
+            f"'op' must be one of: {', '.join(BATCH_OPERATIONS)}."
+        )
+    if kind == "create":
+        new_question = build_question(operation.get("question"))
+        return kind, new_question["id"], None, new_question
+
+    question_id = str(operation.get("id") or "")
+    if not question_id:
+        raise QuestionChangeError("'id' is required.")
+    if question_id in touched_ids:
+        raise QuestionChangeError(
+            f"Question {question_id} appears more than once in the batch."
+        )
+    touched_ids.add(question_id)
+    question = index.get_question(question_id)
+    if question is None:
+        raise QuestionChangeError(f"Question with ID {question_id} not found.")
+    if kind == "delete":
+        return kind, question_id, question, None
+    new_question = apply_question_changes(question, operation.get("changes"))
+    new_question["id"] = question.get("id")
+    return kind, question_id, question, new_question
+
+
+def run_question_batch(operations: list) -> dict:
+    """
+    Validates and applies the operations all-or-nothing. Returns
+    {"applied", "results", "created", "updated", "deleted",
+    "media_files_deleted"}; each result has the operation's "index", "op",
+    "id" and "status" ("created"/"updated"/"deleted", "error" with "error",
+    or "not_applied" when another operation failed).
+    """
+    validated = []
+    results = []
+    with json_storage.write_transaction():
+        index = json_storage.get_data_index()
+        touched_ids = set()
+        for position, operation in enumerate(operations):
+            result = {
+                "index": position,
+                "op": operation.get("op") if isinstance(operation, dict) else None,
+                "id": operation.get("id") if isinstance(operation, dict) else None,
+            }
+            try:
+                validated.append(_validate_operation(operation, index, touched_ids))
+            except QuestionChangeError as e:
+                result.update(status="error", error=str(e))
+            results.append(result)
+
+        failed = sum(result.get("status") == "error" for result in results)
+        if failed:
+            print(
+                f"DEBUG [Question Batch]: {failed} operation(s) invalid, nothing applied."
+            )
+            for result in results:
+                result.setdefault("status", "not_applied")
+            return {"applied": False, "results": results}
+
+        upserts = [new for _kind, _qid, _old, new in validated if new is not None]
+        deleted_ids = [qid for _kind, qid, _old, new in validated if new is None]
+        json_storage.commit_changes(questions=upserts, deleted_question_ids=deleted_ids)
+
+    # --- Media cleanup in one pass, once the changes are persisted ---
+    media_to_delete = set()
+    counts = {"create": 0, "update": 0, "delete": 0}
+    for result, (kind, question_id, old, new) in zip(results, validated):
+        counts[kind] += 1
+        result["id"] = question_id
+        result["status"] = {"create": "created", "update": "updated"}.get(
+            kind, "deleted"
+        )
+        if new is not None:
+            result["question"] = new
+        if old is not None:
+            # Files of deleted questions and of options an update dropped
+            media_to_delete |= question_media_files(old) - (
+                question_media_files(new) if new is not None else set()
+            )
+    media_files_deleted = delete_media_files(media_to_delete)
+    print(
+        f"DEBUG [Question Batch]: Applied {len(validated)} operation(s) in one commit, deleted {media_files_deleted} media file(s)."
+    )
+    return {
+        "applied": True,
+        "results": results,
+        "created": counts["create"],
+        "updated": counts["update"],
+        "deleted": counts["delete"],
+        "media_files_deleted": media_files_deleted,
+    }
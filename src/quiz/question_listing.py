@@ -0,0 +1,238 @@
+# src/quiz/question_listing.py
+"""
+Paginated, filtered and sorted listing of the question bank.
+
+Filters are answered from the inverted indexes kept by the data index
+(category, type, difficulty) plus the quiz's own question list, intersected
+smallest first. Sorted orders are built once per sort field and reused until
+a question changes, so a page costs a walk over the (pre-sorted) ids instead
+of filtering and sorting every question on each request. Facet counts for
+the filter controls come from the same sets.
+
+A search query (q) is answered from the incremental full-text index
+(core.text_search): its matches act as one more filter set and, unless an
+explicit sort is requested, the page is ordered by BM25 relevance.
+"""
+
+import itertools
+import math
+
+from core import json_storage
+from core.indexes import (
+    QUESTION_SORT_KEYS,
+    normalize_category,
+    normalize_difficulty,
+    normalize_question_type,
+)
+from .attempt_listing import InvalidListingParameter
+
+# --- Paging Configuration ---
+QUESTIONS_PAGE_DEFAULT_SIZE = 50
+QUESTIONS_PAGE_MAX_SIZE = 500
+
+FACETS = ("category", "type", "difficulty")
+
+
+def summarize_question(question: dict) -> dict:
+    """Builds the row shown in the question bank and the quiz editor modal."""
+    return {
+        "id": question.get("id"),
+        "text": question.get("text"),
+        "type": question.get("type"),
+        "category": question.get("category"),
+        "difficulty": question.get("difficulty"),
+    }
+
+
+def _parse_positive_int(name: str, value, default: int) -> int:
+    if value in (None, ""):
+        return default
+    try:
+        number = int(value)
+    except ValueError:
+        raise InvalidListingParameter(f"'{name}' must be a number.")
+    if number < 1:
+        raise InvalidListingParameter(f"'{name}' must be at least 1.")
+    return number
+
+
+def parse_question_listing_params(params) -> dict:
+    """
+    Reads the search query (q), filters (category, type, difficulty, quiz),
+    sort (a field of
+    QUESTION_SORT_KEYS, '-' prefix for descending), page and page_size from
+    a QueryDict (or dict).
+    """
+    query = str(params.get("q") or "").strip()
+    sort = str(params.get("sort") or "").strip()
+    descending = sort.startswith("-")
+    sort = sort.lstrip("-")
+    if sort and sort not in QUESTION_SORT_KEYS:
+        raise InvalidListingParameter(
+            f"'sort' must be one of: {', '.join(QUESTION_SORT_KEYS)}."
+        )
+    page_size = _parse_positive_int(
+        "page_size", params.get("page_size"), QUESTIONS_PAGE_DEFAULT_SIZE
+    )
+    return {
+        "query": query or None,
+        "category": params.get("category") or None,
+        "question_type": params.get("type") or None,
+        "difficulty": params.get("difficulty") or None,
+        "quiz_id": params.get("quiz") or None,
+        "sort": sort or None,
+        "descending": descending,
+        "page": _parse_positive_int("page", params.get("page"), 1),
+        "page_size": min(page_size, QUESTIONS_PAGE_MAX_SIZE),
+    }
+
+
+def _intersect(sets: list):
+    """Intersection of sets (smallest first); None (= everything) if no sets."""
+    if not sets:
+        return None
+    sets = sorted(sets, key=len)
+    result = set(sets[0])
+    for other in sets[1:]:
+        result &= other
+        if not result:
+            break
+    return result
+
+
+def _facet_counts(inverted_index: dict, base, label_func) -> list:
+    counts = []
+    for value, question_ids in inverted_index.items():
+        count = len(question_ids) if base is None else len(question_ids & base)
+        if count:
+            counts.append({"value": label_func(value), "count": count})
+    counts.sort(key=lambda facet: str(facet["value"]).casefold())
+    return counts
+
+
+def list_questions_page(
+    query: str | None = None,
+    category: str | None = None,
+    question_type: str | None = None,
+    difficulty: str | None = None,
+    quiz_id=None,
+    sort: str | None = None,
+    descending: bool = False,
+    page: int = 1,
+    page_size: int = QUESTIONS_PAGE_DEFAULT_SIZE,
+) -> dict:
+    """
+    Returns {"questions", "total", "page", "page_size", "num_pages",
+    "facets"}. Without sort, questions are in creation order, or by
+    relevance (best first, "score" added to each row) when query is given.
+    Each facet counts the matches of the query and the other filters per
+    value of that facet.
+    """
+    # The search takes the snapshot lock itself, so it runs first
+    ranked = json_storage.search_questions(query) if query is not None else None
+    # The page walks and the facet counts iterate the index's live dicts and
+    # sets, so they run under the snapshot lock (no update can interleave)
+    return json_storage.read_data_index(
+        lambda index: _build_questions_page(
+            index,
+            ranked,
+            category,
+            question_type,
+            difficulty,
+            quiz_id,
+            sort,
+            descending,
+            page,
+            page_size,
+        )
+    )
+
+
+def _build_questions_page(
+    index,
+    ranked,
+    category,
+    question_type,
+    difficulty,
+    quiz_id,
+    sort,
+    descending,
+    page,
+    page_size,
+) -> dict:
+    """Builds list_questions_page()'s result; ranked is None without a query."""
+    filter_sets = {}
+    if category is not None:
+        filter_sets["category"] = index.question_ids_by_category.get(
+            normalize_category(category), set()
+        )
+    if question_type is not None:
+        filter_sets["type"] = index.question_ids_by_type.get(
+            normalize_question_type(question_type), set()
+        )
+    if difficulty is not None:
+        filter_sets["difficulty"] = index.question_ids_by_difficulty.get(
+            normalize_difficulty(difficulty), set()
+        )
+    if quiz_id is not None:
+        quiz = index.get_quiz(quiz_id)
+        filter_sets["quiz"] = {
+            str(question_id) for question_id in (quiz or {}).get("questions") or []
+        }
+    matching = _intersect(list(filter_sets.values()))
+    if matching is not None:
+        matching &= index.questions_by_id.keys()
+
+    scores = {}
+    if ranked is not None:
+        # All matches of the query, so the facets can count them per value
+        scores = dict(ranked)
+        filter_sets["query"] = set(scores)
+        query_matches = filter_sets["query"] & index.questions_by_id.keys()
+        matching = query_matches if matching is None else matching & query_matches
+
+    # --- Page from the (cached) sorted order, or by relevance ---
+    if sort:
+        order = index.get_question_order(sort)
+    elif ranked is not None:
+        order = [question_id for question_id, _score in ranked]
+    else:
+        order = index.questions_by_id
+    ordered_ids = reversed(order) if descending else iter(order)
+    if matching is not None:
+        ordered_ids = (qid for qid in ordered_ids if qid in matching)
+    start = (page - 1) * page_size
+    page_ids = list(itertools.islice(ordered_ids, start, start + page_size))
+    total = len(index.questions_by_id) if matching is None else len(matching)
+
+    facets = {}
+    facet_sources = {
+        "category": (
+            index.question_ids_by_category,
+            lambda value: index.category_labels.get(value, value),
+        ),
+        "type": (index.question_ids_by_type, lambda value: value),
+        "difficulty": (
+            index.question_ids_by_difficulty,
+            lambda value: value.capitalize(),
+        ),
+    }
+    for facet in FACETS:
+        others = [ids for name, ids in filter_sets.items() if name != facet]
+        inverted_index, label_func = facet_sources[facet]
+        facets[facet] = _facet_counts(inverted_index, _intersect(others), label_func)
+
+    questions = []
+    for qid in page_ids:
+        row = summarize_question(index.questions_by_id[qid])
+        if ranked is not None:
+            row["score"] = round(scores[qid], 4)
+        questions.append(row)
+    return {
+        "questions": questions,
+        "total": total,
+        "page": page,
+        "page_size": page_size,
+        "num_pages": max(1, math.ceil(total / page_size)),
+        "facets": facets,
+    }
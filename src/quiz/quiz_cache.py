@@ -0,0 +1,72 @@
+# src/quiz/quiz_cache.py
+"""
+Caches for data compiled from one quiz (student payload, grading plan, ...).
+
+Entries are keyed by quiz id and are valid while the quiz's content version
+(see core.indexes) is unchanged, i.e. until the quiz or one of its questions
+is edited. Compiled values are shared between requests: do not mutate them.
+"""
+
+import threading
+from collections import OrderedDict
+
+from core import json_storage
+
+# --- Cache Configuration ---
+QUIZ_CACHE_MAX_ENTRIES = 512  # Quizzes kept per cache, least recently used dropped
+
+
+class QuizVersionCache:
+    """
+    Holds one compiled value per quiz, built by compile_func(quiz, questions)
+    and valid while version_func(quiz_id) (by default the quiz's content
+    version) is unchanged. Bounded LRU; thread-safe.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        compile_func,
+        max_entries: int = QUIZ_CACHE_MAX_ENTRIES,
+        version_func=None,
+    ):
+        self._name = name
+        self._compile_func = compile_func
+        self._version_func = version_func
+        self._max_entries = max(1, int(max_entries))
+        self._entries = OrderedDict()  # quiz id -> (version, compiled value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, quiz: dict):
+        """Returns the compiled value for quiz, building it on a miss."""
+        quiz_id = str(quiz.get("id"))
+        # Read the version before the records: the cached value is then
+        # never older than the version it is stored under
+        if self._version_func is not None:
+            version = self._version_func(quiz_id)
+        else:
+            version = json_storage.get_quiz_content_version(quiz_id)
+        with self._lock:
+            entry = self._entries.get(quiz_id)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(quiz_id)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        print(f"DEBUG [{self._name}]: Compiling quiz {quiz_id} (version {version}).")
+        quiz = json_storage.get_quiz(quiz_id) or quiz
+        compiled = self._compile_func(quiz, json_storage.get_quiz_questions(quiz))
+        if version is not None:  # Quizzes not in the store are never cached
+            with self._lock:
+                self._entries[quiz_id] = (version, compiled)
+                self._entries.move_to_end(quiz_id)
+                while len(self._entries) > self._max_entries:
+                    self._entries.popitem(last=False)
+        return compiled
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
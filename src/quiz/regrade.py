@@ -0,0 +1,266 @@
+# src/quiz/regrade.py
+"""
+Bulk regrading of stored attempts after a quiz's answer key or scores change.
+
+Attempts keep the graded_details/percentage/passed computed at submission
+time. regrade_quiz() and regrade_question() grade every affected attempt
+again against the quiz's current grading plan (see quiz.grading), persist
+the attempts whose results changed in one write, and report them. Both hold
+the storage write lock throughout, so the answer key cannot change between
+grading and saving.
+
+Grading works column-wise: for each question the distinct answers of all
+attempts are encoded as a boolean answers x options matrix and compared to
+the correct option vector in one array operation. NumPy is used when it is installed;
+otherwise every attempt is graded with GradingPlan.grade(), which gives the
+same results, just slower.
+"""
+
+import datetime
+from decimal import Decimal, ROUND_CEILING
+
+from core import json_storage
+from .grading import (
+    KIND_MANUAL,
+    KIND_MCQ,
+    KIND_SHORT_TEXT_AUTO,
+    SCORE_SCALE,
+    get_grading_plan,
+)
+
+try:
+    import numpy as np
+except ImportError:  # Optional dependency, see _grade_with_python()
+    np = None
+
+# Attempt fields recomputed by a regrade
+GRADED_FIELDS = (
+    "score_achieved",
+    "max_possible_score",
+    "percentage",
+    "passed",
+    "pass_score_threshold",
+    "graded_details",
+)
+
+
+def _answers_of(attempt: dict) -> dict:
+    answers = attempt.get("answers")
+    return answers if isinstance(answers, dict) else {}
+
+
+def _grade_with_python(plan, answer_dicts: list) -> list:
+    return [plan.grade(answers) for answers in answer_dicts]
+
+
+def _mcq_states(question, column: list):
+    """
+    Returns (answered mask, correct mask) for one MCQ column. Each distinct
+    selection is encoded once as a row of a boolean patterns x options
+    matrix and compared to the correct option vector; attempts then just
+    index into the per-pattern result.
+    """
+    unanswered, invalid = -1, -2
+    patterns = {}  # tuple(selected ids) -> pattern number
+    selections = []
+    codes = []
+    for answer in column:
+        if answer is None:
+            codes.append(unanswered)
+        elif not isinstance(answer, list):
+            codes.append(invalid)  # Invalid answer format: graded as incorrect
+        else:
+            try:
+                key = tuple(answer)
+                code = patterns.get(key)
+            except TypeError:  # Unhashable option ids
+                codes.append(invalid)
+                continue
+            if code is None:
+                code = patterns[key] = len(selections)
+                selections.append(frozenset(answer))
+            codes.append(code)
+
+    option_columns = {option_id: i for i, option_id in enumerate(question.correct_ids)}
+    for selected in selections:
+        for option_id in selected:
+            option_columns.setdefault(option_id, len(option_columns))
+    selected_matrix = np.zeros((len(selections), len(option_columns)), dtype=bool)
+    for row, selected in enumerate(selections):
+        selected_matrix[row, [option_columns[o] for o in selected]] = True
+    correct_vector = np.zeros(len(option_columns), dtype=bool)
+    correct_vector[: len(question.correct_ids)] = True
+
+    if question.single_choice:
+        # Exactly one selected, and it is a correct one
+        wrong_selected = (selected_matrix & ~correct_vector).any(axis=1)
+        pattern_correct = (selected_matrix.sum(axis=1) == 1) & ~wrong_selected
+    else:
+        pattern_correct = (selected_matrix == correct_vector).all(axis=1)
+
+    codes = np.array(codes, dtype=np.int64)
+    # Extra False entry at the end: negative codes index into it
+    pattern_correct = np.append(pattern_correct, False)
+    correct = pattern_correct[np.where(codes >= 0, codes, -1)]
+    return codes != unanswered, correct
+
+
+def _grade_with_numpy(plan, answer_dicts: list) -> list:
+    n = len(answer_dicts)
+    question_count = len(plan.questions)
+    # States: -1 = not graded (None), 0 = incorrect, 1 = correct
+    states = np.full((n, question_count), -1, dtype=np.int8)
+    manual = np.zeros((n, question_count), dtype=bool)
+    scores = np.array([q.score for q in plan.questions], dtype=np.int64)
+
+    for j, question in enumerate(plan.questions):
+        column = [answers.get(question.question_id) for answers in answer_dicts]
+        if question.kind == KIND_MCQ:
+            answered, correct = _mcq_states(question, column)
+        else:
+            answered = np.fromiter((a is not None for a in column), bool, n)
+            if question.kind == KIND_SHORT_TEXT_AUTO:
+                key = question.correct_text
+                correct = np.fromiter(
+                    (
+                        key is not None
+                        and isinstance(a, str)
+                        and a.strip().lower() == key
+                        for a in column
+                    ),
+                    bool,
+                    n,
+                )
+            else:
+                if question.kind == KIND_MANUAL:
+                    manual[:, j] = answered
+                continue  # Stays -1 (needs review / not auto-graded)
+        states[:, j] = np.where(answered, correct.astype(np.int8), -1)
+
+    awarded = np.where(states == 1, scores, 0)
+    totals = awarded.sum(axis=1)
+    max_score = plan.max_score
+    if max_score > 0:
+        # Hundredths of a percent, rounded half up (same as GradingPlan.grade)
+        percentages = (2 * totals * 100 * SCORE_SCALE + max_score) // (2 * max_score)
+    else:
+        percentages = np.zeros(n, dtype=np.int64)
+    pass_threshold = int(
+        (plan.pass_score_threshold * SCORE_SCALE).to_integral_value(ROUND_CEILING)
+    )
+    passed = percentages >= pass_threshold
+
+    question_ids = [q.question_id for q in plan.questions]
+    state_values = {-1: None, 0: False, 1: True}
+    results = []
+    for state_row, awarded_row, manual_row, total, percentage, is_passed in zip(
+        states.tolist(),
+        awarded.tolist(),
+        manual.tolist(),
+        totals.tolist(),
+        percentages.tolist(),
+        passed.tolist(),
+    ):
+        results.append(
+            {
+                "score_achieved": total / SCORE_SCALE,
+                "max_possible_score": max_score / SCORE_SCALE,
+                "percentage": float(Decimal(percentage) / SCORE_SCALE),
+                "passed": is_passed,
+                "pass_score_threshold": float(plan.pass_score_threshold),
+                "graded_details": [
+                    {
+                        "question_id": question_id,
+                        "is_correct": state_values[state],
+                        "score_awarded": points / SCORE_SCALE,
+                        "needs_manual_review": needs_review,
+                    }
+                    for question_id, state, points, needs_review in zip(
+                        question_ids, state_row, awarded_row, manual_row
+                    )
+                ],
+            }
+        )
+    return results
+
+
+def grade_attempts(plan, attempts: list, use_numpy: bool | None = None) -> list:
+    """
+    Grades the answers of many attempts against plan. Returns one result
+    dict per attempt, in the same format as GradingPlan.grade().
+    use_numpy=None picks NumPy when it is installed.
+    """
+    if use_numpy is None:
+        use_numpy = np is not None
+    answer_dicts = [_answers_of(attempt) for attempt in attempts]
+    if use_numpy and attempts:
+        return _grade_with_numpy(plan, answer_dicts)
+    return _grade_with_python(plan, answer_dicts)
+
+
+def _changed_attempts(quiz: dict, attempts: list, regraded_at: str) -> list:
+    """Returns updated copies of the attempts whose grading results change."""
+    results = grade_attempts(get_grading_plan(quiz), attempts)
+    changed = []
+    for attempt, result in zip(attempts, results):
+        if any(attempt.get(field) != result[field] for field in GRADED_FIELDS):
+            changed.append({**attempt, **result, "regraded_at": regraded_at})
+    return changed
+
+
+def _regrade_quizzes(quizzes: list, progress=None) -> dict:
+    regraded_at = datetime.datetime.now(datetime.timezone.utc).isoformat()
+    attempts_checked = 0
+    changed = []
+    for done, quiz in enumerate(quizzes, start=1):
+        attempts = json_storage.get_attempts_for_quiz(quiz.get("id"))
+        attempts_checked += len(attempts)
+        changed.extend(_changed_attempts(quiz, attempts, regraded_at))
+        if progress is not None:
+            progress(done, len(quizzes))
+    if changed:
+        json_storage.commit_changes(attempts=changed)  # One write for everything
+    print(
+        f"INFO [Regrade]: Checked {attempts_checked} attempt(s) in {len(quizzes)} quiz(zes), {len(changed)} changed ({'numpy' if np is not None else 'python'})."
+    )
+    return {
+        "quiz_ids": [str(quiz.get("id")) for quiz in quizzes],
+        "attempts_checked": attempts_checked,
+        "attempts_changed": [attempt.get("attempt_id") for attempt in changed],
+    }
+
+
+def regrade_quiz(quiz_id, progress=None) -> dict | None:
+    """
+    Regrades every attempt of the quiz. Returns a report with the ids of
+    the attempts that changed, or None if the quiz does not exist.
+    progress(done, total), if given, is called after each regraded quiz.
+    """
+    # Held from the lookup to the commit, so no quiz or question change
+    # lands between grading and saving the results
+    with json_storage.write_transaction():
+        quiz = json_storage.get_quiz(quiz_id)
+        if quiz is None:
+            return None
+        return _regrade_quizzes([quiz], progress)
+
+
+def _quizzes_using(index, question_id) -> list:
+    quiz_ids = sorted(index.quiz_ids_by_question.get(str(question_id), ()))
+    quizzes = [index.get_quiz(quiz_id) for quiz_id in quiz_ids]
+    return [quiz for quiz in quizzes if quiz is not None]
+
+
+def regrade_question(question_id, progress=None) -> dict | None:
+    """
+    Regrades the attempts of every quiz using the question. Returns a
+    report, or None if the question does not exist.
+    """
+    with json_storage.write_transaction():
+        if json_storage.get_question(question_id) is None:
+            return None
+        # The quiz id sets are live, so they are read under the snapshot lock
+        quizzes = json_storage.read_data_index(
+            lambda index: _quizzes_using(index, question_id)
+        )
+        return _regrade_quizzes(quizzes, progress)
@@ -0,0 +1,82 @@
+# src/quiz/shuffling.py
+"""
+Deterministic per-student shuffling of the student quiz payload.
+
+Each quiz access that needs shuffling gets a random seed. The question order
+and every question's option order are index permutations derived from that
+seed, applied to copies on top of the cached base payload (see
+quiz.student_payload), so the shared payload is never reordered. The seed is
+sent to the student and stored with the attempt, which lets the exact order a
+student saw be recomputed later from the quiz and the seed alone.
+"""
+
+import random
+import secrets
+
+SHUFFLE_SEED_BYTES = 8  # Seeds are 16 hex characters
+
+
+def new_shuffle_seed() -> str:
+    """Returns a fresh random seed for one quiz access."""
+    return secrets.token_hex(SHUFFLE_SEED_BYTES)
+
+
+def is_valid_shuffle_seed(seed) -> bool:
+    """Seeds come back from the browser, so only accept the format we issue."""
+    if not isinstance(seed, str) or len(seed) != SHUFFLE_SEED_BYTES * 2:
+        return False
+    try:
+        int(seed, 16)
+    except ValueError:
+        return False
+    return True
+
+
+def permutation(seed: str, count: int, scope: str = "questions") -> list:
+    """
+    Returns a permutation of range(count) derived from seed and scope.
+    String seeds are hashed by random.Random, so the result is the same in
+    every process and Python run.
+    """
+    order = list(range(count))
+    random.Random(f"{seed}:{scope}").shuffle(order)
+    return order
+
+
+def shuffle_payload(payload: dict, seed: str, quiz_config: dict) -> dict:
+    """
+    Returns a copy of the student payload with questions and/or MCQ options
+    reordered as configured (randomize_questions / shuffle_answers). The
+    input payload and its question dicts are left untouched.
+    """
+    questions = payload.get("questions", [])
+    if quiz_config.get("randomize_questions", False):
+        questions = [questions[i] for i in permutation(seed, len(questions))]
+    else:
+        questions = list(questions)
+
+    if quiz_config.get("shuffle_answers", False):
+        for i, question in enumerate(questions):
+            options = question.get("options")
+            if question.get("type") == "MCQ" and options:
+                # Scoped by question id, so option order does not depend on question order
+                order = permutation(seed, len(options), f"options:{question.get('id')}")
+                questions[i] = {**question, "options": [options[j] for j in order]}
+
+    return {**payload, "questions": questions, "shuffle_seed": seed}
+
+
+def presented_order(payload: dict, seed: str, quiz_config: dict) -> dict:
+    """
+    Recomputes the order a student saw: {"questions": [question ids],
+    "options": {question id: [option ids]}}. Matches the original as long
+    as the quiz's questions and options have not been edited since.
+    """
+    shuffled = shuffle_payload(payload, seed, quiz_config)
+    return {
+        "questions": [q.get("id") for q in shuffled["questions"]],
+        "options": {
+            q.get("id"): [opt.get("id") for opt in q.get("options", [])]
+            for q in shuffled["questions"]
+        },
+    }
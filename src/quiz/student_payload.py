@@ -0,0 +1,79 @@
+# src/quiz/student_payload.py
+"""
+Cache of the student-facing quiz payload served by quiz_access_api.
+
+The payload (quiz plus questions with answer keys stripped) only depends on
+the quiz's content, so it is built once per (quiz id, content version) and
+kept both as a dict and already encoded as JSON bytes. Unshuffled quizzes
+are served those bytes as-is; shuffled quizzes start from the dict.
+"""
+
+import json
+
+from .quiz_cache import QuizVersionCache
+
+
+class CompiledPayload:
+    """A sanitized student payload. Both forms are shared: do not mutate."""
+
+    __slots__ = ("payload", "body")
+
+    def __init__(self, payload: dict):
+        self.payload = payload
+        self.body = json.dumps(payload).encode("utf-8")
+
+
+def build_student_payload(quiz: dict, questions: list) -> dict:
+    """
+    Builds the quiz structure sent to students: only the config relevant to
+    the student UI, and questions/options without correct answers.
+    """
+    quiz_config = quiz.get("config", {})
+    prepared_quiz = {
+        "id": quiz.get("id"),
+        "title": quiz.get("title"),
+        "description": quiz.get("description"),
+        "config": {  # Send only relevant config for student UI
+            "duration": quiz_config.get("duration"),
+            "presentation_mode": quiz_config.get("presentation_mode", "all"),
+            "allow_back": quiz_config.get("allow_back", True),
+        },
+        "questions": [],
+    }
+    for q in questions:
+        prepared_q = {
+            "id": q.get("id"),
+            "text": q.get("text"),
+            "type": q.get("type"),
+            "score": q.get("score", 1),
+            "media_filename": q.get("media_filename"),
+            "mcq_is_single_choice": q.get("mcq_is_single_choice", False),
+            "options": [],
+        }
+        if q.get("type") == "MCQ" and isinstance(q.get("options"), list):
+            prepared_q["options"] = [
+                {
+                    "id": opt.get("id"),
+                    "text": opt.get("text"),
+                    "media_filename": opt.get("media_filename"),
+                }
+                for opt in q["options"]
+                if isinstance(opt, dict)
+            ]
+        prepared_quiz["questions"].append(prepared_q)
+    return prepared_quiz
+
+
+def _compile_student_payload(quiz: dict, questions: list) -> CompiledPayload:
+    return CompiledPayload(build_student_payload(quiz, questions))
+
+
+# Process-wide cache used by quiz_access_api
+student_payload_cache = QuizVersionCache(
+    "StudentPayloadCache", _compile_student_payload
+)
+
+
+def get_student_payload(quiz: dict) -> CompiledPayload:
+    """Returns the compiled student payload for quiz from the shared cache."""
+    return student_payload_cache.get(quiz)
@@ -0,0 +1,62 @@
+# src/quiz/tests/test_duplicate_report.py
+import io
+import json
+import pytest
+from django.urls import reverse
+from django.contrib.auth.models import User
+import core.json_storage
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def api_client(client):
+    User.objects.create_user(username='deduper', password='password123', is_staff=True)
+    client.login(username='deduper', password='password123')
+    return client
+
+
+def _question(question_id, text, options=("Paris", "Lyon", "Nice")):
+    return {"id": question_id, "text": text, "type": "MCQ", "category": "Geo",
+            "options": [{"id": f"{question_id}-{i}", "text": t} for i, t in enumerate(options)],
+            "correct_answer": [f"{question_id}-0"]}
+
+
+def test_create_and_import_flag_near_duplicates(api_client):
+    core.json_storage.add_question(_question("geo-1", "What is the capital city of France?"))
+
+    response = api_client.post(reverse('quiz:question_list_create'), {
+        "text": "What is the capital city of France ?", "type": "MCQ", "category": "Geo",
+        "options_text[0]": "Paris", "options_correct[0]": "on",
+        "options_text[1]": "Lyon", "options_text[2]": "Nice",
+    })
+    assert response.status_code == 201
+    assert [d['id'] for d in response.json()['possible_duplicates']] == ['geo-1']
+
+    export = {"quiz": {"title": "Geo", "questions": ["old-1", "old-2"]},
+              "questions": [_question("old-1", "What is the capital city of France?"),
+                            _question("old-2", "How many legs does a spider have?", ("8", "6"))]}
+    upload = io.BytesIO(json.dumps(export).encode())
+    upload.name = "geo.json"
+    data = api_client.post(reverse('quiz:quiz_import'), {"quizFile": upload}).json()
+    assert len(data['possible_duplicates']) == 1
+    assert {d['id'] for d in data['possible_duplicates'][0]['duplicates']} >= {'geo-1'}
+
+
+def test_duplicate_report_groups_and_picks_question_to_keep(api_client, baseline_test_data):
+    core.json_storage.add_question(_question("dup-a", "Name the largest ocean on Earth"))
+    core.json_storage.add_question(_question("dup-b", "Name the largest ocean on Earth."))
+    core.json_storage.add_question(_question("solo", "Who painted the Mona Lisa?"))
+    quiz = baseline_test_data['quizzes'][0]
+    core.json_storage.update_quiz(quiz['id'], {"questions": quiz['questions'] + ["dup-b"]})
+
+    report = api_client.get(reverse('quiz:question_duplicates')).json()
+    assert (report['group_count'], report['duplicate_count']) == (1, 1)
+    group = report['groups'][0]
+    # The question used by a quiz is kept over the older unused one
+    assert group['keep'] == 'dup-b'
+    assert [q['id'] for q in group['questions']] == ['dup-a', 'dup-b']
+    assert group['questions'][1]['quiz_ids'] == [quiz['id']]
+
+    core.json_storage.delete_question("dup-a")
+    assert api_client.get(reverse('quiz:question_duplicates')).json()['group_count'] == 0
@@ -0,0 +1,125 @@
+# src/quiz/tests/test_exports.py
+import csv
+import io
+import json
+import zipfile
+import pytest
+import openpyxl
+from django.urls import reverse
+from django.contrib.auth.models import User
+import core.json_storage
+from core.jobs import job_runner
+from quiz.exports import (ATTEMPT_SHEET_HEADERS, attempt_export_record, iter_csv_export,
+                          iter_json_export)
+
+pytestmark = pytest.mark.django_db
+
+
+def _login_teacher(client):
+    User.objects.create_user(username='exporter', password='password123', is_staff=True)
+    client.login(username='exporter', password='password123')
+
+
+def _submit(client, quiz, students):
+    submission = {'student_info': students, 'answers': {}}
+    url = reverse('quiz:quiz_submit', kwargs={'quiz_id': quiz['id']})
+    assert client.post(url, json.dumps(submission), content_type='application/json').status_code == 201
+
+
+def test_excel_export_is_streamed_write_only_workbook(client, baseline_test_data):
+    _login_teacher(client)
+    quiz = baseline_test_data['quizzes'][0]
+    _submit(client, quiz, [{'name': 'Ada', 'class': '5B', 'id': '17'}])
+    _submit(client, quiz, [{'name': 'Bob', 'class': '5B'}, {'name': 'Cy', 'class': '5B'}])
+
+    response = client.get(reverse('quiz:quiz_attempts_export_excel', kwargs={'quiz_id': quiz['id']}))
+    assert response.status_code == 200
+    assert response.streaming
+    assert 'attachment' in response['Content-Disposition']
+
+    workbook = openpyxl.load_workbook(io.BytesIO(b''.join(response.streaming_content)))
+    results, analysis = workbook.worksheets
+    rows = list(results.values)
+    assert list(rows[0]) == ATTEMPT_SHEET_HEADERS
+    assert [row[1] for row in rows[1:]] == ['Bob & Cy', 'Ada']  # Newest first
+    assert results.column_dimensions['A'].width == len(rows[1][0]) + 2
+    assert analysis.title == 'Item Analysis'
+    assert analysis.max_row == 1 + len(quiz['questions'])
+
+
+def test_json_export_streams_same_document_as_json_dumps():
+    attempts = [{'attempt_id': str(i), 'students': [{'name': f'S{i}'}], 'answers': {'q': ['a\nb']},
+                 'percentage': 50.0} for i in range(250)]
+    streamed = ''.join(iter_json_export(attempts))
+    expected = json.dumps({'quiz_results': [attempt_export_record(a) for a in attempts]}, indent=2)
+    assert streamed == expected
+    assert ''.join(iter_json_export([])) == json.dumps({'quiz_results': []}, indent=2)
+
+
+def test_ndjson_and_csv_exports(client, baseline_test_data):
+    _login_teacher(client)
+    quiz = baseline_test_data['quizzes'][0]
+    _submit(client, quiz, [{'name': 'Ada, Jr.', 'class': '5B'}])
+    _submit(client, quiz, [{'name': 'Bob'}])
+
+    response = client.get(reverse('quiz:quiz_attempts_export_ndjson', kwargs={'quiz_id': quiz['id']}))
+    assert response.streaming
+    lines = b''.join(response.streaming_content).decode().splitlines()
+    assert [json.loads(line)['Student Name'] for line in lines] == ['Bob', 'Ada, Jr.']
+
+    response = client.get(reverse('quiz:quiz_attempts_export_csv', kwargs={'quiz_id': quiz['id']}))
+    assert response.streaming
+    rows = list(csv.reader(io.StringIO(b''.join(response.streaming_content).decode())))
+    assert rows[0] == ATTEMPT_SHEET_HEADERS
+    assert [row[1] for row in rows[1:]] == ['Bob', 'Ada, Jr.']
+    assert list(iter_csv_export([])) == [','.join(ATTEMPT_SHEET_HEADERS) + '\r\n']
+
+
+def test_background_excel_export_job(client, baseline_test_data):
+    _login_teacher(client)
+    quiz = baseline_test_data['quizzes'][0]
+    _submit(client, quiz, [{'name': 'Ada'}])
+
+    url = reverse('quiz:quiz_attempts_export_excel', kwargs={'quiz_id': quiz['id']})
+    response = client.get(url + '?background=1')
+    assert response.status_code == 202
+    job_id = response.json()['job_id']
+
+    job_runner.wait(job_id, timeout=10)
+    status = client.get(response.json()['status_url']).json()
+    assert status['status'] == 'succeeded'
+    assert status['result'] == {'attempts_exported': 1}
+
+    download = client.get(status['result_url'])
+    assert download.status_code == 200
+    workbook = openpyxl.load_workbook(io.BytesIO(b''.join(download.streaming_content)))
+    assert [row[1] for row in workbook.worksheets[0].values] == ['Student Name', 'Ada']
+    assert any(job['id'] == job_id for job in client.get(reverse('quiz:job_list')).json()['jobs'])
+
+
+@pytest.mark.parametrize('export_format', ['xlsx', 'csv'])
+def test_results_archive_has_one_file_per_quiz(client, baseline_test_data, export_format):
+    _login_teacher(client)
+    quiz = baseline_test_data['quizzes'][0]
+    second = core.json_storage.add_quiz({**quiz, 'id': '11111111-1111-1111-1111-111111111111',
+                                         'title': 'Second / Quiz', 'access_key': 'ZZZ999'})
+    _submit(client, quiz, [{'name': 'Ada'}])
+    _submit(client, second, [{'name': 'Bob'}])
+    _submit(client, second, [{'name': 'Cy'}])
+
+    url = reverse('quiz:results_archive') + f'?format={export_format}'
+    response = client.get(url)
+    assert response.status_code == 200
+    archive = zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content)))
+    names = sorted(archive.namelist())
+    assert names[-1] == 'summary.csv'
+    assert names[:-1] == sorted([f"Second_Quiz_{second['id']}.{export_format}",
+                                  f"{quiz['title'].replace(' ', '_')}_{quiz['id']}.{export_format}"])
+    member = archive.read(f"Second_Quiz_{second['id']}.{export_format}")
+    if export_format == 'csv':
+        rows = list(csv.reader(io.StringIO(member.decode())))
+    else:
+        rows = list(openpyxl.load_workbook(io.BytesIO(member)).worksheets[0].values)
+    assert [row[1] for row in rows[1:]] == ['Cy', 'Bob']
+
+    assert client.get(reverse('quiz:results_archive') + '?format=pdf').status_code == 400
@@ -0,0 +1,42 @@
+# src/quiz/tests/test_grading.py
+from quiz.grading import GradingPlan, get_grading_plan
+import core.json_storage
+
+
+def _plan():
+    quiz = {"id": "quiz-1", "config": {"pass_score": 60}}
+    questions = [
+        {"id": "q1", "type": "MCQ", "score": 2, "correct_answer": ["a", "b"]},
+        {"id": "q2", "type": "MCQ", "score": 1, "mcq_is_single_choice": True, "correct_answer": ["c"]},
+        {"id": "q3", "type": "SHORT_TEXT", "score": 1.5, "short_answer_review_mode": "auto", "short_answer_correct_text": "Paris"},
+        {"id": "q4", "type": "SHORT_TEXT", "score": 1},
+    ]
+    return GradingPlan(quiz, questions)
+
+
+def test_grading_plan_scores_submission():
+    result = _plan().grade({"q1": ["b", "a"], "q2": ["c", "d"], "q3": "  paris ", "q4": "essay"})
+    assert result["score_achieved"] == 3.5
+    assert result["max_possible_score"] == 5.5
+    assert result["percentage"] == 63.64
+    assert result["passed"] is True
+    details = {d["question_id"]: d for d in result["graded_details"]}
+    assert details["q2"]["is_correct"] is False
+    assert details["q3"]["score_awarded"] == 1.5
+    assert details["q4"]["is_correct"] is None and details["q4"]["needs_manual_review"]
+
+
+def test_unanswered_and_invalid_answers_score_zero():
+    result = _plan().grade({"q1": "a"})
+    assert result["score_achieved"] == 0 and result["passed"] is False
+    assert [d["is_correct"] for d in result["graded_details"]] == [False, None, None, None]
+
+
+def test_plan_is_cached_per_content_version(baseline_test_data):
+    quiz = baseline_test_data["quizzes"][0]
+    plan = get_grading_plan(quiz)
+    assert get_grading_plan(quiz) is plan
+    assert plan.max_score == 1500
+
+    core.json_storage.update_question(baseline_test_data["questions"][0]["id"], {"score": 20})
+    assert get_grading_plan(quiz).max_score == 2500
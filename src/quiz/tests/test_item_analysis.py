@@ -0,0 +1,63 @@
+# src/quiz/tests/test_item_analysis.py
+import json
+import pytest
+from django.urls import reverse
+from django.contrib.auth.models import User
+import core.json_storage
+from quiz.item_analysis import compute_item_analysis, item_analysis_cache
+
+pytestmark = pytest.mark.django_db
+
+
+def test_difficulty_and_discrimination():
+    quiz = {"id": "quiz-1", "config": {}}
+    questions = [
+        {"id": "q1", "type": "MCQ", "correct_answer": ["a"],
+         "options": [{"id": "a", "text": "A"}, {"id": "b", "text": "B"}]},
+        {"id": "q2", "type": "SHORT_TEXT"},
+    ]
+    attempts = [
+        {"percentage": 100.0, "answers": {"q1": ["a"], "q2": "x"},
+         "graded_details": [{"question_id": "q1", "is_correct": True}]},
+        {"percentage": 80.0, "answers": {"q1": ["a"]},
+         "graded_details": [{"question_id": "q1", "is_correct": True}]},
+        {"percentage": 20.0, "answers": {"q1": ["b"]},
+         "graded_details": [{"question_id": "q1", "is_correct": False}]},
+        {"percentage": 0.0, "answers": {}, "graded_details": []},
+    ]
+    analysis = compute_item_analysis(quiz, questions, attempts)
+    assert analysis["attempt_count"] == 4
+    q1, q2 = analysis["items"]
+    assert q1["p_value"] == 0.5
+    assert q1["unanswered_share"] == 0.25
+    # (M1 - M0) / s * sqrt(pq) with M1 = 90, M0 = 10, s = sqrt(1700)
+    assert q1["point_biserial"] == round(80 / 1700 ** 0.5 * 0.5, 4)
+    assert [(o["option_id"], o["count"], o["is_correct"]) for o in q1["option_distribution"]] == [
+        ("a", 2, True), ("b", 1, False)]
+    assert q2["p_value"] is None and q2["point_biserial"] is None
+    assert q2["unanswered_share"] == 0.75
+
+
+def test_item_analysis_api_is_cached_until_attempts_change(client, baseline_test_data):
+    User.objects.create_user(username='analyst', password='password123', is_staff=True)
+    client.login(username='analyst', password='password123')
+    quiz = baseline_test_data['quizzes'][0]
+    mcq = baseline_test_data['questions'][0]
+    url = reverse('quiz:quiz_item_analysis', kwargs={'quiz_id': quiz['id']})
+    submit_url = reverse('quiz:quiz_submit', kwargs={'quiz_id': quiz['id']})
+    submission = {'student_info': {'name': 'Ada'}, 'answers': {mcq['id']: mcq['correct_answer']}}
+
+    assert client.post(submit_url, json.dumps(submission), content_type='application/json').status_code == 201
+    first = client.get(url).json()
+    hits = item_analysis_cache.hits
+    assert client.get(url).json() == first
+    assert item_analysis_cache.hits == hits + 1
+
+    assert client.post(submit_url, json.dumps(submission), content_type='application/json').status_code == 201
+    second = client.get(url).json()
+    assert second['attempt_count'] == first['attempt_count'] + 1
+    item = next(i for i in second['items'] if i['question_id'] == mcq['id'])
+    assert item['p_value'] == 1.0
+
+    missing = reverse('quiz:quiz_item_analysis', kwargs={'quiz_id': '00000000-0000-0000-0000-000000000000'})
+    assert client.get(missing).status_code == 404
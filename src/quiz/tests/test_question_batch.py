@@ -0,0 +1,77 @@
+# src/quiz/tests/test_question_batch.py
+import json
+import pytest
+from django.urls import reverse
+from django.contrib.auth.models import User
+import core.json_storage
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def api_client(client):
+    User.objects.create_user(username='batcher', password='password123', is_staff=True)
+    client.login(username='batcher', password='password123')
+    return client
+
+
+def _post_batch(api_client, operations):
+    return api_client.post(reverse('quiz:question_batch'), json.dumps({"operations": operations}),
+                           content_type='application/json')
+
+
+def test_batch_applies_all_operations_in_one_commit(api_client, baseline_test_data, monkeypatch, tmp_path):
+    media_dir = tmp_path / "media"
+    media_dir.mkdir()
+    (media_dir / "old.png").write_bytes(b"png")
+    monkeypatch.setattr(core.json_storage, "MEDIA_DIR", media_dir)
+    core.json_storage.add_question({"id": "gone", "text": "Old", "type": "SHORT_TEXT",
+                                    "media_filename": "old.png"})
+    existing_id = baseline_test_data['questions'][0]['id']
+    commits = []
+    original_commit = core.json_storage.commit_changes
+    monkeypatch.setattr(core.json_storage, "commit_changes",
+                        lambda **kwargs: commits.append(kwargs) or original_commit(**kwargs))
+
+    response = _post_batch(api_client, [
+        {"op": "create", "question": {"type": "MCQ", "text": "2 + 2?", "category": "Math",
+                                      "options": ["3", "4"], "correct_answer_texts": ["4"]}},
+        {"op": "update", "id": existing_id, "changes": {"category": "Retagged"}},
+        {"op": "delete", "id": "gone"},
+    ])
+    data = response.json()
+    assert response.status_code == 200 and data['applied']
+    assert [r['status'] for r in data['results']] == ['created', 'updated', 'deleted']
+    assert (data['created'], data['updated'], data['deleted'], data['media_files_deleted']) == (1, 1, 1, 1)
+    assert len(commits) == 1
+    assert not (media_dir / "old.png").exists()
+
+    created = core.json_storage.get_question(data['results'][0]['id'])
+    correct = [o['id'] for o in created['options'] if o['text'] == '4']
+    assert created['correct_answer'] == correct
+    assert core.json_storage.get_question(existing_id)['category'] == 'Retagged'
+    assert core.json_storage.get_question("gone") is None
+
+
+def test_batch_is_all_or_nothing(api_client, baseline_test_data):
+    existing_id = baseline_test_data['questions'][0]['id']
+    before = core.json_storage.get_question(existing_id)
+
+    response = _post_batch(api_client, [
+        {"op": "update", "id": existing_id, "changes": {"category": "Never"}},
+        {"op": "create", "question": {"type": "MCQ", "text": "No answers", "options": ["a", "b"],
+                                      "correct_answer_texts": []}},
+        {"op": "delete", "id": "missing"},
+        {"op": "delete", "id": existing_id},
+    ])
+    data = response.json()
+    assert response.status_code == 400 and not data['applied']
+    assert [r['status'] for r in data['results']] == ['not_applied', 'error', 'error', 'error']
+    assert 'more than once' in data['results'][3]['error']
+    assert core.json_storage.get_question(existing_id) == before
+
+    assert _post_batch(api_client, []).status_code == 400
+    # The single-question PUT shares the batch's validation rules
+    response = api_client.put(reverse('quiz:question_detail', args=[existing_id]),
+                              json.dumps({"score": "many"}), content_type='application/json')
+    assert response.status_code == 400 and response.json()['error'] == 'Invalid score format.'
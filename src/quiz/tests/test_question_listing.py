@@ -0,0 +1,121 @@
+# src/quiz/tests/test_question_listing.py
+import pytest
+from django.urls import reverse
+from django.contrib.auth.models import User
+import core.json_storage
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def api_client(client):
+    User.objects.create_user(username='banker', password='password123', is_staff=True)
+    client.login(username='banker', password='password123')
+    return client
+
+
+def _add_questions():
+    specs = [("Zeta", "MCQ", "Math", "Hard"), ("alpha", "SHORT_TEXT", "math ", "Easy"),
+             ("Beta", "MCQ", "History", "Medium"), ("gamma", "MCQ", "Math", "Easy")]
+    for i, (text, q_type, category, difficulty) in enumerate(specs):
+        core.json_storage.add_question({"id": f"bank-{i}", "text": text, "type": q_type,
+                                        "category": category, "difficulty": difficulty})
+
+
+def test_question_bank_filters_sort_and_pages(api_client, baseline_test_data):
+    _add_questions()
+    url = reverse('quiz:question_list_create')
+
+    data = api_client.get(url, {'category': 'MATH', 'sort': 'text', 'page_size': 2}).json()
+    assert (data['total'], data['num_pages']) == (3, 2)
+    assert [q['text'] for q in data['questions']] == ['alpha', 'gamma']
+    data = api_client.get(url, {'category': 'MATH', 'sort': 'text', 'page_size': 2, 'page': 2}).json()
+    assert [q['text'] for q in data['questions']] == ['Zeta']
+
+    data = api_client.get(url, {'category': 'math', 'type': 'mcq', 'sort': '-difficulty'}).json()
+    assert [q['text'] for q in data['questions']] == ['Zeta', 'gamma']
+    # Facets count the matches of the other filters
+    assert {f['value']: f['count'] for f in data['facets']['type']} == {'MCQ': 2, 'SHORT_TEXT': 1}
+    assert {f['value']: f['count'] for f in data['facets']['difficulty']} == {'Easy': 1, 'Hard': 1}
+
+    quiz = baseline_test_data['quizzes'][0]
+    data = api_client.get(url, {'quiz': quiz['id']}).json()
+    assert [q['id'] for q in data['questions']] == quiz['questions']
+
+    assert api_client.get(url, {'sort': 'score'}).status_code == 400
+    assert api_client.get(url, {'page': '0'}).status_code == 400
+
+
+def test_question_indexes_follow_updates_and_deletes(api_client):
+    _add_questions()
+    core.json_storage.update_question("bank-0", {"category": "Physics"})
+    core.json_storage.delete_question("bank-3")
+    url = reverse('quiz:question_list_create')
+
+    data = api_client.get(url, {'category': 'math'}).json()
+    assert [q['id'] for q in data['questions']] == ['bank-1']
+    # Updated questions keep their place in the default (creation) order
+    data = api_client.get(url, {'type': 'MCQ', 'page_size': 500}).json()
+    assert [q['id'] for q in data['questions']][-2:] == ['bank-0', 'bank-2']
+    categories = [q['category'] for q in api_client.get(url, {'sort': 'category', 'type': 'MCQ'}).json()['questions']]
+    assert 'Physics' in categories and categories == sorted(categories, key=str.casefold)
+
+
+def test_question_search_ranks_and_follows_changes(api_client):
+    core.json_storage.add_question({"id": "s-1", "text": "Résoudre l'équation", "type": "MCQ",
+                                    "category": "Algebra", "difficulty": "Easy",
+                                    "options": [{"text": "x = 2"}, {"text": "x = 3"}]})
+    core.json_storage.add_question({"id": "s-2", "text": "Equation equation of a line", "type": "MCQ",
+                                    "category": "Geometry", "difficulty": "Hard", "options": []})
+    url = reverse('quiz:question_list_create')
+
+    # Accents and case are ignored; more occurrences rank higher
+    data = api_client.get(url, {'q': 'EQUATION'}).json()
+    assert [q['id'] for q in data['questions']] == ['s-2', 's-1']
+    assert data['questions'][0]['score'] > data['questions'][1]['score']
+    # Option texts and categories are searchable; filters still apply
+    assert [q['id'] for q in api_client.get(url, {'q': 'algebra'}).json()['questions']] == ['s-1']
+    data = api_client.get(url, {'q': 'equation', 'difficulty': 'easy'}).json()
+    assert [q['id'] for q in data['questions']] == ['s-1']
+    assert {f['value']: f['count'] for f in data['facets']['difficulty']} == {'Easy': 1, 'Hard': 1}
+
+    # The index is updated on edit and delete
+    core.json_storage.update_question("s-1", {"text": "Solve for x"})
+    core.json_storage.delete_question("s-2")
+    assert api_client.get(url, {'q': 'equation'}).json()['total'] == 0
+    assert [q['id'] for q in api_client.get(url, {'q': 'solve'}).json()['questions']] == ['s-1']
+
+
+def test_category_registry_counts_follow_mutations(api_client, baseline_test_data):
+    _add_questions()
+    url = reverse('quiz:question_categories')
+    counts = {c['value'].casefold(): c['count'] for c in api_client.get(url).json()['categories']}
+    assert (counts['math'], counts['history']) == (3, 1)
+
+    core.json_storage.update_question("bank-2", {"category": "Geography"})
+    core.json_storage.delete_question("bank-0")
+    categories = api_client.get(url).json()['categories']
+    counts = {c['value'].casefold(): c['count'] for c in categories}
+    assert (counts['math'], counts['geography']) == (2, 1) and 'history' not in counts
+    assert [c['value'] for c in categories] == sorted((c['value'] for c in categories), key=str.casefold)
+
+    # The quiz editor lists the same categories without loading the data file
+    response = api_client.get(reverse('teacher_interface:quiz_create'))
+    assert response.context['existing_categories'] == [c['value'] for c in categories]
+
+
+def test_listing_reads_index_under_snapshot_lock(api_client, monkeypatch):
+    """ Paging and facet counts iterate live index dicts, so writers must be held off. """
+    import quiz.question_listing
+    _add_questions()
+    original_facet_counts = quiz.question_listing._facet_counts
+    locked = []
+
+    def checking_facet_counts(*args):
+        locked.append(core.json_storage._snapshot_lock.locked())
+        return original_facet_counts(*args)
+
+    monkeypatch.setattr(quiz.question_listing, "_facet_counts", checking_facet_counts)
+    response = api_client.get(reverse('quiz:question_list_create'), {'q': 'alpha', 'sort': 'text'})
+    assert response.status_code == 200 and response.json()['total'] == 1
+    assert locked and all(locked)
@@ -118,6 +118,28 @@ def test_update_quiz_success(api_client, baseline_test_data):
     assert saved_quiz is not None
     assert saved_quiz['title'] == 'UPDATED Title'
 
+def test_update_quiz_does_not_undo_concurrent_key_change(api_client, baseline_test_data, monkeypatch):
+    """ A PUT that read the quiz before a key regeneration must not restore the old key. """
+    import quiz.views
+    quiz_id = baseline_test_data['quizzes'][0]['id']
+    original_get_quiz = quiz.views.get_quiz
+    calls = []
+
+    def racing_get_quiz(qid):
+        record = original_get_quiz(qid)
+        if not calls:  # The view's first lookup, then the key changes under it
+            core.json_storage.set_access_key(quiz_id, "RACED1")
+        calls.append(qid)
+        return record
+
+    monkeypatch.setattr(quiz.views, "get_quiz", racing_get_quiz)
+    url = reverse('quiz:quiz_detail', kwargs={'quiz_id': quiz_id})
+    response = api_client.put(url, json.dumps({'title': 'Renamed'}), content_type='application/json')
+    assert response.status_code == 200
+    saved = core.json_storage.get_quiz(quiz_id)
+    assert (saved['title'], saved['access_key']) == ('Renamed', 'RACED1')
+
+
 def test_delete_quiz_success(api_client, baseline_test_data):
      """ Test deleting an existing quiz via DELETE request. """
      print("\n--- Test: test_delete_quiz_success ---")
@@ -138,4 +160,181 @@ def test_delete_quiz_success(api_client, baseline_test_data):
      assert len(saved_quizzes) == initial_quiz_count - 1
      assert not any(q['id'] == quiz_id_to_delete for q in saved_quizzes)
 
-# ... placeholders for other tests ...
\ No newline at end of file
+# ... placeholders for other tests ...
+
+def test_quiz_access_shuffle_keeps_snapshot_intact(client, baseline_test_data):
+    """ Shuffling for one student must not reorder the shared cached snapshot. """
+    data = core.json_storage.load_data()
+    data['quizzes'][0]['config']['shuffle_answers'] = True
+    data['quizzes'][0]['config']['randomize_questions'] = True
+    core.json_storage.save_data(data)
+    snapshot = core.json_storage.get_data_snapshot()
+    original_options = [copy.deepcopy(q['options']) for q in snapshot['questions']]
+
+    url = reverse('quiz:quiz_access')
+    for _ in range(5):
+        response = client.post(url, json.dumps({'quiz_key': 'key123'}), content_type='application/json')
+        assert response.status_code == 200
+        assert len(response.json()['questions']) == 2
+
+    assert core.json_storage.get_data_snapshot() is snapshot
+    assert [q['options'] for q in snapshot['questions']] == original_options
+
+
+def test_submit_appends_to_attempt_log(client, baseline_test_data, isolated_json_storage):
+    """ Submissions go to the attempt log without rewriting the main data file. """
+    quiz = baseline_test_data['quizzes'][0]
+    mcq = baseline_test_data['questions'][0]
+    main_file_before = isolated_json_storage.read_text(encoding='utf-8')
+    url = reverse('quiz:quiz_submit', kwargs={'quiz_id': quiz['id']})
+    payload = {
+        'student_info': {'name': 'Ada', 'class': '3B', 'id': '42'},
+        'answers': {mcq['id']: mcq['correct_answer']},
+    }
+    response = client.post(url, json.dumps(payload), content_type='application/json')
+    assert response.status_code == 201
+    assert response.json()['achieved_score'] == 10.0
+
+    assert isolated_json_storage.read_text(encoding='utf-8') == main_file_before
+    saved_attempts = read_temp_data()['attempts']
+    assert [a['attempt_id'] for a in saved_attempts] == [response.json()['attempt_id']]
+
+
+def test_quiz_access_serves_cached_payload_until_content_changes(client, baseline_test_data):
+    """ Unshuffled quizzes get the same pre-encoded payload, refreshed on edits. """
+    from quiz.student_payload import student_payload_cache
+    url = reverse('quiz:quiz_access')
+    first = client.post(url, json.dumps({'quiz_key': 'KEY123'}), content_type='application/json')
+    hits_before = student_payload_cache.hits
+    second = client.post(url, json.dumps({'quiz_key': 'KEY123'}), content_type='application/json')
+    assert second.content == first.content
+    assert student_payload_cache.hits == hits_before + 1
+    assert 'correct_answer' not in first.content.decode()
+
+    question_id = baseline_test_data['questions'][0]['id']
+    core.json_storage.update_question(question_id, {'text': 'Edited?'})
+    third = client.post(url, json.dumps({'quiz_key': 'KEY123'}), content_type='application/json')
+    assert third.json()['questions'][0]['text'] == 'Edited?'
+
+
+def test_shuffled_access_is_reproducible_from_seed(client, api_client, baseline_test_data):
+    """ The seed returned to the student reproduces their order and is stored with the attempt. """
+    from quiz.shuffling import presented_order
+    from quiz.student_payload import get_student_payload
+    quiz = baseline_test_data['quizzes'][0]
+    core.json_storage.update_quiz(quiz['id'], {'config': {**quiz['config'], 'randomize_questions': True, 'shuffle_answers': True}})
+    response = client.post(reverse('quiz:quiz_access'), json.dumps({'quiz_key': 'KEY123'}), content_type='application/json')
+    payload = response.json()
+    seed = payload['shuffle_seed']
+
+    quiz = core.json_storage.get_quiz(quiz['id'])
+    order = presented_order(get_student_payload(quiz).payload, seed, quiz['config'])
+    assert order['questions'] == [q['id'] for q in payload['questions']]
+    assert order['options'] == {q['id']: [o['id'] for o in q['options']] for q in payload['questions']}
+
+    submit_url = reverse('quiz:quiz_submit', kwargs={'quiz_id': quiz['id']})
+    submission = {'student_info': {'name': 'Ada'}, 'answers': {}, 'shuffle_seed': seed}
+    submitted = client.post(submit_url, json.dumps(submission), content_type='application/json')
+    assert submitted.status_code == 201
+    assert read_temp_data()['attempts'][0]['shuffle_seed'] == seed
+
+    # The attempt detail shows teachers the order the student saw
+    detail_url = reverse('quiz:quiz_attempt_detail', kwargs={'quiz_id': quiz['id'], 'attempt_id': submitted.json()['attempt_id']})
+    detail = api_client.get(detail_url).json()
+    assert detail['attempt']['shuffle_seed'] == seed
+    assert detail['presented_order'] == order
+    missing_url = reverse('quiz:quiz_attempt_detail', kwargs={'quiz_id': quiz['id'], 'attempt_id': 'missing'})
+    assert api_client.get(missing_url).status_code == 404
+
+
+def test_attempts_listing_is_paginated_and_filtered(api_client, baseline_test_data):
+    """ Attempts come newest first by submission time, in cursor pages, with server-side filters. """
+    quiz_id = baseline_test_data['quizzes'][0]['id']
+    for i in range(5):
+        core.json_storage.append_attempt({
+            'attempt_id': f'att-{i}', 'quiz_id': quiz_id,
+            'students': [{'name': f'Student {i}', 'class': '3B' if i % 2 else '4A'}],
+            'percentage': 20.0 * i, 'passed': i >= 4, 'submitted_due_to_timeout': i == 1,
+            # Mixed offsets: numeric ordering differs from string ordering
+            'end_time': f'2025-05-0{i + 1}T12:00:00+02:00' if i != 2 else '2025-05-03T09:00:00Z',
+        })
+    url = reverse('quiz:quiz_attempts_list', kwargs={'quiz_id': quiz_id})
+
+    first = api_client.get(url, {'limit': 2}).json()
+    assert [a['attempt_id'] for a in first['attempts']] == ['att-4', 'att-3']
+    second = api_client.get(url, {'limit': 2, 'cursor': first['next_cursor']}).json()
+    third = api_client.get(url, {'limit': 2, 'cursor': second['next_cursor']}).json()
+    assert [a['attempt_id'] for a in second['attempts'] + third['attempts']] == ['att-2', 'att-1', 'att-0']
+    assert third['next_cursor'] is None
+
+    def ids(**params):
+        return [a['attempt_id'] for a in api_client.get(url, params).json()['attempts']]
+    assert ids(**{'class': '3b'}) == ['att-3', 'att-1']
+    assert ids(passed='true') == ['att-4']
+    assert ids(timed_out='1') == ['att-1']
+    assert ids(**{'from': '2025-05-02', 'to': '2025-05-03'}) == ['att-2', 'att-1']
+    assert api_client.get(url, {'limit': 'x'}).status_code == 400
+
+
+def test_quiz_stats_api(api_client, client, baseline_test_data):
+    quiz = baseline_test_data['quizzes'][0]
+    mcq = baseline_test_data['questions'][0]
+    submit_url = reverse('quiz:quiz_submit', kwargs={'quiz_id': quiz['id']})
+    submission = {'student_info': {'name': 'Ada'}, 'answers': {mcq['id']: mcq['correct_answer']}}
+    assert client.post(submit_url, json.dumps(submission), content_type='application/json').status_code == 201
+
+    response = api_client.get(reverse('quiz:quiz_stats', kwargs={'quiz_id': quiz['id']}))
+    assert response.status_code == 200
+    stats = response.json()['stats']
+    assert (stats['attempt_count'], stats['mean_percentage'], stats['pass_count']) == (1, 66.67, 1)
+    assert api_client.get(reverse('quiz:quiz_stats', kwargs={'quiz_id': uuid.uuid4()})).status_code == 404
+
+
+def test_student_history_api(api_client, client, baseline_test_data):
+    quiz = baseline_test_data['quizzes'][0]
+    submit_url = reverse('quiz:quiz_submit', kwargs={'quiz_id': quiz['id']})
+    for students in ([{'name': 'Ada', 'class': '5B'}, {'name': 'Bob', 'class': '5B'}], {'name': 'ada ', 'class': '5b'}):
+        submission = {'student_info': students, 'answers': {}}
+        assert client.post(submit_url, json.dumps(submission), content_type='application/json').status_code == 201
+
+    url = reverse('quiz:student_history')
+    data = api_client.get(url, {'name': 'ADA', 'class': '5B'}).json()
+    assert data['attempt_count'] == 2
+    assert {a['quiz_title'] for a in data['attempts']} == {quiz['title']}
+    assert api_client.get(url, {'name': 'Bob', 'class': '5B'}).json()['attempt_count'] == 1
+    assert api_client.get(url, {'name': 'Bob'}).json()['attempt_count'] == 0
+    assert api_client.get(url).status_code == 400
+
+
+def test_resubmitting_an_attempt_id_is_idempotent(client, baseline_test_data):
+    """ A retried submission with the same attempt_id is stored once and answered from the stored attempt. """
+    quiz = baseline_test_data['quizzes'][0]
+    mcq = baseline_test_data['questions'][0]
+    url = reverse('quiz:quiz_submit', kwargs={'quiz_id': quiz['id']})
+    attempt_id = str(uuid.uuid4())
+    payload = {'attempt_id': attempt_id, 'student_info': {'name': 'Ada'}, 'answers': {mcq['id']: mcq['correct_answer']}}
+    first = client.post(url, json.dumps(payload), content_type='application/json')
+    assert first.status_code == 201 and first.json()['attempt_id'] == attempt_id
+
+    payload['answers'] = {}
+    retried = client.post(url, json.dumps(payload), content_type='application/json')
+    assert retried.status_code == 200 and retried.json() == first.json()
+    assert [a['attempt_id'] for a in read_temp_data()['attempts']] == [attempt_id]
+
+    payload['attempt_id'] = 'not-a-uuid'
+    assert client.post(url, json.dumps(payload), content_type='application/json').status_code == 400
+
+
+def test_submission_not_saved_in_time_returns_503(client, baseline_test_data, monkeypatch):
+    """ A timed-out submission was withdrawn, so the client is told to submit again. """
+    import quiz.views
+
+    def timing_out_submit(attempt):
+        raise TimeoutError("Timed out waiting for the attempt to be saved; it was not saved.")
+
+    monkeypatch.setattr(quiz.views, 'submit_attempt', timing_out_submit)
+    url = reverse('quiz:quiz_submit', kwargs={'quiz_id': baseline_test_data['quizzes'][0]['id']})
+    response = client.post(url, json.dumps({'student_info': {'name': 'Ada'}, 'answers': {}}), content_type='application/json')
+    assert response.status_code == 503
+    assert uuid.UUID(response.json()['attempt_id'])
+    assert read_temp_data()['attempts'] == []
@@ -0,0 +1,90 @@
+# src/quiz/tests/test_regrade.py
+import json
+import random
+import pytest
+from django.urls import reverse
+from django.contrib.auth.models import User
+import core.json_storage
+from quiz.grading import GradingPlan
+from quiz.regrade import grade_attempts, np
+
+pytestmark = pytest.mark.django_db
+
+
+def _random_attempts(count):
+    rng = random.Random(7)
+    answer_choices = [None, [], ["a"], ["b"], ["a", "b"], ["a", "c"], "a", ["a", "a"]]
+    text_choices = [None, "Paris", " paris ", "Lyon", 42]
+    return [
+        {"answers": {"q1": rng.choice(answer_choices), "q2": rng.choice(answer_choices),
+                     "q3": rng.choice(text_choices), "q4": rng.choice(text_choices)}}
+        for _ in range(count)
+    ]
+
+
+@pytest.mark.skipif(np is None, reason="NumPy not installed")
+def test_numpy_engine_matches_plan_grading():
+    quiz = {"id": "quiz-1", "config": {"pass_score": 62.5}}
+    questions = [
+        {"id": "q1", "type": "MCQ", "score": 2, "correct_answer": ["a", "b"]},
+        {"id": "q2", "type": "MCQ", "score": 1.25, "mcq_is_single_choice": True, "correct_answer": ["a"]},
+        {"id": "q3", "type": "SHORT_TEXT", "score": 3, "short_answer_review_mode": "auto", "short_answer_correct_text": "Paris"},
+        {"id": "q4", "type": "SHORT_TEXT", "score": 1},
+    ]
+    plan = GradingPlan(quiz, questions)
+    attempts = _random_attempts(500)
+    assert grade_attempts(plan, attempts, use_numpy=True) == grade_attempts(plan, attempts, use_numpy=False)
+
+
+def test_regrade_after_answer_key_fix(client, baseline_test_data):
+    user = User.objects.create_user(username='regrader', password='password123', is_staff=True)
+    client.login(username='regrader', password='password123')
+    quiz = baseline_test_data['quizzes'][0]
+    mcq = baseline_test_data['questions'][0]
+    wrong_option = next(o['id'] for o in mcq['options'] if o['id'] not in mcq['correct_answer'])
+    submit_url = reverse('quiz:quiz_submit', kwargs={'quiz_id': quiz['id']})
+    for answer in (mcq['correct_answer'], [wrong_option]):
+        submission = {'student_info': {'name': 'Ada'}, 'answers': {mcq['id']: answer}}
+        assert client.post(submit_url, json.dumps(submission), content_type='application/json').status_code == 201
+    attempt_ids = [a['attempt_id'] for a in core.json_storage.get_attempts_for_quiz(quiz['id'])]
+
+    # The answer key was wrong: the other option is the correct one
+    core.json_storage.update_question(mcq['id'], {'correct_answer': [wrong_option]})
+    response = client.post(reverse('quiz:question_regrade', kwargs={'question_id': mcq['id']}))
+    assert response.status_code == 200
+    assert response.json()['attempts_checked'] == 2
+    assert sorted(response.json()['attempts_changed']) == sorted(attempt_ids)
+
+    stored = {a['attempt_id']: a for a in core.json_storage.load_data()['attempts']}
+    assert [stored[i]['score_achieved'] for i in attempt_ids] == [0.0, 10.0]
+    assert all('regraded_at' in stored[i] for i in attempt_ids)
+    assert core.json_storage.get_attempts_for_quiz(quiz['id'])[1]['score_achieved'] == 10.0
+
+    response = client.post(reverse('quiz:quiz_regrade', kwargs={'quiz_id': quiz['id']}))
+    assert response.json()['attempts_changed'] == []
+
+
+def test_regrade_holds_off_question_changes_until_committed(baseline_test_data, monkeypatch):
+    """ An answer key change racing a regrade waits until the regraded attempts are saved. """
+    import threading
+    import quiz.regrade
+    quiz_id = baseline_test_data['quizzes'][0]['id']
+    mcq = baseline_test_data['questions'][0]
+    core.json_storage.append_attempt({'attempt_id': 'a1', 'quiz_id': quiz_id, 'answers': {}})
+    changer = threading.Thread(
+        target=core.json_storage.update_question, args=(mcq['id'], {'correct_answer': []})
+    )
+    original_grade_attempts = quiz.regrade.grade_attempts
+    blocked = []
+
+    def racing_grade_attempts(*args, **kwargs):
+        changer.start()
+        changer.join(timeout=0.5)
+        blocked.append(changer.is_alive())
+        return original_grade_attempts(*args, **kwargs)
+
+    monkeypatch.setattr(quiz.regrade, 'grade_attempts', racing_grade_attempts)
+    assert quiz.regrade.regrade_question(mcq['id'])['attempts_checked'] == 1
+    changer.join()
+    assert blocked == [True]
+    assert core.json_storage.get_question(mcq['id'])['correct_answer'] == []
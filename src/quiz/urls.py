@@ -11,6 +11,9 @@ urlpatterns = [
 
     # --- Question URLs ---
     path('api/questions/', views.question_list_create_api, name='question_list_create'),
+    path('api/questions/categories/', views.question_categories_api, name='question_categories'),
+    path('api/questions/batch/', views.question_batch_api, name='question_batch'),
+    path('api/questions/duplicates/', views.question_duplicates_api, name='question_duplicates'),
     path('api/questions/<uuid:question_id>/', views.question_detail_api, name='question_detail'),
 
     # --- Export URL ---
@@ -26,10 +29,24 @@ urlpatterns = [
     path('api/quizzes/<uuid:quiz_id>/submit/', views.quiz_submit_api, name='quiz_submit'),
     # --- Regenerate Key URL ---
     path('api/quizzes/<uuid:quiz_id>/regenerate_key/', views.quiz_regenerate_key_api, name='quiz_regenerate_key'),
+    # --- Regrade URLs (after answer key / score fixes) ---
+    path('api/quizzes/<uuid:quiz_id>/regrade/', views.quiz_regrade_api, name='quiz_regrade'),
+    path('api/questions/<uuid:question_id>/regrade/', views.question_regrade_api, name='question_regrade'),
 
     # --- Attempt List & Export URLs ---
     path('api/quizzes/<uuid:quiz_id>/attempts/', views.get_quiz_attempts_api, name='quiz_attempts_list'),
+    path('api/quizzes/<uuid:quiz_id>/attempts/<str:attempt_id>/', views.get_quiz_attempt_detail_api, name='quiz_attempt_detail'),
+    path('api/quizzes/<uuid:quiz_id>/stats/', views.quiz_stats_api, name='quiz_stats'),
+    path('api/quizzes/<uuid:quiz_id>/item_analysis/', views.quiz_item_analysis_api, name='quiz_item_analysis'),
     path('api/quizzes/<uuid:quiz_id>/attempts/export/json/', views.export_quiz_attempts_json_api, name='quiz_attempts_export_json'),
     path('api/quizzes/<uuid:quiz_id>/attempts/export/excel/', views.export_quiz_attempts_excel_api, name='quiz_attempts_export_excel'),
-    
-]
\ No newline at end of file
+    path('api/quizzes/<uuid:quiz_id>/attempts/export/ndjson/', views.export_quiz_attempts_ndjson_api, name='quiz_attempts_export_ndjson'),
+    path('api/quizzes/<uuid:quiz_id>/attempts/export/csv/', views.export_quiz_attempts_csv_api, name='quiz_attempts_export_csv'),
+    path('api/quizzes/results/archive/', views.results_archive_api, name='results_archive'),
+    path('api/students/history/', views.student_history_api, name='student_history'),
+
+    # --- Background Job URLs (exports, imports, regrades) ---
+    path('api/jobs/', views.job_list_api, name='job_list'),
+    path('api/jobs/<uuid:job_id>/', views.job_detail_api, name='job_detail'),
+    path('api/jobs/<uuid:job_id>/result/', views.job_result_api, name='job_result'),
+]
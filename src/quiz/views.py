@@ -2,12 +2,16 @@ import os
 import uuid
 import json
 import datetime
-import random
-import string
 import copy
+import tempfile
 import sys  # Make sure sys is imported if used by get_base_dir implicitly
 from pathlib import Path
-from django.http import JsonResponse, HttpResponse  # Removed Http404 if not used
+from django.http import (
+    JsonResponse,
+    HttpResponse,
+    FileResponse,
+    StreamingHttpResponse,
+)  # Removed Http404 if not used
 
 # from django.conf import settings # Not needed if using get_media_dir
 from django.core.files.uploadedfile import UploadedFile
@@ -15,23 +19,81 @@ from authentication.decorators import api_teacher_required
 
 # --- CORRECTED IMPORT ---
 from core.json_storage import (
-    load_data,
-    save_data,
+    get_data_snapshot,
+    get_quiz,
+    get_question,
+    find_quiz_by_access_key,
+    get_quiz_questions,
+    get_attempt,
+    get_attempt_timeline,
+    get_quiz_result_stats,
+    get_student_history,
+    get_question_categories,
     get_media_dir,
+    add_quiz,
+    update_quiz,
+    write_transaction,
+    delete_quiz,
+    set_access_key,
+    add_question,
+    update_question,
+    delete_question,
+    commit_changes,
 )  # Import get_media_dir
+from core.attempt_writer import submit_attempt
+from core.key_allocator import reserve_access_keys
+from core.indexes import attempt_sort_key, normalize_access_key
+from core.singleflight import SingleFlight
+from core.jobs import JobQueueFull, job_runner
+from .student_payload import get_student_payload
+from .grading import get_grading_plan
+from .attempt_listing import (
+    InvalidListingParameter,
+    list_attempts_page,
+    parse_listing_params,
+    summarize_attempt,
+)
+from .item_analysis import get_item_analysis, item_analysis_sheet_rows
+from .question_listing import list_questions_page, parse_question_listing_params
+from .duplicate_report import build_duplicate_report, find_question_duplicates
+from .question_batch import (
+    QUESTION_BATCH_MAX_OPERATIONS,
+    QuestionChangeError,
+    apply_question_changes,
+    delete_media_files,
+    question_media_files,
+    run_question_batch,
+)
+from .exports import (
+    ARCHIVE_FORMATS,
+    EXCEL_CONTENT_TYPE,
+    EXPORT_SPOOL_MAX_MEMORY,
+    build_results_archive,
+    iter_csv_export,
+    iter_json_export,
+    iter_ndjson_export,
+    results_sheet_title,
+    spooled_attempts_workbook,
+    write_attempts_workbook,
+)
+from .regrade import regrade_quiz, regrade_question
+from .shuffling import (
+    new_shuffle_seed,
+    is_valid_shuffle_seed,
+    shuffle_payload,
+    presented_order,
+)
 
 # --- END CORRECTION ---
 import traceback  # Import get_media_dir
 
 
 from django.shortcuts import render
+from django.urls import reverse
 from django.views.decorators.http import require_http_methods
 from django.views.decorators.csrf import (
     csrf_exempt,
 )  # Keep using exempt for now, manage CSRF properly with frontend later
-from decimal import Decimal, ROUND_HALF_UP  # For accurate score calculation
-import openpyxl  # Add import
-from openpyxl.utils import get_column_letter  # Optional: For setting column widths
 
 
 # Import the decorator we created in AUTH-3
@@ -92,7 +154,8 @@ def quiz_list_create_api(request):
     API endpoint for listing all quizzes (GET) or creating a new quiz (POST).
     Requires teacher authentication. Uses JSON storage.
     """
-    data = load_data()  # Load current data from JSON
+    # Read-only view of the data; POST adds the quiz through add_quiz()
+    data = get_data_snapshot()
     quizzes = data.get("quizzes", [])
 
     if request.method == "GET":
@@ -115,9 +178,6 @@ def quiz_list_create_api(request):
 
     elif request.method == "POST":
         try:
-            import random  # Add import
-            import string  # Add import
-
             # Get data from request body
             request_data = json.loads(request.body)
             title = request_data.get("title")
@@ -126,40 +186,32 @@ def quiz_list_create_api(request):
             if not title:
                 return JsonResponse({"error": "Quiz title is required."}, status=400)
 
-            def generate_quiz_key(length=6):
-                # Simple key generator (letters and digits) - make more robust if needed
-                characters = string.ascii_uppercase + string.digits
-                return "".join(random.choice(characters) for i in range(length))
-
-            # Generate a unique key (add checks later if collision is a concern)
-            new_quiz_key = generate_quiz_key()
-
-            # Create new quiz object
-            new_quiz_id = str(uuid.uuid4())  # Generate a unique ID
-            new_quiz = {
-                "id": new_quiz_id,
-                "title": title,
-                "description": description,
-                # Accept questions list, default to empty if not provided
-                "questions": request_data.get("questions", []),
-                "config": {  # Default config, can be updated later via PUT
-                    "duration": None,  # in minutes
-                    "pass_score": 70,  # percentage
-                    "presentation_mode": "all",  # 'all' or 'one-by-one'
-                    "allow_back": True,
-                    "randomize_questions": False,
-                    "shuffle_answers": False,
-                },
-                "access_key": new_quiz_key,
-                "archived": False,
-                "versions": [],  # For TCHR-8 later
-                # Add created_at, updated_at timestamps if desired
-            }
+            # Reserve a unique access key until the quiz is committed
+            with reserve_access_keys(1) as (new_quiz_key,):
+                # Create new quiz object
+                new_quiz_id = str(uuid.uuid4())  # Generate a unique ID
+                new_quiz = {
+                    "id": new_quiz_id,
+                    "title": title,
+                    "description": description,
+                    # Accept questions list, default to empty if not provided
+                    "questions": request_data.get("questions", []),
+                    "config": {  # Default config, can be updated later via PUT
+                        "duration": None,  # in minutes
+                        "pass_score": 70,  # percentage
+                        "presentation_mode": "all",  # 'all' or 'one-by-one'
+                        "allow_back": True,
+                        "randomize_questions": False,
+                        "shuffle_answers": False,
+                    },
+                    "access_key": new_quiz_key,
+                    "archived": False,
+                    "versions": [],  # For TCHR-8 later
+                    # Add created_at, updated_at timestamps if desired
+                }
 
-            # Add to the list and save
-            quizzes.append(new_quiz)
-            data["quizzes"] = quizzes  # Update the main data dict
-            save_data(data)  # Write back to JSON file
+                # Add to the store (locked, persisted once)
+                add_quiz(new_quiz)
 
             return JsonResponse(
                 {"message": "Quiz created successfully.", "quiz": new_quiz}, status=201
@@ -187,45 +239,21 @@ def question_list_create_api(request):
     """
     API endpoint for listing questions (GET) or creating a new question (POST).
     POST handles multipart/form-data for potential file uploads.
-    GET returns basic list (update later to include media filenames if needed by lists).
+    GET returns one page of basic rows: full-text search q (ranked by
+    relevance), filters category/type/difficulty/quiz, sort
+    (text/type/category/difficulty, '-' for descending), page, page_size,
+    plus facet counts for the filter controls.
     """
     # --- GET Request Logic ---
     if request.method == "GET":
         print("DEBUG [GET Questions]: Fetching question list.")
         try:
-            all_data = load_data()
-            all_questions = all_data.get("questions", [])
-            # Apply filters (example for category) - TODO: Refactor filtering logic
-            category_filter = request.GET.get("category")
-            type_filter = request.GET.get("type")  # Add other filters as needed
-
-            filtered_questions = all_questions
-            if category_filter:
-                filtered_questions = [
-                    q
-                    for q in filtered_questions
-                    if category_filter.lower() == q.get("category", "").lower()
-                ]
-            if type_filter:
-                filtered_questions = [
-                    q
-                    for q in filtered_questions
-                    if type_filter.upper() == q.get("type", "").upper()
-                ]
-
-            # Prepare simplified list for bank view / modal (can enhance later)
-            prepared_questions = [
-                {
-                    "id": q.get("id"),
-                    "text": q.get("text"),
-                    "type": q.get("type"),
-                    "category": q.get("category"),
-                    "difficulty": q.get("difficulty"),
-                    # Add media_filename thumbnail indicator later?
-                }
-                for q in filtered_questions
-            ]
-            return JsonResponse({"questions": prepared_questions})
+            # One page, filtered via the inverted indexes (see quiz.question_listing)
+            try:
+                listing_params = parse_question_listing_params(request.GET)
+            except InvalidListingParameter as e:
+                return JsonResponse({"error": str(e)}, status=400)
+            return JsonResponse(list_questions_page(**listing_params))
         except Exception as e:
             print(f"ERROR [GET Questions]: {e}")
             traceback.print_exc()
@@ -391,13 +419,19 @@ def question_list_create_api(request):
 
             # Add Question and Save
             print(f"DEBUG [POST Question]: Final new question object: {new_question}")
-            all_data = load_data()
-            all_data.setdefault("questions", []).append(new_question)
-            # TODO: Link question to quizzes specified in quiz_ids by modifying quiz objects in all_data
-            save_data(all_data)
+            # TODO: Link question to quizzes specified in quiz_ids by modifying quiz objects
+            add_question(new_question)
             print(f"DEBUG [POST Question]: Question {new_question_id} saved.")
+            # Flag existing questions this one nearly duplicates (LSH lookup)
+            possible_duplicates = find_question_duplicates(
+                new_question, exclude_ids=[new_question_id]
+            )
             return JsonResponse(
-                {"message": "Question created successfully.", "question": new_question},
+                {
+                    "message": "Question created successfully.",
+                    "question": new_question,
+                    "possible_duplicates": possible_duplicates,
+                },
                 status=201,
             )
 
@@ -415,6 +449,89 @@ def question_list_create_api(request):
 # --- End question_list_create_api ---
 
 
+@api_teacher_required
+@require_http_methods(["GET"])
+def question_categories_api(request):
+    """
+    API endpoint returning the question categories with their question
+    counts, from the category registry kept current on every question change.
+    """
+    try:
+        categories = get_question_categories()
+        return JsonResponse({"categories": categories})
+    except Exception as e:
+        print(f"Error fetching question categories: {e}")
+        traceback.print_exc()
+        return JsonResponse({"error": "Failed to load categories"}, status=500)
+
+
+@api_teacher_required
+@require_http_methods(["GET"])
+def question_duplicates_api(request):
+    """
+    API endpoint returning the merge report of near-duplicate questions:
+    groups of questions found through the MinHash/LSH duplicate index, each
+    with the question to keep and the quizzes using every question.
+    """
+    try:
+        return JsonResponse(build_duplicate_report())
+    except Exception as e:
+        print(f"Error building duplicate report: {e}")
+        traceback.print_exc()
+        return JsonResponse({"error": "Failed to build duplicate report"}, status=500)
+
+
+@csrf_exempt
+@api_teacher_required
+@require_http_methods(["POST"])
+def question_batch_api(request):
+    """
+    API endpoint applying many question changes at once. JSON body:
+    {"operations": [{"op": "create", "question": {...}},
+    {"op": "update", "id": ..., "changes": {...}}, {"op": "delete", "id": ...}]}.
+    All operations are validated first and applied together in one commit;
+    if any is invalid nothing is applied (400) and each one's result is
+    reported. Media files of deleted questions are removed in one pass.
+    """
+    try:
+        request_data = json.loads(request.body)
+    except json.JSONDecodeError:
+        return JsonResponse({"error": "Invalid JSON payload."}, status=400)
+    operations = (
+        request_data.get("operations") if isinstance(request_data, dict) else None
+    )
+    if not isinstance(operations, list) or not operations:
+        return JsonResponse(
+            {"error": '"operations" must be a non-empty list.'}, status=400
+        )
+    if len(operations) > QUESTION_BATCH_MAX_OPERATIONS:
+        return JsonResponse(
+            {
+                "error": f"At most {QUESTION_BATCH_MAX_OPERATIONS} operations per batch."
+            },
+            status=400,
+        )
+    print(f"DEBUG [Question Batch API]: Received {len(operations)} operation(s).")
+    try:
+        outcome = run_question_batch(operations)
+    except Exception as e:
+        print(f"ERROR [Question Batch API]: {e}")
+        traceback.print_exc()
+        return JsonResponse(
+            {"error": f"Error applying question batch: {str(e)}"}, status=500
+        )
+    if not outcome["applied"]:
+        failed = sum(result["status"] == "error" for result in outcome["results"])
+        return JsonResponse(
+            {
+                "error": f"No changes applied: {failed} operation(s) failed validation.",
+                **outcome,
+            },
+            status=400,
+        )
+    return JsonResponse(outcome)
+
+
 @csrf_exempt
 @api_teacher_required
 @require_http_methods(["GET", "PUT", "DELETE"])
@@ -431,11 +548,7 @@ def question_detail_api(request, question_id):
     # --- GET Request Logic (Includes Media Filenames) ---
     if request.method == "GET":
         try:
-            data = load_data()
-            questions = data.get("questions", [])
-            question = next(
-                (q for q in questions if str(q.get("id")) == question_id_str), None
-            )
+            question = get_question(question_id_str)  # Indexed lookup
 
             if question is None:
                 return JsonResponse(
@@ -485,181 +598,26 @@ def question_detail_api(request, question_id):
             request_data = json.loads(request.body)  # Expect JSON payload
             print(f"DEBUG [PUT Q Detail]: Received JSON payload: {request_data}")
 
-            data = load_data()
-            questions = data.get("questions", [])
-            question_to_update = None
-            question_index = -1
-            for index, q in enumerate(questions):
-                if str(q.get("id")) == question_id_str:
-                    question_to_update = q
-                    question_index = index
-                    break
-            if question_to_update is None:
-                return JsonResponse({"error": "Question not found."}, status=404)
-
-            updated_question = copy.deepcopy(question_to_update)  # Work on a copy
+            # Read, validate and save under the write lock, so the changes are
+            # applied to the current record and no concurrent edit is undone
+            with write_transaction():
+                question_to_update = get_question(question_id_str)  # Indexed lookup
+                if question_to_update is None:
+                    return JsonResponse({"error": "Question not found."}, status=404)
 
-            # --- Update ONLY non-file fields from JSON payload ---
-            if "text" in request_data:
-                updated_question["text"] = request_data["text"]
-            if "score" in request_data:
-                try:
-                    updated_question["score"] = int(request_data["score"])
-                except (ValueError, TypeError):
-                    return JsonResponse({"error": "Invalid score format."}, status=400)
-            if "difficulty" in request_data:
-                updated_question["difficulty"] = request_data["difficulty"]
-            if "category" in request_data:
-                updated_question["category"] = request_data["category"]
-            if "quiz_ids" in request_data:
-                if not isinstance(request_data["quiz_ids"], list):
-                    return JsonResponse(
-                        {"error": "quiz_ids must be a list."}, status=400
-                    )
+                # Field rules are shared with the batch endpoint (quiz.question_batch)
                 try:
-                    updated_question["quiz_ids"] = [
-                        str(qid) for qid in request_data["quiz_ids"]
-                    ]
-                except:
-                    return JsonResponse(
-                        {"error": "Invalid quiz_ids format."}, status=400
-                    )
-
-            # Update flags/modes
-            if "mcq_is_single_choice" in request_data:
-                updated_question["mcq_is_single_choice"] = bool(
-                    request_data["mcq_is_single_choice"]
-                )
-            if "short_answer_review_mode" in request_data:
-                mode = request_data["short_answer_review_mode"]
-                if mode not in ["manual", "auto"]:
-                    return JsonResponse({"error": "Invalid review mode."}, status=400)
-                updated_question["short_answer_review_mode"] = mode
-                if mode == "manual":
-                    updated_question["short_answer_correct_text"] = (
-                        None  # Clear correct text if switching to manual
-                    )
-
-            if "short_answer_correct_text" in request_data:
-                if updated_question.get("short_answer_review_mode") == "auto":
-                    text = request_data["short_answer_correct_text"]
-                    updated_question["short_answer_correct_text"] = (
-                        text.strip() if isinstance(text, str) else None
+                    updated_question = apply_question_changes(
+                        question_to_update, request_data
                     )
-                else:
-                    updated_question["short_answer_correct_text"] = (
-                        None  # Ignore if not in auto mode
-                    )
-
-            # Update MCQ options TEXT ONLY and correct answers based on TEXTS
-            if updated_question.get("type") == "MCQ":
-                is_single = updated_question.get("mcq_is_single_choice", False)
-                # Only update if relevant keys present
-                if "options" in request_data or "correct_answer_texts" in request_data:
-                    # Use existing options as base to preserve IDs and media
-                    existing_options_map_by_text = {
-                        opt.get("text"): opt
-                        for opt in updated_question.get("options", [])
-                        if isinstance(opt, dict) and opt.get("text")
-                    }
-                    options_texts = request_data.get(
-                        "options"
-                    )  # Expect list of strings
-                    correct_texts = request_data.get(
-                        "correct_answer_texts"
-                    )  # Expect list of strings
-
-                    if options_texts is None or correct_texts is None:
-                        return JsonResponse(
-                            {
-                                "error": 'For MCQ update via JSON, provide lists for "options" (texts) and "correct_answer_texts".'
-                            },
-                            status=400,
-                        )
-                    if not isinstance(options_texts, list) or not isinstance(
-                        correct_texts, list
-                    ):
-                        return JsonResponse(
-                            {
-                                "error": '"options" and "correct_answer_texts" must be lists.'
-                            },
-                            status=400,
-                        )
-
-                    # Validation
-                    if is_single and len(correct_texts) != 1:
-                        return JsonResponse(
-                            {
-                                "error": "Single-choice requires exactly one correct answer text."
-                            },
-                            status=400,
-                        )
-                    if not is_single and len(correct_texts) == 0:
-                        return JsonResponse(
-                            {
-                                "error": "Multiple-choice requires at least one correct answer text."
-                            },
-                            status=400,
-                        )
-                    if len(options_texts) < 2:
-                        return JsonResponse(
-                            {"error": "MCQ requires at least two options."}, status=400
-                        )
-
-                    # Rebuild options, preserving ID/media if text matches, generating new if not
-                    new_options = []
-                    correct_ids = []
-                    correct_text_set = set(correct_texts)
-                    used_existing_ids = set()
-
-                    for opt_text in options_texts:
-                        if not isinstance(opt_text, str):
-                            continue
-                        existing_opt = existing_options_map_by_text.get(opt_text)
-                        opt_id = None
-                        media_file = None
-
-                        if existing_opt and existing_opt["id"] not in used_existing_ids:
-                            opt_id = existing_opt["id"]
-                            media_file = existing_opt.get("media_filename")
-                            used_existing_ids.add(opt_id)
-                        else:  # New option text or ID already used, generate new ID
-                            opt_id = str(uuid.uuid4())
-
-                        new_options.append(
-                            {
-                                "id": opt_id,
-                                "text": opt_text,
-                                "media_filename": media_file,
-                            }
-                        )
-                        if opt_text in correct_text_set:
-                            correct_ids.append(opt_id)
-
-                    # Final validation on mapped IDs
-                    if len(correct_ids) != len(correct_text_set):
-                        return JsonResponse(
-                            {
-                                "error": "Correct answer text mapping failed during update."
-                            },
-                            status=400,
-                        )
-                    if is_single and len(correct_ids) != 1:
-                        return JsonResponse(
-                            {
-                                "error": "Correct answer ID mapping failed for single choice update."
-                            },
-                            status=400,
-                        )
-
-                    updated_question["options"] = new_options
-                    updated_question["correct_answer"] = correct_ids
-
-            # Save updated question back
-            questions[question_index] = updated_question
-            data["questions"] = questions
-            # TODO: Update quiz associations if quiz_ids changed
-            save_data(data)
+                except QuestionChangeError as e:
+                    return JsonResponse({"error": str(e)}, status=400)
+
+                # Save updated question back (only this record is replaced)
+                # TODO: Update quiz associations if quiz_ids changed
+                updated_question = update_question(question_id_str, updated_question)
+                if updated_question is None:  # Deleted while we were editing
+                    return JsonResponse({"error": "Question not found."}, status=404)
             print(
                 f"DEBUG [PUT Q Detail]: Question {question_id_str} updated (JSON only)."
             )
@@ -683,61 +641,23 @@ def question_detail_api(request, question_id):
     elif request.method == "DELETE":
         print(f"DEBUG [DELETE Q Detail]: Request for Q ID: {question_id_str}")
         try:
-            data = load_data()
-            questions = data.get("questions", [])
-            question_to_delete = None
-            question_index = -1
-            for index, q in enumerate(questions):
-                if str(q.get("id")) == question_id_str:
-                    question_to_delete = q
-                    question_index = index
-                    break
+            question_to_delete = get_question(question_id_str)  # Indexed lookup
             if question_to_delete is None:
                 return JsonResponse({"error": "Question not found."}, status=404)
 
             # --- Delete Associated Media Files ---
-            files_to_delete = []
-            if question_to_delete.get("media_filename"):
-                files_to_delete.append(question_to_delete["media_filename"])
-            if isinstance(question_to_delete.get("options"), list):
-                for opt in question_to_delete["options"]:
-                    if isinstance(opt, dict) and opt.get("media_filename"):
-                        files_to_delete.append(opt["media_filename"])
-
+            files_to_delete = question_media_files(question_to_delete)
             print(
                 f"DEBUG [DELETE Q Detail]: Attempting to delete media files: {files_to_delete}"
             )
-            deleted_count = 0
-            if MEDIA_ROOT_DIR:  # Check if path is valid
-                for filename in set(
-                    files_to_delete
-                ):  # Use set to avoid deleting same file twice
-                    if not filename:
-                        continue  # Skip empty filenames
-                    try:
-                        file_path = MEDIA_ROOT_DIR / filename
-                        if file_path.is_file():
-                            file_path.unlink()
-                            print(
-                                f"DEBUG [DELETE Q Detail]: Deleted media file: {file_path}"
-                            )
-                            deleted_count += 1
-                        else:
-                            print(
-                                f"WARNING [DELETE Q Detail]: Media file not found for deletion: {file_path}"
-                            )
-                    except Exception as e:
-                        print(
-                            f"ERROR [DELETE Q Detail]: Failed to delete media file {filename}: {e}"
-                        )
+            deleted_count = delete_media_files(files_to_delete)
             print(f"DEBUG [DELETE Q Detail]: Deleted {deleted_count} media files.")
             # --- End Delete Media ---
 
-            # Remove question from list
-            deleted_question_text = questions.pop(question_index).get("text", "N/A")
-            data["questions"] = questions
+            # Remove question from the store
             # TODO: Remove question ID from associated quizzes in data['quizzes']
-            save_data(data)
+            delete_question(question_id_str)
+            deleted_question_text = question_to_delete.get("text") or "N/A"
             print(
                 f"DEBUG [DELETE Q Detail]: Question {question_id_str} removed from data."
             )
@@ -775,18 +695,9 @@ def quiz_detail_api(request, quiz_id):
         f"DEBUG [Detail API]: Request for Quiz ID: {quiz_id_str}, Method: {request.method}"
     )
 
-    data = load_data()
-    quizzes = data.get("quizzes", [])
-    quiz = None
-    quiz_index = -1
-
-    # Find the quiz by ID
-    for index, q in enumerate(quizzes):
-        # Compare as strings for safety, even though URL converter gives UUID object
-        if str(q.get("id")) == quiz_id_str:
-            quiz = q
-            quiz_index = index
-            break
+    # Find the quiz by ID (indexed lookup on the shared read-only snapshot);
+    # PUT/DELETE go through update_quiz/delete_quiz
+    quiz = get_quiz(quiz_id_str)
 
     if quiz is None:
         print(f"DEBUG [Detail API]: Quiz ID {quiz_id_str} not found.")
@@ -825,137 +736,150 @@ def quiz_detail_api(request, quiz_id):
             request_data = json.loads(request.body)
             print(f"DEBUG [PUT Detail]: Received payload: {request_data}")
 
-            # Work on a copy of the quiz data found
-            updated_quiz = copy.deepcopy(quiz)
-
-            # Update allowed fields (only update fields present in request_data)
-            if "title" in request_data:
-                updated_quiz["title"] = request_data["title"]
-            if "description" in request_data:
-                # Use get for optional field description, provide original as default
-                updated_quiz["description"] = request_data.get(
-                    "description", quiz.get("description", "")
-                )
-
-            # --- Update Configuration Block ---
-            if "config" in request_data:
-                print("DEBUG [PUT Detail]: Updating config block...")
-                new_config_data = request_data["config"]
-                if not isinstance(new_config_data, dict):
-                    print(
-                        f"ERROR [PUT Detail]: Invalid config data type received: {type(new_config_data)}"
-                    )
+            with write_transaction():
+                # Re-read under the write lock: the copy is saved as a whole, so it
+                # must not be older than e.g. a concurrently regenerated access key
+                quiz = get_quiz(quiz_id_str)
+                if quiz is None:
                     return JsonResponse(
-                        {
-                            "error": "Invalid format for config data (must be an object)."
-                        },
-                        status=400,
+                        {"error": f"Quiz with ID {quiz_id_str} not found."}, status=404
                     )
 
-                # --- Defensive handling for current_config ---
-                current_config_raw = updated_quiz.get(
-                    "config"
-                )  # Get raw value from current quiz data
-                if isinstance(current_config_raw, dict):
-                    current_config = copy.deepcopy(
-                        current_config_raw
-                    )  # Work on a copy if it's already a dict
-                    print("DEBUG [PUT Detail]: Copied existing config.")
-                else:
-                    # If it's missing, None, or not a dict, start fresh
-                    print(
-                        f"DEBUG [PUT Detail]: Existing config invalid or missing (type: {type(current_config_raw)}). Initializing empty config."
+                # Work on a copy of the quiz data found
+                updated_quiz = copy.deepcopy(quiz)
+
+                # Update allowed fields (only update fields present in request_data)
+                if "title" in request_data:
+                    updated_quiz["title"] = request_data["title"]
+                if "description" in request_data:
+                    # Use get for optional field description, provide original as default
+                    updated_quiz["description"] = request_data.get(
+                        "description", quiz.get("description", "")
                     )
-                    current_config = {}
-                # --- current_config is now guaranteed to be a dictionary ---
-
-                # Validate and update specific config fields from new_config_data
-                # Duration
-                if "duration" in new_config_data:
-                    duration = new_config_data["duration"]
-                    if duration is not None:
+
+                # --- Update Configuration Block ---
+                if "config" in request_data:
+                    print("DEBUG [PUT Detail]: Updating config block...")
+                    new_config_data = request_data["config"]
+                    if not isinstance(new_config_data, dict):
+                        print(
+                            f"ERROR [PUT Detail]: Invalid config data type received: {type(new_config_data)}"
+                        )
+                        return JsonResponse(
+                            {
+                                "error": "Invalid format for config data (must be an object)."
+                            },
+                            status=400,
+                        )
+
+                    # --- Defensive handling for current_config ---
+                    current_config_raw = updated_quiz.get(
+                        "config"
+                    )  # Get raw value from current quiz data
+                    if isinstance(current_config_raw, dict):
+                        current_config = copy.deepcopy(
+                            current_config_raw
+                        )  # Work on a copy if it's already a dict
+                        print("DEBUG [PUT Detail]: Copied existing config.")
+                    else:
+                        # If it's missing, None, or not a dict, start fresh
+                        print(
+                            f"DEBUG [PUT Detail]: Existing config invalid or missing (type: {type(current_config_raw)}). Initializing empty config."
+                        )
+                        current_config = {}
+                    # --- current_config is now guaranteed to be a dictionary ---
+
+                    # Validate and update specific config fields from new_config_data
+                    # Duration
+                    if "duration" in new_config_data:
+                        duration = new_config_data["duration"]
+                        if duration is not None:
+                            try:
+                                duration = int(duration)
+                                current_config["duration"] = (
+                                    duration if duration >= 0 else None
+                                )
+                            except (ValueError, TypeError):
+                                current_config["duration"] = None  # Reset if invalid
+                        else:
+                            current_config["duration"] = None  # Allow setting to null
+
+                    # Pass Score
+                    if "pass_score" in new_config_data:
+                        pass_score = new_config_data["pass_score"]
                         try:
-                            duration = int(duration)
-                            current_config["duration"] = (
-                                duration if duration >= 0 else None
+                            pass_score = float(pass_score)
+                            current_config["pass_score"] = (
+                                pass_score if 0 <= pass_score <= 100 else 70
                             )
                         except (ValueError, TypeError):
-                            current_config["duration"] = None  # Reset if invalid
-                    else:
-                        current_config["duration"] = None  # Allow setting to null
+                            current_config["pass_score"] = 70  # Default
+
+                    # Presentation Mode
+                    if "presentation_mode" in new_config_data:
+                        presentation_mode = new_config_data["presentation_mode"]
+                        current_config["presentation_mode"] = (
+                            presentation_mode
+                            if presentation_mode in ["all", "one-by-one"]
+                            else "all"
+                        )
 
-                # Pass Score
-                if "pass_score" in new_config_data:
-                    pass_score = new_config_data["pass_score"]
-                    try:
-                        pass_score = float(pass_score)
-                        current_config["pass_score"] = (
-                            pass_score if 0 <= pass_score <= 100 else 70
+                    # Allow Back
+                    if "allow_back" in new_config_data:
+                        current_config["allow_back"] = bool(
+                            new_config_data["allow_back"]
                         )
-                    except (ValueError, TypeError):
-                        current_config["pass_score"] = 70  # Default
-
-                # Presentation Mode
-                if "presentation_mode" in new_config_data:
-                    presentation_mode = new_config_data["presentation_mode"]
-                    current_config["presentation_mode"] = (
-                        presentation_mode
-                        if presentation_mode in ["all", "one-by-one"]
-                        else "all"
-                    )
 
-                # Allow Back
-                if "allow_back" in new_config_data:
-                    current_config["allow_back"] = bool(new_config_data["allow_back"])
+                    # Randomize Questions
+                    if "randomize_questions" in new_config_data:
+                        current_config["randomize_questions"] = bool(
+                            new_config_data["randomize_questions"]
+                        )
 
-                # Randomize Questions
-                if "randomize_questions" in new_config_data:
-                    current_config["randomize_questions"] = bool(
-                        new_config_data["randomize_questions"]
-                    )
+                    # Shuffle Answers
+                    if "shuffle_answers" in new_config_data:
+                        current_config["shuffle_answers"] = bool(
+                            new_config_data["shuffle_answers"]
+                        )
 
-                # Shuffle Answers
-                if "shuffle_answers" in new_config_data:
-                    current_config["shuffle_answers"] = bool(
-                        new_config_data["shuffle_answers"]
-                    )
+                    # Assign the validated & updated config block back
+                    updated_quiz["config"] = current_config
+                    print(f"DEBUG [PUT Detail]: Updated config block: {current_config}")
 
-                # Assign the validated & updated config block back
-                updated_quiz["config"] = current_config
-                print(f"DEBUG [PUT Detail]: Updated config block: {current_config}")
+                # --- Update Questions List ---
+                if "questions" in request_data:
+                    print("DEBUG [PUT Detail]: Updating questions list...")
+                    # Basic validation: Ensure it's a list of strings (or can be converted)
+                    try:
+                        # Ensure all items are strings (like UUIDs)
+                        updated_questions_list = [
+                            str(q_id) for q_id in request_data["questions"]
+                        ]
+                        updated_quiz["questions"] = updated_questions_list
+                        print(
+                            f"DEBUG [PUT Detail]: Set questions list to: {updated_questions_list}"
+                        )
+                    except (TypeError, ValueError) as e:
+                        print(
+                            f"ERROR [PUT Detail]: Invalid questions list format: {request_data['questions']}. Error: {e}"
+                        )
+                        return JsonResponse(
+                            {
+                                "error": "Invalid format for questions list (must be a list of strings)."
+                            },
+                            status=400,
+                        )
 
-            # --- Update Questions List ---
-            if "questions" in request_data:
-                print("DEBUG [PUT Detail]: Updating questions list...")
-                # Basic validation: Ensure it's a list of strings (or can be converted)
-                try:
-                    # Ensure all items are strings (like UUIDs)
-                    updated_questions_list = [
-                        str(q_id) for q_id in request_data["questions"]
-                    ]
-                    updated_quiz["questions"] = updated_questions_list
-                    print(
-                        f"DEBUG [PUT Detail]: Set questions list to: {updated_questions_list}"
-                    )
-                except (TypeError, ValueError) as e:
-                    print(
-                        f"ERROR [PUT Detail]: Invalid questions list format: {request_data['questions']}. Error: {e}"
-                    )
+                # --- Update Archived Status ---
+                if "archived" in request_data:
+                    updated_quiz["archived"] = bool(request_data["archived"])
+
+                # Replace only this quiz record in the store
+                updated_quiz = update_quiz(quiz_id_str, updated_quiz)
+                if updated_quiz is None:  # Deleted while we were editing
                     return JsonResponse(
-                        {
-                            "error": "Invalid format for questions list (must be a list of strings)."
-                        },
-                        status=400,
+                        {"error": f"Quiz with ID {quiz_id_str} not found."}, status=404
                     )
-
-            # --- Update Archived Status ---
-            if "archived" in request_data:
-                updated_quiz["archived"] = bool(request_data["archived"])
-
-            # Replace the old quiz dict with the updated one in the main list
-            quizzes[quiz_index] = updated_quiz
-            data["quizzes"] = quizzes
-            save_data(data)  # Save changes back to JSON store (mocked in test)
             print(f"DEBUG [PUT Detail]: Quiz {quiz_id_str} saved successfully.")
 
             # --- Prepare response data (convert sets just in case) ---
@@ -993,11 +917,9 @@ def quiz_detail_api(request, quiz_id):
     elif request.method == "DELETE":
         print(f"DEBUG [DELETE Detail]: Processing delete for quiz ID: {quiz_id_str}")
         try:
-            # Remove the quiz from the list
-            deleted_quiz = quizzes.pop(quiz_index)  # Use pop on the original list
+            # Remove the quiz from the store
+            deleted_quiz = delete_quiz(quiz_id_str) or quiz
             deleted_quiz_title = deleted_quiz.get("title", "N/A")
-            data["quizzes"] = quizzes  # Assign the modified list back
-            save_data(data)  # Save changes
             print(f"DEBUG [DELETE Detail]: Quiz {quiz_id_str} deleted successfully.")
 
             return JsonResponse(
@@ -1024,16 +946,8 @@ def quiz_export_api(request, quiz_id):
     API endpoint to export a single quiz and its associated questions as JSON.
     """
     try:
-        data = load_data()
-        quizzes = data.get("quizzes", [])
-        all_questions = data.get("questions", [])
-        quiz_to_export = None
-
         # Find the quiz
-        for q in quizzes:
-            if str(q.get("id")) == str(quiz_id):  # Compare as strings
-                quiz_to_export = q
-                break
+        quiz_to_export = get_quiz(quiz_id)
 
         if quiz_to_export is None:
             return JsonResponse(
@@ -1041,10 +955,7 @@ def quiz_export_api(request, quiz_id):
             )
 
         # Find associated questions
-        question_ids_in_quiz = set(quiz_to_export.get("questions", []))
-        associated_questions = [
-            q for q in all_questions if str(q.get("id")) in question_ids_in_quiz
-        ]
+        associated_questions = get_quiz_questions(quiz_to_export)
 
         # Structure the export data
         export_data = {"quiz": quiz_to_export, "questions": associated_questions}
@@ -1077,6 +988,148 @@ def quiz_export_api(request, quiz_id):
         )
 
 
+def _import_quiz_records(imported_quiz_data, imported_questions_data):
+    """
+    Creates a new quiz (fresh ids, access key and title suffix) from
+    validated import data in one commit. Returns the import summary.
+    """
+    # New records are collected here and committed together at the end
+    all_questions = []
+
+    # --- Process Questions First ---
+    possible_duplicates = []
+    newly_created_question_ids = []
+    old_to_new_question_id_map = {}
+    for q_data in imported_questions_data:
+        if (
+            not isinstance(q_data, dict)
+            or not q_data.get("text")
+            or not q_data.get("type")
+        ):
+            print(f"Skipping invalid question data: {q_data}")  # Log skip
+            continue  # Skip invalid question entries
+
+        old_q_id = q_data.get("id")  # Get original ID for mapping
+        new_q = q_data.copy()  # Create a copy to modify
+
+        # Generate NEW IDs
+        new_q_id = str(uuid.uuid4())
+        new_q["id"] = new_q_id
+        if old_q_id:  # Store mapping if original ID existed
+            old_to_new_question_id_map[old_q_id] = new_q_id
+
+        # Generate NEW Option IDs if MCQ
+        if new_q.get("type") == "MCQ" and isinstance(new_q.get("options"), list):
+            new_options = []
+            old_to_new_option_id_map = {}
+            correct_answer_texts = (
+                []
+            )  # Need to rebuild correct answers based on new IDs
+
+            # Find correct texts first using old IDs
+            old_correct_option_ids = set(new_q.get("correct_answer", []))
+            original_options = new_q.get("options", [])
+            for opt in original_options:
+                if (
+                    isinstance(opt, dict)
+                    and opt.get("id") in old_correct_option_ids
+                ):
+                    correct_answer_texts.append(opt.get("text"))
+
+            # Generate new options and map correct answers
+            new_correct_answer_ids = []
+            for opt in original_options:
+                if not isinstance(opt, dict) or "text" not in opt:
+                    continue  # Skip invalid option
+                new_opt_id = str(uuid.uuid4())
+                new_options.append({"id": new_opt_id, "text": opt["text"]})
+                # If this option's text was marked correct, use the new ID
+                if opt.get("text") in correct_answer_texts:
+                    new_correct_answer_ids.append(new_opt_id)
+
+            new_q["options"] = new_options
+            new_q["correct_answer"] = new_correct_answer_ids
+        else:
+            # Clear options/answers if not MCQ
+            new_q["options"] = []
+            new_q["correct_answer"] = []
+
+        # Flag questions already in the bank that this one nearly duplicates
+        duplicates = find_question_duplicates(new_q)
+        if duplicates:
+            possible_duplicates.append(
+                {
+                    "question_id": new_q_id,
+                    "text": new_q.get("text"),
+                    "duplicates": duplicates,
+                }
+            )
+
+        # Add processed question to the pending list
+        all_questions.append(new_q)
+        newly_created_question_ids.append(new_q_id)  # Keep track for the quiz
+
+    # --- Process Quiz ---
+    new_quiz = imported_quiz_data.copy()
+    new_quiz_id = str(uuid.uuid4())
+    new_quiz["id"] = new_quiz_id
+
+    # --- Modify Title ---
+    original_title = new_quiz.get("title", "Untitled Quiz")
+    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    new_quiz["title"] = f"{original_title}_{timestamp}_(Imported)"
+    print(f"DEBUG [Import]: Setting new quiz title to: {new_quiz['title']}")
+    # --- End Modify Title ---
+
+    # Update quiz's question list with NEW question IDs
+    # Map old IDs from imported quiz's 'questions' list to new IDs
+    old_question_ids_in_quiz = imported_quiz_data.get("questions", [])
+    new_question_ids_for_quiz = [
+        old_to_new_question_id_map[old_id]
+        for old_id in old_question_ids_in_quiz
+        if old_id
+        in old_to_new_question_id_map  # Only include if the question was valid and processed
+    ]
+    # If no 'questions' key in import, use all newly created ones
+    if not old_question_ids_in_quiz and newly_created_question_ids:
+        new_question_ids_for_quiz = newly_created_question_ids
+
+    new_quiz["questions"] = new_question_ids_for_quiz
+
+    # Add basic validation for title
+    if not new_quiz.get("title"):
+        new_quiz["title"] = f"Imported_Quiz_{timestamp}"
+
+    # Reset potentially sensitive/runtime data? (e.g., versions)
+    new_quiz["versions"] = []
+    new_quiz["archived"] = False  # Import as active
+
+    # --- Save Quiz and Questions in One Commit ---
+    # The imported key belongs to the original quiz, so a fresh one is issued
+    with reserve_access_keys(1) as (new_quiz_key,):
+        new_quiz["access_key"] = new_quiz_key
+        commit_changes(quizzes=[new_quiz], questions=all_questions)
+
+    print(
+        f"DEBUG: Imported quiz '{new_quiz['title']}' (New ID: {new_quiz_id}) with {len(new_question_ids_for_quiz)} questions."
+    )  # Logging
+    return {
+        "message": "Quiz imported successfully!",
+        "new_quiz_id": new_quiz_id,
+        "new_quiz_title": new_quiz["title"],
+        "questions_imported_count": len(newly_created_question_ids),
+        "possible_duplicates": possible_duplicates,
+    }
+
+
+def _import_quiz_job(context, imported_quiz_data, imported_questions_data):
+    """Background job body for quiz_import_api (see core.jobs)."""
+    context.set_progress(0, 1, "Importing quiz")
+    result = _import_quiz_records(imported_quiz_data, imported_questions_data)
+    context.set_progress(1, 1, "Imported")
+    return result
+
+
 @csrf_exempt  # Use proper CSRF handling if form submitted directly later
 @api_teacher_required
 @require_http_methods(["POST"])
@@ -1126,128 +1179,23 @@ def quiz_import_api(request):
                 status=400,
             )
 
-        # Load existing data
-        data = load_data()
-        all_quizzes = data.get("quizzes", [])
-        all_questions = data.get("questions", [])
-
-        # --- Process Questions First ---
-        newly_created_question_ids = []
-        old_to_new_question_id_map = {}
-        for q_data in imported_questions_data:
-            if (
-                not isinstance(q_data, dict)
-                or not q_data.get("text")
-                or not q_data.get("type")
-            ):
-                print(f"Skipping invalid question data: {q_data}")  # Log skip
-                continue  # Skip invalid question entries
-
-            old_q_id = q_data.get("id")  # Get original ID for mapping
-            new_q = q_data.copy()  # Create a copy to modify
-
-            # Generate NEW IDs
-            new_q_id = str(uuid.uuid4())
-            new_q["id"] = new_q_id
-            if old_q_id:  # Store mapping if original ID existed
-                old_to_new_question_id_map[old_q_id] = new_q_id
-
-            # Generate NEW Option IDs if MCQ
-            if new_q.get("type") == "MCQ" and isinstance(new_q.get("options"), list):
-                new_options = []
-                old_to_new_option_id_map = {}
-                correct_answer_texts = (
-                    []
-                )  # Need to rebuild correct answers based on new IDs
-
-                # Find correct texts first using old IDs
-                old_correct_option_ids = set(new_q.get("correct_answer", []))
-                original_options = new_q.get("options", [])
-                for opt in original_options:
-                    if (
-                        isinstance(opt, dict)
-                        and opt.get("id") in old_correct_option_ids
-                    ):
-                        correct_answer_texts.append(opt.get("text"))
-
-                # Generate new options and map correct answers
-                new_correct_answer_ids = []
-                for opt in original_options:
-                    if not isinstance(opt, dict) or "text" not in opt:
-                        continue  # Skip invalid option
-                    new_opt_id = str(uuid.uuid4())
-                    new_options.append({"id": new_opt_id, "text": opt["text"]})
-                    # If this option's text was marked correct, use the new ID
-                    if opt.get("text") in correct_answer_texts:
-                        new_correct_answer_ids.append(new_opt_id)
-
-                new_q["options"] = new_options
-                new_q["correct_answer"] = new_correct_answer_ids
-            else:
-                # Clear options/answers if not MCQ
-                new_q["options"] = []
-                new_q["correct_answer"] = []
-
-            # Add processed question to main list
-            all_questions.append(new_q)
-            newly_created_question_ids.append(new_q_id)  # Keep track for the quiz
-
-        # --- Process Quiz ---
-        new_quiz = imported_quiz_data.copy()
-        new_quiz_id = str(uuid.uuid4())
-        new_quiz["id"] = new_quiz_id
-
-        # --- Modify Title ---
-        original_title = new_quiz.get("title", "Untitled Quiz")
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        new_quiz["title"] = f"{original_title}_{timestamp}_(Imported)"
-        print(f"DEBUG [Import]: Setting new quiz title to: {new_quiz['title']}")
-        # --- End Modify Title ---
-
-        # Update quiz's question list with NEW question IDs
-        # Map old IDs from imported quiz's 'questions' list to new IDs
-        old_question_ids_in_quiz = imported_quiz_data.get("questions", [])
-        new_question_ids_for_quiz = [
-            old_to_new_question_id_map[old_id]
-            for old_id in old_question_ids_in_quiz
-            if old_id
-            in old_to_new_question_id_map  # Only include if the question was valid and processed
-        ]
-        # If no 'questions' key in import, use all newly created ones
-        if not old_question_ids_in_quiz and newly_created_question_ids:
-            new_question_ids_for_quiz = newly_created_question_ids
-
-        new_quiz["questions"] = new_question_ids_for_quiz
-
-        # Add basic validation for title
-        if not new_quiz.get("title"):
-            new_quiz["title"] = f"Imported_Quiz_{timestamp}"
-
-        # Reset potentially sensitive/runtime data? (e.g., versions)
-        new_quiz["versions"] = []
-        new_quiz["archived"] = False  # Import as active
-
-        # Add processed quiz to main list
-        all_quizzes.append(new_quiz)
-
-        # --- Save Updated Data ---
-        data["quizzes"] = all_quizzes
-        data["questions"] = all_questions
-        save_data(data)
+        if _wants_background(request):
+            job = job_runner.submit(
+                "quiz_import",
+                _import_quiz_job,
+                imported_quiz_data,
+                imported_questions_data,
+                description=f"Import of '{imported_quiz_data.get('title', 'Untitled Quiz')}'",
+            )
+            return _job_accepted_response(job)
 
-        print(
-            f"DEBUG: Imported quiz '{new_quiz['title']}' (New ID: {new_quiz_id}) with {len(new_question_ids_for_quiz)} questions."
-        )  # Logging
         return JsonResponse(
-            {
-                "message": "Quiz imported successfully!",
-                "new_quiz_id": new_quiz_id,
-                "new_quiz_title": new_quiz["title"],
-                "questions_imported_count": len(newly_created_question_ids),
-            },
+            _import_quiz_records(imported_quiz_data, imported_questions_data),
             status=201,
         )
 
+    except JobQueueFull as e:
+        return JsonResponse({"error": str(e)}, status=503)
     except Exception as e:
         print(f"Error importing quiz: {e}")
         import traceback
@@ -1259,6 +1207,22 @@ def quiz_import_api(request):
         )
 
 
+# Coalesces simultaneous quiz_access_api lookups per access key
+quiz_access_flight = SingleFlight("QuizAccess")
+
+
+def _resolve_quiz_access(quiz_key):
+    """
+    Returns (quiz, compiled student payload) for an access key; the payload
+    is None when the quiz is missing or archived. Case-insensitive indexed
+    lookup, payload cached per quiz content version.
+    """
+    target_quiz = find_quiz_by_access_key(quiz_key)
+    if target_quiz is None or target_quiz.get("archived", False):
+        return target_quiz, None
+    return target_quiz, get_student_payload(target_quiz)
+
+
 @csrf_exempt  # If called via JS POST potentially, otherwise maybe GET
 @require_http_methods(
     ["POST"]
@@ -1278,27 +1242,17 @@ def quiz_access_api(request):
 
         print(f"DEBUG: Quiz access requested with key: {quiz_key}")  # Log
 
-        data = load_data()
-        all_quizzes = data.get("quizzes", [])
-        all_questions = data.get("questions", [])
-        target_quiz = None
-        quiz_metadata = None
-
-        # --- Find Quiz by Access Key ---
-        for quiz in all_quizzes:
-            # Case-insensitive key matching recommended
-            if (
-                quiz.get("access_key")
-                and quiz.get("access_key").upper() == quiz_key.upper()
-            ):
-                # Found the quiz, check if it's active
-                if quiz.get("archived", False):
-                    print(f"DEBUG: Quiz found for key {quiz_key} but is archived.")
-                    return JsonResponse(
-                        {"error": "This quiz is currently inactive."}, status=403
-                    )  # Forbidden
-                target_quiz = quiz
-                break  # Stop searching once found
+        # --- Find Quiz by Access Key and Build its Payload ---
+        # Concurrent requests for the same key (a class starting together)
+        # share one lookup; the results are shared and read-only
+        target_quiz, compiled = quiz_access_flight.do(
+            normalize_access_key(quiz_key), lambda: _resolve_quiz_access(quiz_key)
+        )
+        if target_quiz is not None and target_quiz.get("archived", False):
+            print(f"DEBUG: Quiz found for key {quiz_key} but is archived.")
+            return JsonResponse(
+                {"error": "This quiz is currently inactive."}, status=403
+            )  # Forbidden
 
         if target_quiz is None:
             print(f"DEBUG: Invalid quiz key provided: {quiz_key}")
@@ -1308,11 +1262,7 @@ def quiz_access_api(request):
             f"DEBUG: Found active quiz '{target_quiz.get('title')}' (ID: {target_quiz.get('id')}) for key {quiz_key}"
         )
 
-        # --- Fetch Associated Questions ---
-        question_ids_in_quiz = set(target_quiz.get("questions", []))
-        quiz_questions = [
-            q for q in all_questions if str(q.get("id")) in question_ids_in_quiz
-        ]
+        quiz_questions = compiled.payload["questions"]
 
         if not quiz_questions:
             print(f"DEBUG: Quiz {target_quiz.get('id')} has no associated questions.")
@@ -1326,68 +1276,23 @@ def quiz_access_api(request):
 
         # --- Apply Randomization (Based on TCHR-6 config) ---
         quiz_config = target_quiz.get("config", {})
-
-        # 1. Randomize Question Order
-        if quiz_config.get("randomize_questions", False):
-            print("DEBUG: Randomizing question order.")
-            random.shuffle(quiz_questions)
-
-        # 2. Shuffle Answer Options (for MCQs)
-        if quiz_config.get("shuffle_answers", False):
-            print("DEBUG: Shuffling MCQ answer options.")
-            for question in quiz_questions:
-                if question.get("type") == "MCQ" and isinstance(
-                    question.get("options"), list
-                ):
-                    # Important: Shuffle a *copy* if you don't want to affect the stored data
-                    # For now, let's shuffle in place just for this student's attempt
-                    random.shuffle(question["options"])
-                    # NOTE: Shuffling options means the stored `correct_answer` (which holds option IDs)
-                    # is now potentially incorrect *relative to the shuffled order*.
-                    # The grading logic (API-4) MUST compare student's selected option ID(s)
-                    # against the original `correct_answer` list, NOT based on the shuffled index.
-
-        # --- Prepare Data Payload for Student ---
-        # Remove sensitive/internal data before sending
-        prepared_quiz = {
-            "id": target_quiz.get("id"),
-            "title": target_quiz.get("title"),
-            "description": target_quiz.get("description"),
-            "config": {  # Send only relevant config for student UI
-                "duration": quiz_config.get("duration"),
-                "presentation_mode": quiz_config.get("presentation_mode", "all"),
-                "allow_back": quiz_config.get("allow_back", True),
-            },
-            "questions": [],  # Prepare questions below
-        }
-
-        for q in quiz_questions:
-            prepared_q = {
-                "id": q.get("id"),
-                "text": q.get("text"),
-                "type": q.get("type"),
-                "score": q.get("score", 1),
-                "media_filename": q.get(
-                    "media_filename"
-                ),  # <<< Include question media filename
-                "mcq_is_single_choice": q.get(
-                    "mcq_is_single_choice", False
-                ),  # <<< Include flag
-                "options": [],
-            }
-            if q.get("type") == "MCQ" and isinstance(q.get("options"), list):
-                prepared_q["options"] = [
-                    {
-                        "id": opt.get("id"),
-                        "text": opt.get("text"),
-                        "media_filename": opt.get(
-                            "media_filename"
-                        ),  # <<< Include option media filename
-                    }
-                    for opt in q.get("options", [])
-                    if isinstance(opt, dict)
-                ]
-            prepared_quiz["questions"].append(prepared_q)
+        randomize_questions = quiz_config.get("randomize_questions", False)
+        shuffle_answers = quiz_config.get("shuffle_answers", False)
+
+        if not randomize_questions and not shuffle_answers:
+            # Every student gets the same payload: serve the pre-encoded bytes
+            return HttpResponse(compiled.body, content_type="application/json")
+
+        # Seeded permutations applied to copies of the shared compiled payload.
+        # The seed goes to the student and comes back with the submission, so
+        # the order they saw can be reproduced later.
+        # NOTE: Shuffled options keep their IDs; grading compares the selected
+        # option ID(s) against the stored `correct_answer`, never positions.
+        shuffle_seed = new_shuffle_seed()
+        print(
+            f"DEBUG: Shuffling quiz (questions: {randomize_questions}, answers: {shuffle_answers}) with seed {shuffle_seed}."
+        )
+        prepared_quiz = shuffle_payload(compiled.payload, shuffle_seed, quiz_config)
 
         print(
             f"DEBUG: Returning prepared quiz data for student. Quiz ID: {prepared_quiz['id']}, Question Count: {len(prepared_quiz['questions'])}"
@@ -1406,6 +1311,17 @@ def quiz_access_api(request):
         )
 
 
+def _submission_feedback(attempt: dict) -> dict:
+    """Feedback returned to the student for a stored attempt."""
+    return {
+        "attempt_id": attempt.get("attempt_id"),
+        "score": attempt.get("percentage"),
+        "passed": attempt.get("passed"),
+        "max_score": attempt.get("max_possible_score"),
+        "achieved_score": attempt.get("score_achieved"),
+    }
+
+
 @csrf_exempt  # Student submissions likely won't have CSRF from standard forms
 @require_http_methods(["POST"])
 def quiz_submit_api(request, quiz_id):
@@ -1433,6 +1349,9 @@ def quiz_submit_api(request, quiz_id):
         submitted_due_to_timeout = submission_data.get(
             "submitted_due_to_timeout", False
         )
+        shuffle_seed = submission_data.get("shuffle_seed")  # Issued by quiz_access_api
+        if not is_valid_shuffle_seed(shuffle_seed):
+            shuffle_seed = None
 
         # --- Validate and Process Student Info ---
         is_valid_student_data = False
@@ -1476,14 +1395,8 @@ def quiz_submit_api(request, quiz_id):
         #         return JsonResponse({'error': 'Missing or invalid answers data.'}, status=400)
 
         # --- Load Quiz and Question Data ---
-        data = load_data()
-        all_quizzes = data.get("quizzes", [])
-        all_questions = data.get("questions", [])
-        target_quiz = None
-        for q in all_quizzes:
-            if str(q.get("id")) == str(quiz_id):
-                target_quiz = q
-                break
+        # Read-only records: the attempt goes to the log below
+        target_quiz = get_quiz(quiz_id)
         if target_quiz is None:
             return JsonResponse({"error": "Quiz not found."}, status=404)
         if target_quiz.get("archived"):
@@ -1491,113 +1404,35 @@ def quiz_submit_api(request, quiz_id):
                 {"error": "Cannot submit to an archived quiz."}, status=403
             )
 
-        quiz_config = target_quiz.get("config", {})
-        pass_score_threshold = Decimal(quiz_config.get("pass_score", 70))
-
-        question_ids_in_quiz = set(target_quiz.get("questions", []))
-        questions_in_quiz_dict = {
-            str(q.get("id")): q
-            for q in all_questions
-            if str(q.get("id")) in question_ids_in_quiz
-        }
-
-        # --- Perform Grading ---
-        total_score_achieved = Decimal(0)
-        max_possible_score = Decimal(0)
-        graded_details = []  # Optional detailed results
-
-        for q_id, question_data in questions_in_quiz_dict.items():
-            q_id_str = str(q_id)  # Ensure consistency
-            question_score = Decimal(question_data.get("score", 1))  # Use Decimal
-            max_possible_score += (
-                question_score  # Add to max score for this quiz attempt
-            )
-            question_type = question_data.get("type")
-            student_answer = student_answers.get(
-                q_id_str
-            )  # Get student's answer for this question
-
-            is_correct = None  # None = not auto-graded/applicable, True/False otherwise
-            score_awarded = Decimal(0)
-            needs_manual_review = False
-            # ... (MCQ / SHORT_TEXT grading) ...
-            # total_score_achieved += score_awarded
-            # graded_details.append({ # ... graded details ... })
-
-            if student_answer is not None:  # Only grade if student provided an answer
-                if question_type == "MCQ":
-                    correct_option_ids = set(question_data.get("correct_answer", []))
-                    is_single_choice_q = question_data.get(
-                        "mcq_is_single_choice", False
-                    )  # <<< Get flag
-
-                    if isinstance(student_answer, list):
-                        selected_option_ids = set(student_answer)
-
-                        # --- Modified Correctness Check ---
-                        if is_single_choice_q:
-                            # Single choice: correct if exactly one selected AND it's the correct one
-                            is_correct = len(
-                                selected_option_ids
-                            ) == 1 and selected_option_ids.issubset(correct_option_ids)
-                            # We assume correct_option_ids also has only 1 item if is_single_choice_q is true due to validation
-                        else:
-                            # Multiple choice: exact match required
-                            is_correct = selected_option_ids == correct_option_ids
-                        # --- End Modified Check ---
-
-                        if is_correct:
-                            score_awarded = question_score
-                    else:
-                        is_correct = False  # Invalid answer format
-
-                elif question_type == "SHORT_TEXT":
-                    review_mode = question_data.get(
-                        "short_answer_review_mode", "manual"
+        # --- Idempotent Resubmission ---
+        # A client-chosen attempt_id makes submitting again after a failed or
+        # timed-out request safe: an attempt stored under it is returned as is
+        attempt_id = submission_data.get("attempt_id")
+        if attempt_id is not None:
+            try:
+                attempt_id = str(uuid.UUID(str(attempt_id)))
+            except ValueError:
+                return JsonResponse(
+                    {"error": "Invalid attempt_id (must be a UUID)."}, status=400
+                )
+            stored_attempt = get_attempt(attempt_id)
+            if stored_attempt is not None:
+                if str(stored_attempt.get("quiz_id")) != str(quiz_id):
+                    return JsonResponse(
+                        {"error": "attempt_id is already used by another quiz."},
+                        status=409,
                     )
-                    if review_mode == "auto":
-                        correct_text = question_data.get("short_answer_correct_text")
-                        if correct_text is not None and isinstance(student_answer, str):
-                            # Case-INSENSITIVE comparison after trimming whitespace
-                            is_correct = (
-                                student_answer.strip().lower() == correct_text.lower()
-                            )
-                            if is_correct:
-                                score_awarded = question_score
-                        else:
-                            is_correct = False  # Cannot auto-grade if no correct text stored or invalid student answer
-                    else:  # Manual review mode
-                        needs_manual_review = True
-                        is_correct = None  # Mark as needing review
-
-                # Add logic for other question types here later
-
-            # Accumulate total score
-            total_score_achieved += score_awarded
-
-            # Store detailed result (optional)
-            graded_details.append(
-                {
-                    "question_id": q_id_str,
-                    "is_correct": is_correct,
-                    "score_awarded": float(
-                        score_awarded.quantize(Decimal("0.01"), ROUND_HALF_UP)
-                    ),  # Store as float
-                    "needs_manual_review": needs_manual_review,
-                }
-            )
-
-        # Calculate percentage
-        percentage = Decimal(0)
-        if max_possible_score > 0:
-            percentage = (total_score_achieved / max_possible_score) * 100
-            # Round to reasonable precision, e.g., 2 decimal places
-            percentage = percentage.quantize(Decimal("0.01"), ROUND_HALF_UP)
+                print(
+                    f"DEBUG: Attempt {attempt_id} for quiz {quiz_id} already stored; returning it."
+                )
+                return JsonResponse(_submission_feedback(stored_attempt), status=200)
 
-        passed = percentage >= pass_score_threshold
+        # --- Perform Grading ---
+        # The quiz is compiled once per content version (see quiz.grading)
+        grading = get_grading_plan(target_quiz).grade(student_answers)
 
         # --- Prepare Attempt Record ---
-        attempt_id = str(uuid.uuid4())
+        attempt_id = attempt_id or str(uuid.uuid4())
         # Convert timestamps if they were milliseconds
         # start_time_iso = datetime.datetime.fromtimestamp(start_time_ms / 1000).isoformat() if start_time_ms else None
         # end_time_iso = datetime.datetime.fromtimestamp(end_time_ms / 1000).isoformat() if end_time_ms else datetime.datetime.now().isoformat()
@@ -1620,39 +1455,44 @@ def quiz_submit_api(request, quiz_id):
             "quiz_title_at_submission": target_quiz.get("title", "N/A"),
             "students": processed_student_list,  # <<< Use the reliably assigned list variable
             "answers": student_answers,
-            "score_achieved": float(
-                total_score_achieved.quantize(Decimal("0.01"), ROUND_HALF_UP)
-            ),
-            "max_possible_score": float(
-                max_possible_score.quantize(Decimal("0.01"), ROUND_HALF_UP)
-            ),
-            "percentage": float(percentage),
-            "passed": bool(passed),
-            "pass_score_threshold": float(pass_score_threshold),
+            "score_achieved": grading["score_achieved"],
+            "max_possible_score": grading["max_possible_score"],
+            "percentage": grading["percentage"],
+            "passed": grading["passed"],
+            "pass_score_threshold": grading["pass_score_threshold"],
             "start_time": start_time_iso,
             "end_time": end_time_iso,
             "submitted_due_to_timeout": submitted_due_to_timeout,
-            "graded_details": graded_details,
+            "shuffle_seed": shuffle_seed,  # Reproduces the order the student saw
+            "graded_details": grading["graded_details"],
         }
 
         # --- Save Attempt ---
-        all_attempts = data.get("attempts", [])
-        all_attempts.append(new_attempt)
-        data["attempts"] = all_attempts
-        save_data(data)
+        # Appended to the attempt log (constant cost, fsynced) instead of
+        # rewriting the whole data file; load_data() merges it back in.
+        # Concurrent submissions share one write; this returns once committed.
+        try:
+            submit_attempt(new_attempt)
+        except TimeoutError as e:
+            # Withdrawn before it was written: nothing was saved
+            print(f"WARNING [Submit API]: Attempt {attempt_id} not saved: {e}")
+            return JsonResponse(
+                {
+                    "error": "The submission could not be saved in time. Please submit again.",
+                    "attempt_id": attempt_id,
+                },
+                status=503,
+            )
         print(
-            f"DEBUG: Stored attempt {attempt_id} for quiz {quiz_id}. Score: {percentage}%"
+            f"DEBUG: Stored attempt {attempt_id} for quiz {quiz_id}. Score: {grading['percentage']}%"
         )
 
         # --- Return Feedback ---
-        feedback_payload = {
-            "attempt_id": attempt_id,
-            "score": float(percentage),
-            "passed": bool(passed),
-            "max_score": float(max_possible_score),
-            "achieved_score": float(total_score_achieved),
-        }
-        return JsonResponse(feedback_payload, status=201)
+        # A racing resubmission with the same attempt_id may have been stored
+        # first; report the attempt that was actually kept
+        return JsonResponse(
+            _submission_feedback(get_attempt(attempt_id) or new_attempt), status=201
+        )
 
     except json.JSONDecodeError:
         return JsonResponse({"error": "Invalid submission format."}, status=400)
@@ -1673,84 +1513,24 @@ def quiz_submit_api(request, quiz_id):
 def get_quiz_attempts_api(request, quiz_id):
     """
     API endpoint for teachers to retrieve a summary list of attempts
-    for a specific quiz.
+    for a specific quiz, newest first, one page at a time.
+    Query params: limit, cursor (from the previous page's next_cursor),
+    class, passed, timed_out, from, to (ISO dates/datetimes).
     """
     print(f"DEBUG [Attempts API]: Fetching attempts for quiz {quiz_id}")
     try:
-        data = load_data()
-        all_attempts = data.get("attempts", [])
-        quiz_id_str = str(quiz_id)
-
-        # Filter attempts for the specific quiz
-        quiz_attempts = [
-            attempt
-            for attempt in all_attempts
-            if str(attempt.get("quiz_id")) == quiz_id_str
-        ]
-        print(
-            f"DEBUG [Attempts API]: Found {len(quiz_attempts)} raw attempts for quiz."
-        )
+        try:
+            listing_params = parse_listing_params(request.GET)
+        except InvalidListingParameter as e:
+            return JsonResponse({"error": str(e)}, status=400)
 
-        # Sort attempts, e.g., by submission time descending
-        quiz_attempts.sort(key=lambda x: x.get("end_time", ""), reverse=True)
-
-        # Prepare summarized data to return
-        summarized_attempts = []
-        for att in quiz_attempts:
-            # --- CORRECTED STUDENT DETAIL EXTRACTION ---
-            students_in_attempt = att.get(
-                "students", []
-            )  # Get the list of students for this attempt
-            student_name_display = "N/A"
-            student_class_display = ""
-            student_id_display = ""
-
-            if isinstance(students_in_attempt, list) and len(students_in_attempt) > 0:
-                # Format names (handle single or multiple)
-                student_name_display = " & ".join(
-                    [
-                        str(
-                            s.get("name", "N/A")
-                        ).strip()  # Ensure name is string and trim
-                        for s in students_in_attempt
-                        if isinstance(s, dict)  # Check item is dict
-                    ]
-                )
-                # Get class/id from the FIRST student in the list for summary display
-                first_student = students_in_attempt[0]
-                if isinstance(first_student, dict):
-                    student_class_display = str(first_student.get("class", "")).strip()
-                    student_id_display = str(first_student.get("id", "")).strip()
-
-            elif isinstance(
-                att.get("student_info"), dict
-            ):  # Fallback for old structure
-                print(
-                    f"WARNING [Attempts API]: Attempt {att.get('attempt_id')} using old 'student_info'."
-                )
-                legacy_info = att["student_info"]
-                student_name_display = str(legacy_info.get("name", "N/A")).strip()
-                student_class_display = str(legacy_info.get("class", "")).strip()
-                student_id_display = str(legacy_info.get("id", "")).strip()
-            # --- END CORRECTION ---
-
-            # Prepare the summary dictionary for this attempt
-            summary = {
-                "attempt_id": att.get("attempt_id"),
-                "student_name": student_name_display,  # Use extracted value
-                "student_class": student_class_display,  # Use extracted value
-                "student_id_number": student_id_display,  # Use extracted value
-                "score_percentage": att.get("percentage"),
-                "passed": att.get("passed"),
-                "submission_time": att.get("end_time"),
-                "submitted_due_to_timeout": att.get("submitted_due_to_timeout", False),
-            }
-            summarized_attempts.append(summary)
+        # Served from the index's per-quiz timeline (sorted by submission time)
+        page = list_attempts_page(quiz_id, **listing_params)
 
         print(
-            f"DEBUG [Attempts API]: Returning {len(summarized_attempts)} summarized attempts."
+            f"DEBUG [Attempts API]: Returning {len(page['attempts'])} summarized attempts (more: {page['next_cursor'] is not None})."
         )
-        return JsonResponse({"attempts": summarized_attempts})
+        return JsonResponse(page)
 
     except Exception as e:
         print(f"Error fetching attempts for quiz {quiz_id}: {e}")
@@ -1760,26 +1540,138 @@ def get_quiz_attempts_api(request, quiz_id):
         )
 
 
+@api_teacher_required
+@require_http_methods(["GET"])
+def get_quiz_attempt_detail_api(request, quiz_id, attempt_id):
+    """
+    API endpoint for teachers to retrieve one full attempt, plus the
+    "presented_order" the student saw (question ids and option ids per
+    question), recomputed from the stored shuffle seed. It is null when
+    the attempt has no seed or the quiz no longer exists, and only matches
+    the original while the quiz's questions and options are unedited.
+    """
+    print(
+        f"DEBUG [Attempt Detail API]: Fetching attempt {attempt_id} of quiz {quiz_id}"
+    )
+    try:
+        attempt = get_attempt(attempt_id)
+        if attempt is None or str(attempt.get("quiz_id")) != str(quiz_id):
+            return JsonResponse({"error": "Attempt not found."}, status=404)
+
+        order = None
+        quiz = get_quiz(quiz_id)
+        if quiz is not None and attempt.get("shuffle_seed"):
+            order = presented_order(
+                get_student_payload(quiz).payload,
+                attempt["shuffle_seed"],
+                quiz.get("config", {}),
+            )
+        return JsonResponse({"attempt": attempt, "presented_order": order})
+
+    except Exception as e:
+        print(f"Error fetching attempt {attempt_id} of quiz {quiz_id}: {e}")
+        traceback.print_exc()
+        return JsonResponse(
+            {"error": f"An unexpected error occurred: {str(e)}"}, status=500
+        )
+
+
+@api_teacher_required
+@require_http_methods(["GET"])
+def quiz_stats_api(request, quiz_id):
+    """
+    API endpoint returning result statistics for a quiz (attempt count,
+    mean/stddev/min/max percentage, pass and timeout counts, histogram).
+    Served from running aggregates, no scan over the attempts.
+    """
+    try:
+        quiz = get_quiz(quiz_id)
+        if quiz is None:
+            return JsonResponse(
+                {"error": f"Quiz with ID {quiz_id} not found."}, status=404
+            )
+        return JsonResponse(
+            {"quiz_id": str(quiz_id), "stats": get_quiz_result_stats(quiz_id)}
+        )
+    except Exception as e:
+        print(f"Error fetching stats for quiz {quiz_id}: {e}")
+        traceback.print_exc()
+        return JsonResponse(
+            {"error": f"An unexpected error occurred: {str(e)}"}, status=500
+        )
+
+
+@api_teacher_required
+@require_http_methods(["GET"])
+def quiz_item_analysis_api(request, quiz_id):
+    """
+    API endpoint returning per-question item analysis for a quiz
+    (difficulty p-value, point-biserial discrimination, unanswered share,
+    MCQ option distribution). Cached until the quiz or its attempts change.
+    """
+    try:
+        quiz = get_quiz(quiz_id)
+        if quiz is None:
+            return JsonResponse(
+                {"error": f"Quiz with ID {quiz_id} not found."}, status=404
+            )
+        return JsonResponse({"quiz_id": str(quiz_id), **get_item_analysis(quiz)})
+    except Exception as e:
+        print(f"Error computing item analysis for quiz {quiz_id}: {e}")
+        traceback.print_exc()
+        return JsonResponse(
+            {"error": f"An unexpected error occurred: {str(e)}"}, status=500
+        )
+
+
+@api_teacher_required
+@require_http_methods(["GET"])
+def student_history_api(request):
+    """
+    API endpoint returning one student's attempts across all quizzes, newest
+    first. Query: name (required), class, id; matched case-insensitively
+    against the student history index, also for pair submissions.
+    """
+    name = request.GET.get("name", "")
+    if not name.strip():
+        return JsonResponse({"error": "'name' is required."}, status=400)
+    try:
+        attempts = sorted(
+            get_student_history(
+                request.GET.get("id", ""), name, request.GET.get("class", "")
+            ),
+            key=attempt_sort_key,
+        )
+        history = []
+        for att in attempts:
+            quiz = get_quiz(att.get("quiz_id"))
+            history.append(
+                {
+                    **summarize_attempt(att),
+                    "quiz_id": att.get("quiz_id"),
+                    "quiz_title": quiz.get("title") if quiz else None,
+                }
+            )
+        return JsonResponse({"attempt_count": len(history), "attempts": history})
+    except Exception as e:
+        print(f"Error fetching student history: {e}")
+        traceback.print_exc()
+        return JsonResponse(
+            {"error": f"An unexpected error occurred: {str(e)}"}, status=500
+        )
+
+
 def _get_attempts_for_quiz(quiz_id_to_find):
-    """Helper function to fetch and sort attempts for reuse."""
-    data = load_data()
-    all_attempts = data.get("attempts", [])
-    quiz_id_str = str(quiz_id_to_find)
-    quiz_attempts = [
-        attempt
-        for attempt in all_attempts
-        if str(attempt.get("quiz_id")) == quiz_id_str
-    ]
-    quiz_attempts.sort(key=lambda x: x.get("end_time", ""), reverse=True)
+    """Helper function to fetch and sort attempts for reuse (read-only)."""
+    # Newest first, from the index's per-quiz timeline (shared: read-only)
+    quiz_attempts = get_attempt_timeline(quiz_id_to_find)[1]
     # Also fetch quiz title for filename
     quiz_title = "UnknownQuiz"
-    all_quizzes = data.get("quizzes", [])
-    for q in all_quizzes:
-        if str(q.get("id")) == quiz_id_str:
-            quiz_title = q.get("title", "Quiz").replace(
-                " ", "_"
-            )  # Safe title for filename
-            break
+    quiz = get_quiz(quiz_id_to_find)
+    if quiz is not None:
+        quiz_title = quiz.get("title", "Quiz").replace(
+            " ", "_"
+        )  # Safe title for filename
     return quiz_attempts, quiz_title
 
 
@@ -1789,32 +1681,11 @@ def export_quiz_attempts_json_api(request, quiz_id):
     """Exports attempts for a specific quiz as a JSON file."""
     try:
         quiz_attempts, quiz_title = _get_attempts_for_quiz(quiz_id)
-        if not quiz_attempts:
-            # Optionally return empty file or error? Let's return empty for now.
-            pass
-
-        # Select fields for export (can be more detailed than summary list)
-        export_data = [
-            {
-                "Attempt ID": att.get("attempt_id"),
-                "Student Name": att.get("student_info", {}).get("name", "N/A"),
-                "Student Class": att.get("student_info", {}).get("class", ""),
-                "Student ID/Number": att.get("student_info", {}).get("id", ""),
-                "Score (%)": att.get("percentage"),
-                "Score Achieved": att.get("score_achieved"),
-                "Max Score": att.get("max_possible_score"),
-                "Passed": att.get("passed"),
-                "Submission Time (UTC)": att.get("end_time"),
-                "Timed Out": att.get("submitted_due_to_timeout", False),
-                "Answers": att.get("answers"),  # Include raw answers in JSON export
-                "Graded Details": att.get("graded_details"),  # Include grading details
-            }
-            for att in quiz_attempts
-        ]
-
-        json_export_data = json.dumps({"quiz_results": export_data}, indent=2)
+        # Streamed one batch of attempts at a time (see quiz.exports)
         filename = f"results_{quiz_title}_{quiz_id}.json"
-        response = HttpResponse(json_export_data, content_type="application/json")
+        response = StreamingHttpResponse(
+            iter_json_export(quiz_attempts), content_type="application/json"
+        )
         response["Content-Disposition"] = f'attachment; filename="{filename}"'
         return response
 
@@ -1824,80 +1695,90 @@ def export_quiz_attempts_json_api(request, quiz_id):
         return JsonResponse({"error": "Failed to generate JSON export."}, status=500)
 
 
+@api_teacher_required
+@require_http_methods(["GET"])
+def export_quiz_attempts_ndjson_api(request, quiz_id):
+    """Streams attempts for a specific quiz as newline-delimited JSON."""
+    try:
+        quiz_attempts, quiz_title = _get_attempts_for_quiz(quiz_id)
+        filename = f"results_{quiz_title}_{quiz_id}.ndjson"
+        response = StreamingHttpResponse(
+            iter_ndjson_export(quiz_attempts), content_type="application/x-ndjson"
+        )
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+    except Exception as e:
+        print(f"Error exporting NDJSON results for quiz {quiz_id}: {e}")
+        return JsonResponse({"error": "Failed to generate NDJSON export."}, status=500)
+
+
+@api_teacher_required
+@require_http_methods(["GET"])
+def export_quiz_attempts_csv_api(request, quiz_id):
+    """Streams attempts for a specific quiz as a CSV file."""
+    try:
+        quiz_attempts, quiz_title = _get_attempts_for_quiz(quiz_id)
+        filename = f"results_{quiz_title}_{quiz_id}.csv"
+        response = StreamingHttpResponse(
+            iter_csv_export(quiz_attempts), content_type="text/csv; charset=utf-8"
+        )
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+    except Exception as e:
+        print(f"Error exporting CSV results for quiz {quiz_id}: {e}")
+        return JsonResponse({"error": "Failed to generate CSV export."}, status=500)
+
+
 @api_teacher_required
 @require_http_methods(["GET"])
 def export_quiz_attempts_excel_api(request, quiz_id):
-    """Exports attempts for a specific quiz as an Excel (.xlsx) file."""
+    """
+    Exports attempts for a specific quiz as an Excel (.xlsx) file. With
+    ?background=1 the workbook is built by a background job instead and the
+    response is 202 with the job to poll (see job_detail_api).
+    """
     try:
+        if _wants_background(request):
+            job = job_runner.submit(
+                "excel_export",
+                _excel_export_job,
+                str(quiz_id),
+                description=f"Excel export of quiz {quiz_id}",
+            )
+            return _job_accepted_response(job)
+
         quiz_attempts, quiz_title = _get_attempts_for_quiz(quiz_id)
 
-        # Create Excel workbook and sheet
-        wb = openpyxl.Workbook()
-        ws = wb.active
-        ws.title = f"Quiz Results ({quiz_title[:20]})"  # Sheet title limit
-
-        # Define headers
-        headers = [
-            "Attempt ID",
-            "Student Name",
-            "Student Class",
-            "Student ID/Number",
-            "Score (%)",
-            "Passed",
-            "Submission Time (UTC)",
-            "Timed Out",
-            "Score Achieved",
-            "Max Score",
-            # Avoid exporting raw answers/details to basic Excel for simplicity,
-            # can be added as separate sheets or complex cells if needed later.
-        ]
-        ws.append(headers)
-
-        # Add data rows
-        for att in quiz_attempts:
-            passed_text = "Yes" if att.get("passed") else "No"
-            timeout_text = "Yes" if att.get("submitted_due_to_timeout", False) else "No"
-            row = [
-                att.get("attempt_id", ""),
-                att.get("student_info", {}).get("name", "N/A"),
-                att.get("student_info", {}).get("class", ""),
-                att.get("student_info", {}).get("id", ""),
-                att.get("percentage", ""),
-                passed_text,
-                att.get("end_time", ""),
-                timeout_text,
-                att.get("score_achieved", ""),
-                att.get("max_possible_score", ""),
-            ]
-            ws.append(row)
-
-        # Optional: Adjust column widths
-        for i, column_cells in enumerate(ws.columns):
-            max_length = max(len(str(cell.value)) for cell in column_cells)
-            adjusted_width = max_length + 2
-            ws.column_dimensions[get_column_letter(i + 1)].width = adjusted_width
-
-        # Prepare HTTP response
+        # Extra sheet: per-question item analysis (cached, see quiz.item_analysis)
+        item_analysis_rows = None
+        quiz = get_quiz(quiz_id)
+        if quiz is not None:
+            item_analysis_rows = item_analysis_sheet_rows(get_item_analysis(quiz))
+
+        # Write-only workbook, spooled to a temporary file and streamed back
+        workbook_file = spooled_attempts_workbook(
+            results_sheet_title(quiz_title),
+            quiz_attempts,
+            item_analysis_rows,
+        )
         filename = f"results_{quiz_title}_{quiz_id}.xlsx"
-        response = HttpResponse(
-            content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        response = FileResponse(
+            workbook_file,
+            as_attachment=True,
+            filename=filename,
+            content_type=EXCEL_CONTENT_TYPE,
         )
-        response["Content-Disposition"] = f'attachment; filename="{filename}"'
-        wb.save(response)  # Save workbook content to the response
         return response
 
+    except JobQueueFull as e:
+        return JsonResponse({"error": str(e)}, status=503)
     except Exception as e:
         print(f"Error exporting Excel results for quiz {quiz_id}: {e}")
         return JsonResponse({"error": "Failed to generate Excel export."}, status=500)
 
 
-# Helper function (can be moved to utils if desired)
-def generate_quiz_key(length=6):
-    characters = string.ascii_uppercase + string.digits
-    # Ensure reasonable uniqueness? Simple random for now.
-    return "".join(random.choice(characters) for i in range(length))
-
-
 @api_teacher_required
 @require_http_methods(["POST"])  # Use POST for action that modifies data
 def quiz_regenerate_key_api(request, quiz_id):
@@ -1905,48 +1786,283 @@ def quiz_regenerate_key_api(request, quiz_id):
     API endpoint for regenerating the access key for a specific quiz.
     """
     try:
-        data = load_data()
-        quizzes = data.get("quizzes", [])
-        quiz_to_update = None
-        quiz_index = -1
-
         # Find the quiz
-        for index, q in enumerate(quizzes):
-            if str(q.get("id")) == str(quiz_id):
-                quiz_to_update = q
-                quiz_index = index
-                break
+        quiz_to_update = get_quiz(quiz_id)
 
         if quiz_to_update is None:
             return JsonResponse(
                 {"error": f"Quiz with ID {quiz_id} not found."}, status=404
             )
 
-        # Generate a new key
-        new_key = generate_quiz_key()
-        # TODO: Optional - Add check here to ensure new_key isn't already used by another *active* quiz
+        # Generate a new key, unique among all quizzes
+        with reserve_access_keys(1) as (new_key,):
+            print(
+                f"DEBUG [Regen Key]: Regenerating key for quiz {quiz_id}. Old: {quiz_to_update.get('access_key')}, New: {new_key}"
+            )
 
-        print(
-            f"DEBUG [Regen Key]: Regenerating key for quiz {quiz_id}. Old: {quiz_to_update.get('access_key')}, New: {new_key}"
+            # Update only this quiz's key in the store
+            if set_access_key(quiz_id, new_key) is None:
+                return JsonResponse(
+                    {"error": f"Quiz with ID {quiz_id} not found."}, status=404
+                )
+
+        return JsonResponse(
+            {"message": "Access key regenerated successfully.", "new_key": new_key}
+        )
+
+    except Exception as e:
+        print(f"Error regenerating key for quiz {quiz_id}: {e}")
+        import traceback
+
+        traceback.print_exc()
+        return JsonResponse(
+            {"error": f"An unexpected error occurred: {str(e)}"}, status=500
         )
 
-        # Update the quiz object
-        quiz_to_update["access_key"] = new_key
-        quizzes[quiz_index] = quiz_to_update  # Place updated quiz back in list
-        data["quizzes"] = quizzes
 
-        # Save the entire data structure back
-        save_data(data)
+@api_teacher_required
+@require_http_methods(["POST"])
+def quiz_regrade_api(request, quiz_id):
+    """
+    API endpoint for regrading all stored attempts of a quiz against its
+    current answer key and scores. Returns the ids of changed attempts.
+    """
+    try:
+        if get_quiz(quiz_id) is None:
+            return JsonResponse(
+                {"error": f"Quiz with ID {quiz_id} not found."}, status=404
+            )
+        if _wants_background(request):
+            job = job_runner.submit(
+                "regrade",
+                _regrade_job,
+                regrade_quiz,
+                str(quiz_id),
+                description=f"Regrade of quiz {quiz_id}",
+            )
+            return _job_accepted_response(job)
+        report = regrade_quiz(quiz_id)
+        if report is None:
+            return JsonResponse(
+                {"error": f"Quiz with ID {quiz_id} not found."}, status=404
+            )
+        return JsonResponse({"message": "Attempts regraded successfully.", **report})
+    except JobQueueFull as e:
+        return JsonResponse({"error": str(e)}, status=503)
+    except Exception as e:
+        print(f"Error regrading attempts for quiz {quiz_id}: {e}")
+        import traceback
 
+        traceback.print_exc()
         return JsonResponse(
-            {"message": "Access key regenerated successfully.", "new_key": new_key}
+            {"error": f"An unexpected error occurred: {str(e)}"}, status=500
         )
 
+
+@api_teacher_required
+@require_http_methods(["POST"])
+def question_regrade_api(request, question_id):
+    """
+    API endpoint for regrading the attempts of every quiz using a question,
+    e.g. after its correct_answer or score was fixed.
+    """
+    try:
+        if get_question(question_id) is None:
+            return JsonResponse(
+                {"error": f"Question with ID {question_id} not found."}, status=404
+            )
+        if _wants_background(request):
+            job = job_runner.submit(
+                "regrade",
+                _regrade_job,
+                regrade_question,
+                str(question_id),
+                description=f"Regrade for question {question_id}",
+            )
+            return _job_accepted_response(job)
+        report = regrade_question(question_id)
+        if report is None:
+            return JsonResponse(
+                {"error": f"Question with ID {question_id} not found."}, status=404
+            )
+        return JsonResponse({"message": "Attempts regraded successfully.", **report})
+    except JobQueueFull as e:
+        return JsonResponse({"error": str(e)}, status=503)
     except Exception as e:
-        print(f"Error regenerating key for quiz {quiz_id}: {e}")
+        print(f"Error regrading attempts for question {question_id}: {e}")
         import traceback
 
         traceback.print_exc()
         return JsonResponse(
             {"error": f"An unexpected error occurred: {str(e)}"}, status=500
         )
+
+
+# --- Background Jobs (see core.jobs) ---
+def _wants_background(request) -> bool:
+    """True if the request asks to run as a background job (?background=1)."""
+    value = request.GET.get("background") or request.POST.get("background") or ""
+    return value.strip().lower() in ("1", "true", "yes")
+
+
+def _job_accepted_response(job: dict):
+    """202 response pointing the client at the job to poll."""
+    return JsonResponse(
+        {
+            "message": "Job queued.",
+            "job_id": job["id"],
+            "status": job["status"],
+            "status_url": reverse("quiz:job_detail", kwargs={"job_id": job["id"]}),
+        },
+        status=202,
+    )
+
+
+def _excel_export_job(context, quiz_id):
+    """Background job body for export_quiz_attempts_excel_api."""
+    quiz_attempts, quiz_title = _get_attempts_for_quiz(quiz_id)
+    total = len(quiz_attempts)
+    context.set_progress(0, total, "Writing workbook")
+    item_analysis_rows = None
+    quiz = get_quiz(quiz_id)
+    if quiz is not None:
+        item_analysis_rows = item_analysis_sheet_rows(get_item_analysis(quiz))
+    result_file = context.result_path(f"results_{quiz_title}_{quiz_id}.xlsx")
+    with open(result_file, "wb") as f:
+        write_attempts_workbook(
+            f,
+            results_sheet_title(quiz_title),
+            quiz_attempts,
+            item_analysis_rows,
+            progress=lambda written: context.set_progress(written, total),
+        )
+    context.set_progress(total, total, "Done")
+    return {"result_file": result_file, "attempts_exported": total}
+
+
+def _results_archive_job(context, export_format):
+    """Background job body for results_archive_api."""
+    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    result_file = context.result_path(f"all_quiz_results_{timestamp}.zip")
+    with open(result_file, "wb") as f:
+        summary = build_results_archive(
+            f,
+            export_format,
+            progress=lambda done, total: context.set_progress(done, total, "Exporting"),
+        )
+    return {"result_file": result_file, **summary}
+
+
+def _regrade_job(context, regrade_func, target_id):
+    """Background job body for the regrade endpoints."""
+    report = regrade_func(
+        target_id,
+        progress=lambda done, total: context.set_progress(done, total, "Regrading"),
+    )
+    if report is None:
+        raise ValueError(f"Nothing to regrade for {target_id} (deleted?).")
+    return report
+
+
+def _job_for_client(job: dict) -> dict:
+    """Job record as returned by the API (file path replaced by a URL)."""
+    client_job = {key: value for key, value in job.items() if key != "result_file"}
+    client_job["result_url"] = None
+    if job.get("result_file"):
+        client_job["result_url"] = reverse(
+            "quiz:job_result", kwargs={"job_id": job["id"]}
+        )
+    return client_job
+
+
+@api_teacher_required
+@require_http_methods(["GET"])
+def results_archive_api(request):
+    """
+    Exports the results of every quiz as one ZIP (?format=xlsx, default, or
+    csv): a file per quiz plus summary.csv. With ?background=1 it is built
+    by a background job.
+    """
+    export_format = request.GET.get("format", "xlsx").strip().lower()
+    if export_format not in ARCHIVE_FORMATS:
+        return JsonResponse(
+            {"error": f"'format' must be one of: {', '.join(ARCHIVE_FORMATS)}."},
+            status=400,
+        )
+    try:
+        if _wants_background(request):
+            job = job_runner.submit(
+                "results_archive",
+                _results_archive_job,
+                export_format,
+                description=f"Results archive ({export_format}) of all quizzes",
+            )
+            return _job_accepted_response(job)
+
+        archive_file = tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_MAX_MEMORY)
+        build_results_archive(archive_file, export_format)
+        archive_file.seek(0)
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        return FileResponse(
+            archive_file,
+            as_attachment=True,
+            filename=f"all_quiz_results_{timestamp}.zip",
+            content_type="application/zip",
+        )
+    except JobQueueFull as e:
+        return JsonResponse({"error": str(e)}, status=503)
+    except Exception as e:
+        print(f"Error exporting results archive: {e}")
+        traceback.print_exc()
+        return JsonResponse({"error": "Failed to generate results archive."}, status=500)
+
+
+@api_teacher_required
+@require_http_methods(["GET"])
+def job_list_api(request):
+    """API endpoint listing the most recent background jobs, newest first."""
+    try:
+        return JsonResponse(
+            {"jobs": [_job_for_client(job) for job in job_runner.list_jobs()]}
+        )
+    except Exception as e:
+        print(f"Error listing jobs: {e}")
+        traceback.print_exc()
+        return JsonResponse(
+            {"error": f"An unexpected error occurred: {str(e)}"}, status=500
+        )
+
+
+@api_teacher_required
+@require_http_methods(["GET"])
+def job_detail_api(request, job_id):
+    """API endpoint returning the status, progress and result of one job."""
+    job = job_runner.get(job_id)
+    if job is None:
+        return JsonResponse({"error": f"Job with ID {job_id} not found."}, status=404)
+    return JsonResponse(_job_for_client(job))
+
+
+@api_teacher_required
+@require_http_methods(["GET"])
+def job_result_api(request, job_id):
+    """API endpoint downloading the result file of a finished job."""
+    job = job_runner.get(job_id)
+    if job is None or not job.get("result_file"):
+        return JsonResponse(
+            {"error": f"No result file for job {job_id}."}, status=404
+        )
+    result_file = Path(job["result_file"])
+    if not result_file.is_file():
+        return JsonResponse(
+            {"error": f"Result file of job {job_id} no longer exists."}, status=404
+        )
+    content_type = None
+    if result_file.suffix == ".xlsx":
+        content_type = EXCEL_CONTENT_TYPE
+    return FileResponse(
+        open(result_file, "rb"),
+        as_attachment=True,
+        filename=result_file.name,
+        content_type=content_type,
+    )
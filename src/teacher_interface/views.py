@@ -2,7 +2,7 @@ from django.shortcuts import render, redirect, get_object_or_404 # Add redirect,
 from django.contrib.auth.decorators import login_required # Standard Django login required
 from authentication.decorators import teacher_required # Our custom decorator checking is_staff
 from django.urls import reverse
-from core.json_storage import load_data
+from core.json_storage import get_data_snapshot, get_question_categories, get_summary_counts
 
 # Import functions to potentially fetch summary data later (from quiz app)
 # from quiz.views import ... (or better, utility functions later)
@@ -11,28 +11,25 @@ from core.json_storage import load_data
 @teacher_required # Use the decorator that checks login AND is_staff, redirects to login if fails
 def dashboard_view(request):
     """
-    Renders the main dashboard page for logged-in teachers.
-    Placeholder for summary data.
+    Renders the main dashboard page for logged-in teachers,
+    with summary counts kept up to date by the data index (no scans).
     """
-    # --- Placeholder for fetching summary data ---
-    # Example: Count active quizzes (implement properly later)
-    # try:
-    #     data = load_data()
-    #     active_quizzes_count = sum(1 for quiz in data.get('quizzes', []) if not quiz.get('archived', False))
-    #     total_questions_count = len(data.get('questions', []))
-    # except Exception as e:
-    #     print(f"Error loading data for dashboard summary: {e}")
-    #     active_quizzes_count = 'N/A'
-    #     total_questions_count = 'N/A'
-    active_quizzes_count = 'N/A' # Placeholder
-    total_questions_count = 'N/A' # Placeholder
-
+    try:
+        counts = get_summary_counts()
+        active_quizzes_count = counts['active_quizzes']
+        total_questions_count = counts['questions']
+        total_attempts_count = counts['attempts']
+    except Exception as e:
+        print(f"Error loading data for dashboard summary: {e}")
+        active_quizzes_count = 'N/A'
+        total_questions_count = 'N/A'
+        total_attempts_count = 'N/A'
 
     context = {
         'username': request.user.username,
         'active_quizzes_count': active_quizzes_count,
         'total_questions_count': total_questions_count,
-        # Add more summary data later (e.g., recent results count)
+        'total_attempts_count': total_attempts_count,
     }
     return render(request, 'teacher_interface/dashboard.html', context)
 
@@ -71,23 +68,15 @@ def quiz_edit_view(request, quiz_id=None):
             'quiz_id': None,
             'form_title': 'Create New Quiz'
         }
-    # --- Verify this block exists and is correct ---
+    # Category choices come from the registry kept by the data index,
+    # so rendering the form never walks the whole question bank
     try:
-        all_data = load_data()
-        categories = sorted(list(set(
-            q.get('category', 'Uncategorized') # Get category or default
-            for q in all_data.get('questions', []) if q.get('category', '').strip() # Check if category exists and is not empty/whitespace
-        )))
-         # Handle potential 'Uncategorized' default if needed - this logic might need refinement
-         # If 'Uncategorized' is a possible value from get(), it will be included by the set automatically if present.
-         # If questions might have NO category key or empty strings, the list comprehension filters them out.
-
+        categories = [entry['value'] for entry in get_question_categories()]
         print(f"DEBUG: Found categories in view: {categories}") # Add logging
     except Exception as e:
         print(f"Error loading categories for filter: {e}")
         categories = []
     context['existing_categories'] = categories
-    # --- END Verify ---
 
     return render(request, 'teacher_interface/quiz_edit_form.html', context)
 
@@ -128,7 +117,7 @@ def results_list_view(request):
     Passes a list of quizzes for selection.
     """
     try:
-        all_data = load_data()
+        all_data = get_data_snapshot()
         # Get only non-archived quizzes for selection? Or all? Let's show all for now.
         quizzes = sorted(
             [{"id": q.get("id"), "title": q.get("title", "Untitled Quiz")} for q in all_data.get('quizzes', [])],